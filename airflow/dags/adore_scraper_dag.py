@@ -0,0 +1,173 @@
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.adore_scraper import AdoreBeautyScraper
+from src.ingestion.url_registry import UrlRegistry
+from src.ingestion.product_fingerprints import FingerprintStore
+from src.ingestion.product_snapshots import load_review_velocity
+from src.ingestion.crawl_scheduler import ReviewCrawlScheduler
+from src.ingestion.job_ledger import JobLedger
+from src.ingestion.review_shards import (
+    crawled_urls, get_ledger_file, get_shard_dir, merge_shards, run_shard, shard_urls
+)
+
+# Shared state that persists between runs
+RAW_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw')
+REGISTRY_FILE = os.path.join(RAW_DIR, 'product_url_registry.json')
+FINGERPRINT_FILE = os.path.join(RAW_DIR, 'product_fingerprints.json')
+SNAPSHOT_FILE = os.path.join(RAW_DIR, 'product_snapshots.csv')
+
+# Airflow pool that caps how many shards hit the site at once
+SCRAPING_POOL = 'adore_scraping'
+
+default_args = {
+    'owner': 'airflow',
+    'depends_on_past': False,
+    'start_date': datetime(2024, 1, 1),
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 3,
+    'retry_delay': timedelta(minutes=5),
+}
+
+def get_run_dir(ds_nodash):
+    """Each run reads and writes only its own partition"""
+    run_dir = os.path.join(RAW_DIR, 'adore', ds_nodash)
+    os.makedirs(run_dir, exist_ok=True)
+    return run_dir
+
+def discover_products(ds_nodash, params):
+    """Task to collect product URLs and listing snapshots into the registry"""
+    run_dir = get_run_dir(ds_nodash)
+    scraper = AdoreBeautyScraper()
+    registry = UrlRegistry(REGISTRY_FILE)
+
+    # Only a full crawl can tell which products have gone, so one runs whenever the
+    # last complete crawl is older than full_crawl_days (or full_crawl forces it)
+    incremental = not (params['full_crawl'] or registry.full_crawl_due(params['full_crawl_days']))
+    if incremental:
+        scraper.collect_new_product_urls(registry, max_pages=params['max_pages'])
+    else:
+        # Listing pages rather than the sitemap, so every product's listing snapshot
+        # (review count) is refreshed at least once per full crawl. Pages are ledger
+        # work items, so a retried task skips pages it already has
+        scraper.collect_all_product_urls(
+            max_pages=params['max_pages'], use_sitemap=False,
+            ledger=JobLedger(get_ledger_file(run_dir))
+        )
+
+    scraper.save_urls_to_file(os.path.join(run_dir, 'discovered_urls.txt'))
+    scraper.save_product_snapshots(SNAPSHOT_FILE)
+
+    # A full crawl cut short by errors or max_pages hasn't seen the whole catalogue either
+    delta = scraper.update_registry(registry, complete=not incremental and scraper.reached_end)
+    registry.save()
+    registry.save_delta(delta, directory=run_dir)
+    return len(scraper.product_urls)
+
+def plan_review_shards(ds_nodash, params):
+    """Task to write the due URLs, in priority order, into one file per shard"""
+    run_dir = get_run_dir(ds_nodash)
+    registry = UrlRegistry(REGISTRY_FILE)
+
+    scheduler = ReviewCrawlScheduler(
+        fingerprints=FingerprintStore(FINGERPRINT_FILE),
+        velocity=load_review_velocity(SNAPSHOT_FILE)
+    )
+    urls = scheduler.order(registry.urls_for_review_crawl())
+    print(f"{len(urls)} products are due for a review crawl")
+
+    shards = []
+    for index, shard in enumerate(shard_urls(urls, params['num_shards'])):
+        if not shard:
+            continue
+        shard_dir = get_shard_dir(run_dir, index)
+        os.makedirs(shard_dir, exist_ok=True)
+        url_file = os.path.join(shard_dir, 'urls.txt')
+        with open(url_file, 'w') as f:
+            f.write('\n'.join(shard) + '\n')
+        shards.append({'shard_index': index, 'url_file': url_file})
+
+    # One mapped scrape task per entry
+    return shards
+
+def scrape_review_shard(shard_index, url_file, ds_nodash, params):
+    """Task to scrape one shard; retries resume from the run's job ledger"""
+    with open(url_file, 'r') as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    return run_shard(
+        shard_index, urls, get_run_dir(ds_nodash),
+        fingerprint_file=FINGERPRINT_FILE,
+        snapshot_file=SNAPSHOT_FILE,
+        time_budget=params['shard_time_budget'],
+        max_requests=params['shard_max_requests']
+    )
+
+def merge_review_shards(ti, ds_nodash):
+    """Task to merge shard outputs and record which products were crawled"""
+    run_dir = get_run_dir(ds_nodash)
+    shards = ti.xcom_pull(task_ids='plan_review_shards') or []
+    shard_dirs = [get_shard_dir(run_dir, shard['shard_index']) for shard in shards]
+
+    # Failed shards still contribute whatever they finished
+    reviews_df = merge_shards(
+        [os.path.join(shard_dir, 'reviews.csv') for shard_dir in shard_dirs],
+        os.path.join(run_dir, 'reviews.csv'),
+        fingerprint_file=FINGERPRINT_FILE
+    )
+
+    # Products still pending or failed in the ledger stay due for the next run
+    urls = crawled_urls(get_ledger_file(run_dir))
+    registry = UrlRegistry(REGISTRY_FILE)
+    registry.mark_review_crawled(urls)
+    registry.save()
+    print(f"Merged {len(reviews_df)} reviews from {len(urls)} crawled products")
+
+with DAG(
+    'adore_scraper',
+    default_args=default_args,
+    description='Daily Adore Beauty product discovery and sharded review scrape',
+    schedule_interval='0 2 * * *',  # Run at 2 AM every day
+    catchup=False,
+    max_active_runs=1,  # Runs share the registry and fingerprint store
+    # Shard budgets (seconds, product fetches) bound each shard; None crawls every due product
+    params={
+        'max_pages': 200,
+        'num_shards': 4,
+        'shard_time_budget': None,
+        'shard_max_requests': None,
+        'full_crawl': False,
+        'full_crawl_days': 7,
+    },
+) as dag:
+
+    discover_task = PythonOperator(
+        task_id='discover_products',
+        python_callable=discover_products,
+        pool=SCRAPING_POOL,
+    )
+
+    plan_task = PythonOperator(
+        task_id='plan_review_shards',
+        python_callable=plan_review_shards,
+    )
+
+    scrape_tasks = PythonOperator.partial(
+        task_id='scrape_review_shard',
+        python_callable=scrape_review_shard,
+        pool=SCRAPING_POOL,
+    ).expand(op_kwargs=plan_task.output)
+
+    merge_task = PythonOperator(
+        task_id='merge_review_shards',
+        python_callable=merge_review_shards,
+        trigger_rule='all_done',
+    )
+
+    discover_task >> plan_task >> scrape_tasks >> merge_task
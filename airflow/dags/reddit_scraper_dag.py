@@ -6,7 +6,22 @@ import os
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.ingestion.reddit_scraper import scrape_multiple_subreddits
+from src.ingestion.reddit_scraper import fetch_skipped_comments, scrape_multiple_subreddits
+from src.ingestion.reddit_credentials import CredentialPool
+from src.ingestion.relevance_filter import RelevanceFilter
+from src.ingestion.comment_sampler import CommentSampler
+from src.ingestion.job_ledger import JobLedger
+from src.ingestion.author_enrichment import AuthorCache, enrich_authors
+from src.config import REDDIT_CREDENTIALS
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(PROJECT_DIR, 'data', 'raw')
+
+# Posts skipped by the relevance filter wait here until their comments are fetched
+LEDGER_FILE = os.path.join(RAW_DIR, 'reddit_jobs.db')
+SNAPSHOT_FILE = os.path.join(RAW_DIR, 'product_snapshots.csv')
+REVIEWS_FILE = os.path.join(PROJECT_DIR, 'data', 'processed', 'reviews_history.csv')
+AUTHOR_CACHE_FILE = os.path.join(RAW_DIR, 'reddit_author_cache.json')
 
 default_args = {
     'owner': 'airflow',
@@ -18,34 +33,72 @@ default_args = {
     'retry_delay': timedelta(minutes=5),
 }
 
-def scrape_reddit():
+def scrape_reddit(params):
     """Task to scrape Reddit data"""
     SUBREDDITS = ['AsianBeauty', 'SkincareAddiction', '30PlusSkinCare']
     
+    # Spread subreddits across credentials when more than one app is configured
+    credential_pool = CredentialPool() if len(REDDIT_CREDENTIALS) > 1 else None
+    
+    # Only fetch comment trees for posts that mention the Adore catalog
+    relevance_filter = None
+    if params['relevance_threshold'] is not None:
+        relevance_filter = RelevanceFilter.from_catalog(
+            SNAPSHOT_FILE, REVIEWS_FILE, threshold=params['relevance_threshold']
+        )
+    
+    # Trend-only runs: full trees for a stratified sample, top comments for the rest
+    sampler = None
+    if params['comment_sample_fraction'] is not None:
+        sampler = CommentSampler(fraction=params['comment_sample_fraction'], strata=4)
+    
     posts_df, comments_df = scrape_multiple_subreddits(
         SUBREDDITS,
         time_period='day',
-        limit=100
+        limit=100,
+        credential_pool=credential_pool,
+        relevance_filter=relevance_filter,
+        sampler=sampler
     )
     
+    if relevance_filter is not None:
+        added = relevance_filter.record_skipped(JobLedger(LEDGER_FILE))
+        print(f"Recorded {added} skipped posts for a later comment fetch")
+    
+    # Account age and karma, looked up at most once a week per author
+    if params['enrich_authors']:
+        comments_df = enrich_authors(comments_df, cache=AuthorCache(AUTHOR_CACHE_FILE))
+    
     # Save with date in filename
     date_str = datetime.now().strftime("%Y%m%d")
     
     # Define output directory
-    output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                             'data', 'raw')
+    output_dir = RAW_DIR
     os.makedirs(output_dir, exist_ok=True)
     
     # Save files
     posts_df.to_csv(os.path.join(output_dir, f'reddit_posts_{date_str}.csv'), index=False)
     comments_df.to_csv(os.path.join(output_dir, f'reddit_comments_{date_str}.csv'), index=False)
 
+def fetch_skipped(params):
+    """Task to fetch a bounded number of comment trees the relevance filter skipped"""
+    comments_df = fetch_skipped_comments(JobLedger(LEDGER_FILE), limit=params['skipped_per_run'])
+    if comments_df.empty:
+        return
+    date_str = datetime.now().strftime("%Y%m%d")
+    comments_df.to_csv(os.path.join(RAW_DIR, f'reddit_comments_skipped_{date_str}.csv'), index=False)
+
 with DAG(
     'reddit_scraper',
     default_args=default_args,
     description='Daily Reddit scraper for skincare subreddits',
     schedule_interval='0 20 * * *',  # Run at 8 PM (20:00) every day
-    catchup=False
+    catchup=False,
+    # relevance_threshold (e.g. 2.0) only fetches comment trees for posts that mention
+    # the catalog; comment_sample_fraction=None fetches full trees for every post;
+    # enrich_authors costs one API call per author not looked up in the last week
+    params={'relevance_threshold': None, 'skipped_per_run': 50, 'enrich_authors': False,
+            'comment_sample_fraction': None},
 ) as dag:
 
     scrape_task = PythonOperator(
@@ -53,4 +106,10 @@ with DAG(
         python_callable=scrape_reddit,
     )
 
-    scrape_task 
\ No newline at end of file
+    # Comment trees the relevance filter skipped, skipped_per_run at a time
+    fetch_skipped_task = PythonOperator(
+        task_id='fetch_skipped_comments',
+        python_callable=fetch_skipped,
+    )
+
+    scrape_task >> fetch_skipped_task 
\ No newline at end of file
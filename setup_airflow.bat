@@ -7,9 +7,9 @@ mkdir logs 2>nul
 mkdir plugins 2>nul
 mkdir data 2>nul
 
-REM Copy your DAG file to the dags directory
-echo Copying DAG file...
-copy airflow\dags\reddit_scraper_dag.py dags\
+REM Copy your DAG files to the dags directory
+echo Copying DAG files...
+copy airflow\dags\*.py dags\
 
 REM Copy your source code to the dags directory
 echo Copying source code...
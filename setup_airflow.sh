@@ -3,8 +3,8 @@
 # Create necessary directories
 mkdir -p ./dags ./logs ./plugins ./data
 
-# Copy your DAG file to the dags directory
-cp airflow/dags/reddit_scraper_dag.py ./dags/
+# Copy your DAG files to the dags directory
+cp airflow/dags/*.py ./dags/
 
 # Copy your source code to the dags directory
 mkdir -p ./dags/src
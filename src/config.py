@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -9,6 +10,20 @@ REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
 REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT')
 
+# Additional Reddit apps, each with its own rate budget. REDDIT_CREDENTIALS is a
+# JSON list of {"client_id": ..., "client_secret": ..., "user_agent": ...};
+# without it the single app above is the only credential.
+REDDIT_CREDENTIALS = json.loads(os.getenv('REDDIT_CREDENTIALS') or '[]')
+if not REDDIT_CREDENTIALS and REDDIT_CLIENT_ID:
+    REDDIT_CREDENTIALS = [{
+        'client_id': REDDIT_CLIENT_ID,
+        'client_secret': REDDIT_CLIENT_SECRET,
+        'user_agent': REDDIT_USER_AGENT,
+    }]
+
+# Requests per minute allowed for each Reddit credential
+REDDIT_REQUESTS_PER_MINUTE = int(os.getenv('REDDIT_REQUESTS_PER_MINUTE', '90'))
+
 # Subreddit Configuration
 SUBREDDIT = 'koreanbeauty'
 TIME_PERIOD = 'year'  # 'all', 'year', 'month', 'week', 'day'
@@ -0,0 +1,121 @@
+from collections import deque
+
+import numpy as np
+
+STOP_EXHAUSTED = 'exhausted'
+STOP_ENGAGEMENT = 'engagement_quantile'
+STOP_YIELD = 'comment_yield'
+STOP_MAX_POSTS = 'max_posts'
+
+
+def engagement(post, metric='engagement'):
+    """A post's score, comment count, or both added together, from its listing entry"""
+    if metric == 'score':
+        return post.score
+    if metric == 'num_comments':
+        return post.num_comments
+    return post.score + post.num_comments
+
+class AdaptiveLimit:
+    """
+    Decide how many of a window's posts get their comment trees fetched.
+
+    Instead of a fixed limit, posts listed in the window are ranked by
+    engagement and fetched best first. Fetching stops once the next post's
+    engagement is below the configured quantile of the window, or the rolling
+    number of comments gained per fetch drops below min_yield, never before
+    min_posts and never beyond max_posts. Quiet windows are fetched in full
+    and busy ones go as deep as their engagement justifies.
+
+    Use one instance per window; coverage() reports what was left out.
+    """
+
+    def __init__(self, engagement_quantile=0.5, min_yield=2.0, yield_window=10,
+                 min_posts=10, max_posts=None, metric='engagement'):
+        self.engagement_quantile = engagement_quantile
+        self.min_yield = min_yield
+        self.yield_window = yield_window
+        self.min_posts = min_posts
+        self.max_posts = max_posts
+        self.metric = metric
+
+        self.posts = []
+        self.threshold = None
+        self.recent_yields = deque(maxlen=yield_window)
+        self.fetched = {}  # post id -> comments fetched
+        self.stop_reason = None
+
+    def options(self):
+        """Constructor arguments, for a fresh instance per window"""
+        return {
+            'engagement_quantile': self.engagement_quantile,
+            'min_yield': self.min_yield,
+            'yield_window': self.yield_window,
+            'min_posts': self.min_posts,
+            'max_posts': self.max_posts,
+            'metric': self.metric,
+        }
+
+    def fresh(self):
+        return AdaptiveLimit(**self.options())
+
+    def record(self, post_id, comments):
+        """Report how many comments a fetched post yielded"""
+        self.fetched[post_id] = comments
+        self.recent_yields.append(comments)
+
+    def stop_before(self, post):
+        """Why fetching should stop before this post, or None to fetch it"""
+        fetched = len(self.fetched)
+        if self.max_posts is not None and fetched >= self.max_posts:
+            return STOP_MAX_POSTS
+        if fetched < self.min_posts:
+            return None
+        if self.threshold is not None and engagement(post, self.metric) < self.threshold:
+            return STOP_ENGAGEMENT
+        if (self.min_yield is not None and len(self.recent_yields) == self.yield_window
+                and sum(self.recent_yields) / self.yield_window < self.min_yield):
+            return STOP_YIELD
+        return None
+
+    def select(self, posts):
+        """
+        Yield the window's posts best first until a stop rule fires.
+
+        All of posts is read first (listing pages only, no comment requests).
+        Callers must record() each yielded post before asking for the next.
+        """
+        self.posts = sorted(posts, key=lambda post: engagement(post, self.metric), reverse=True)
+        if self.posts and self.engagement_quantile is not None:
+            values = [engagement(post, self.metric) for post in self.posts]
+            self.threshold = float(np.quantile(values, self.engagement_quantile))
+
+        for post in self.posts:
+            reason = self.stop_before(post)
+            if reason is not None:
+                self.stop_reason = reason
+                return
+            yield post
+        self.stop_reason = STOP_EXHAUSTED
+
+    def coverage(self):
+        """
+        How much of the window was fetched.
+
+        Comment coverage compares comments gained with the comment counts the
+        listing reported for every post in the window.
+        """
+        comments_listed = sum(post.num_comments for post in self.posts)
+        comments_skipped = sum(post.num_comments for post in self.posts if post.id not in self.fetched)
+        comments_fetched = sum(self.fetched.values())
+        return {
+            'posts_in_window': len(self.posts),
+            'posts_fetched': len(self.fetched),
+            'comments_listed': comments_listed,
+            'comments_fetched': comments_fetched,
+            'post_coverage': len(self.fetched) / len(self.posts) if self.posts else 1.0,
+            # Share of the listed comment volume that sits under fetched posts
+            'comment_coverage': 1 - comments_skipped / comments_listed if comments_listed else 1.0,
+            'engagement_threshold': self.threshold,
+            'stop_reason': self.stop_reason,
+        }
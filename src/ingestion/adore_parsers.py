@@ -0,0 +1,109 @@
+"""
+Pure HTML parsing functions for the Adore Beauty scrapers.
+
+These take raw page content and return plain data, with no network or scraper
+state, so they can run in a separate process alongside the network fetchers.
+"""
+import json
+import re
+
+from bs4 import BeautifulSoup
+
+try:
+    from .product_fingerprints import hash_text
+    from .product_snapshots import parse_product_card
+    from .review_store import make_review_id
+except ImportError:
+    from product_fingerprints import hash_text
+    from product_snapshots import parse_product_card
+    from review_store import make_review_id
+
+PRODUCT_CONTAINER_CLASS = 'relative rounded-md border-[1px] border-[#e1dfdf]'
+
+# Pulls the structured-data block straight out of the HTML so unchanged
+# products can be recognised without building a full BeautifulSoup tree
+STRUCTURED_DATA_PATTERN = re.compile(
+    r'<script[^>]*\bid=["\']product_structured_data["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+
+
+def parse_listing_html(html, base_url):
+    """Parse a category listing page into a list of product snapshots"""
+    soup = BeautifulSoup(html, 'html.parser')
+    product_containers = soup.find_all('div', class_=PRODUCT_CONTAINER_CLASS)
+    snapshots = []
+    for container in product_containers:
+        snapshot = parse_product_card(container, base_url)
+        if snapshot:
+            snapshots.append(snapshot)
+    return snapshots
+
+def extract_structured_data(html):
+    """Return the raw product structured-data JSON from a product page"""
+    match = STRUCTURED_DATA_PATTERN.search(html)
+    if match:
+        return match.group(1).strip()
+
+    # Fall back to a full parse if the markup doesn't match the fast path
+    soup = BeautifulSoup(html, 'html.parser')
+    script = soup.find('script', {'id': 'product_structured_data'})
+    if script and script.string:
+        return script.string
+    return None
+
+def get_review_count(product_data):
+    """Get the total review count, preferring the aggregate rating"""
+    count = product_data.get('aggregateRating', {}).get('reviewCount')
+    try:
+        return int(count)
+    except (TypeError, ValueError):
+        return len(product_data.get('review', []))
+
+def extract_reviews(product_data):
+    """Extract reviews from product data into a list of review records"""
+    reviews_data = []
+    for review in product_data.get('review', []):
+        reviews_data.append({
+            # Content-derived ID so the same review keeps its ID across runs
+            'review_id': make_review_id(
+                product_data.get('sku'),
+                review.get('author', {}).get('name'),
+                review.get('datePublished'),
+                review.get('reviewBody')
+            ),
+            'product_sku': product_data.get('sku'),
+            'product_name': product_data.get('name'),
+            'brand': product_data.get('brand', {}).get('name'),
+            'author': review.get('author', {}).get('name'),
+            'title': review.get('name'),
+            'body': review.get('reviewBody'),
+            'rating': review.get('reviewRating', {}).get('ratingValue'),
+            'date_published': review.get('datePublished'),
+        })
+    return reviews_data
+
+def parse_product_html(html, known_data_hash=None):
+    """
+    Parse a product page into review records and change-detection hashes.
+
+    Returns None if the page has no structured data. If the structured data
+    hashes to known_data_hash the JSON isn't parsed at all and the result has
+    data_unchanged set.
+    """
+    structured_data = extract_structured_data(html)
+    if not structured_data:
+        return None
+
+    data_hash = hash_text(structured_data)
+    if known_data_hash is not None and data_hash == known_data_hash:
+        return {'data_hash': data_hash, 'data_unchanged': True}
+
+    product_data = json.loads(structured_data)
+    return {
+        'data_hash': data_hash,
+        'data_unchanged': False,
+        'reviews': extract_reviews(product_data),
+        'review_hash': hash_text(json.dumps(product_data.get('review', []), sort_keys=True)),
+        'review_count': get_review_count(product_data),
+    }
@@ -1,22 +1,59 @@
-import cloudscraper
-from bs4 import BeautifulSoup
+import argparse
+import copy
 import pandas as pd
-import json
 import time
 import random
+import threading
 from datetime import datetime
 import os
 from fake_useragent import UserAgent
 import requests
 from urllib3.exceptions import ProxyError
 
+try:
+    from .product_fingerprints import FingerprintStore
+    from .review_store import merge_reviews
+    from .adore_parsers import extract_reviews, extract_structured_data, get_review_count, parse_product_html
+    from .parse_pipeline import FetchParsePipeline
+    from .proxy_pool import ProxyPool
+    from .throttle import AdaptiveThrottle
+    from .session_cache import SessionCache, create_session
+    from .url_registry import UrlRegistry
+    from .product_snapshots import load_latest_review_counts, load_review_velocity
+    from .crawl_scheduler import CrawlBudget, ReviewCrawlScheduler
+except ImportError:
+    from product_fingerprints import FingerprintStore
+    from review_store import merge_reviews
+    from adore_parsers import extract_reviews, extract_structured_data, get_review_count, parse_product_html
+    from parse_pipeline import FetchParsePipeline
+    from proxy_pool import ProxyPool
+    from throttle import AdaptiveThrottle
+    from session_cache import SessionCache, create_session
+    from url_registry import UrlRegistry
+    from product_snapshots import load_latest_review_counts, load_review_velocity
+    from crawl_scheduler import CrawlBudget, ReviewCrawlScheduler
+
 class AdoreReviewScraper:
-    def __init__(self, use_proxies=False):
+    def __init__(self, use_proxies=False, fingerprint_file=None, throttle=None, session_cache=None):
         self.user_agent = UserAgent()
         self.use_proxies = use_proxies
-        self.proxy_list = self.get_proxy_list() if use_proxies else []
+        # Adaptive request pacing; pass AdaptiveThrottle(adaptive=False) for fixed random sleeps
+        self.throttle = throttle or AdaptiveThrottle(fallback_delay=(2, 5))
+        self.proxy_pool = None
+        if use_proxies:
+            # Validate the downloaded list in the background and start as soon as one works
+            self.proxy_pool = ProxyPool()
+            self.proxy_pool.validate_in_background(self.get_proxy_list())
+            self.proxy_pool.wait_for_healthy(min_count=1, timeout=30)
+        # Optional cache of pre-warmed sessions that makes rotate_identity cheap
+        self.session_cache = session_cache
+        if self.session_cache:
+            self.session_cache.identity_factory = self.new_identity
+            self.session_cache.identity_valid = self.is_identity_valid
+        self.scraper = None
         self.initialize_scraper()
-        self.failed_proxies = set()
+        # Optional change detection store for recurring crawls
+        self.fingerprints = FingerprintStore(fingerprint_file) if fingerprint_file else None
 
     def get_proxy_list(self):
         """Get a list of free proxies"""
@@ -29,126 +66,249 @@ class AdoreReviewScraper:
             return []
 
     def get_random_proxy(self):
-        """Get a random proxy from the list, excluding failed ones"""
-        available_proxies = [p for p in self.proxy_list if p not in self.failed_proxies]
-        if available_proxies:
-            return random.choice(available_proxies)
+        """Get a healthy proxy from the pool, weighted by latency and success rate"""
+        if self.proxy_pool:
+            return self.proxy_pool.get()
+        return None
+
+    def new_identity(self):
+        """Pick a fresh user agent and, if enabled, a proxy"""
+        proxy = self.get_random_proxy() if self.use_proxies else None
+        return self.user_agent.random, proxy
+
+    def is_identity_valid(self, entry):
+        """A cached session is only usable while its proxy hasn't been evicted"""
+        if not self.proxy_pool or not entry.get('proxy'):
+            return True
+        return entry['proxy'] not in self.proxy_pool.evicted
+
+    def get_current_proxy(self):
+        """Return the proxy the current session is bound to, if any"""
+        if self.scraper is not None and self.scraper.proxies:
+            return self.scraper.proxies['http'].split('://')[-1]
         return None
 
-    def initialize_scraper(self):
+    def record_proxy_result(self, success, latency=None):
+        """Feed the outcome of a request back into the proxy pool"""
+        if not self.proxy_pool:
+            return
+        proxy = self.get_current_proxy()
+        if not proxy:
+            return
+        if success:
+            self.proxy_pool.record_success(proxy, latency)
+        else:
+            self.proxy_pool.record_failure(proxy)
+
+    def initialize_scraper(self, healthy=True):
         """Initialize or reinitialize the scraper with new identity"""
-        self.scraper = cloudscraper.create_scraper(
-            browser={
-                'browser': 'chrome',
-                'platform': 'windows',
-                'mobile': False
-            }
-        )
+        if self.session_cache:
+            # Hand the current session back and swap to a pre-warmed one
+            if self.scraper is not None:
+                self.session_cache.release(self.scraper, healthy=healthy)
+            entry, self.scraper = self.session_cache.acquire()
+            if entry.get('proxy'):
+                print(f"Using proxy: {entry['proxy']}")
+            return
         
-        # Update headers
-        self.scraper.headers.update({
-            'User-Agent': self.user_agent.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
-        })
-        
-        # Only add proxy if we're using them
-        if self.use_proxies:
-            proxy = self.get_random_proxy()
-            if proxy:
-                self.scraper.proxies = {
-                    'http': f'http://{proxy}',
-                    'https': f'http://{proxy}'
-                }
-                print(f"Using proxy: {proxy}")
+        user_agent, proxy = self.new_identity()
+        self.scraper = create_session(user_agent, proxy)
+        if proxy:
+            print(f"Using proxy: {proxy}")
 
-    def rotate_identity(self):
+    def rotate_identity(self, healthy=True):
         """Rotate user agent and optionally proxy"""
         print("Rotating identity...")
-        self.initialize_scraper()
-        time.sleep(random.uniform(2, 4))
+        self.initialize_scraper(healthy=healthy)
+        # A cold session has to solve a new challenge, so give it a moment
+        if not self.session_cache:
+            time.sleep(random.uniform(2, 4))
+
+    def fork(self):
+        """
+        A scraper with its own session and identity that shares this one's
+        throttle, proxy pool, session cache and fingerprints, for use by one
+        fetcher thread.
+        """
+        worker = copy.copy(self)
+        worker.scraper = None
+        worker.initialize_scraper()
+        return worker
 
     def extract_reviews(self, product_data):
         """Extract reviews from product data into a separate DataFrame"""
-        reviews = product_data.get('review', [])
-        reviews_data = []
-        
-        for review in reviews:
-            review_data = {
-                'review_id': hash(review.get('reviewBody', '')),  # Create unique ID
-                'product_sku': product_data.get('sku'),
-                'product_name': product_data.get('name'),
-                'brand': product_data.get('brand', {}).get('name'),
-                'author': review.get('author', {}).get('name'),
-                'title': review.get('name'),
-                'body': review.get('reviewBody'),
-                'rating': review.get('reviewRating', {}).get('ratingValue'),
-                'date_published': review.get('datePublished'),
-            }
-            reviews_data.append(review_data)
-            
-        return reviews_data
+        return extract_reviews(product_data)
 
-    def get_product_reviews(self, url, max_retries=3):
-        """Extract product data and reviews from a product page"""
+    def get_review_count(self, product_data):
+        """Get the total review count, preferring the aggregate rating"""
+        return get_review_count(product_data)
+
+    def extract_structured_data(self, html):
+        """Return the raw product structured-data JSON from a product page"""
+        return extract_structured_data(html)
+
+    def known_data_hash(self, url):
+        """Structured-data hash from the last crawl, used to skip re-parsing"""
+        if not self.fingerprints:
+            return None
+        fingerprint = self.fingerprints.get(url)
+        return fingerprint.get('data_hash') if fingerprint else None
+
+    def fetch_product_page(self, url, max_retries=3):
+        """Fetch a product page, returning the response or None after repeated failures"""
         retries = 0
         while retries < max_retries:
             try:
-                # Random delay between requests
-                time.sleep(random.uniform(2, 5))
+                # Wait for the next request slot from the throttle
+                self.throttle.wait()
+                
+                # Send validators from the last crawl so unchanged pages can return 304
+                headers = self.fingerprints.conditional_headers(url) if self.fingerprints else {}
                 
                 # Get the page
-                response = self.scraper.get(url, timeout=10)
+                request_start = time.time()
+                response = self.scraper.get(url, timeout=10, headers=headers or None)
+                self.throttle.record(response.status_code)
                 
-                if response.status_code in [403, 429, 503]:
+                if response.status_code in [403, 429] or response.status_code >= 500:
                     retries += 1
                     print(f"Got error {response.status_code} (attempt {retries}/{max_retries})")
-                    self.rotate_identity()
-                    time.sleep(random.uniform(5, 10))
+                    self.record_proxy_result(False)
+                    self.rotate_identity(healthy=False)
+                    # The adaptive throttle has already backed off; the fallback needs an explicit pause
+                    if not self.throttle.adaptive:
+                        time.sleep(random.uniform(5, 10))
                     continue
-                    
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
                 
-                # Find the script containing product data
-                script = soup.find('script', {'id': 'product_structured_data'})
-                if not script:
-                    print(f"No product data found for {url}")
+                # The proxy delivered a response, even if it's a dead product page
+                self.record_proxy_result(True, time.time() - request_start)
+                if response.status_code >= 400:
+                    print(f"Got error {response.status_code} for {url}, not retrying")
                     return None
-                
-                # Parse the JSON data
-                product_data = json.loads(script.string)
-                reviews_data = self.extract_reviews(product_data)
-                return reviews_data
+                return response
                 
             except ProxyError as e:
                 print(f"Proxy error: {str(e)}")
-                if self.scraper.proxies:
-                    current_proxy = self.scraper.proxies['http'].split('://')[-1]
-                    self.failed_proxies.add(current_proxy)
+                current_proxy = self.get_current_proxy()
+                if current_proxy:
+                    self.record_proxy_result(False)
                     print(f"Marked proxy as failed: {current_proxy}")
-                self.rotate_identity()
+                self.rotate_identity(healthy=False)
                 continue
                 
             except Exception as e:
                 print(f"Error processing {url}: {str(e)}")
+                # Only network failures say anything about the proxy
+                connection_error = isinstance(
+                    e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                )
+                if connection_error:
+                    self.record_proxy_result(False)
                 retries += 1
                 if retries < max_retries:
-                    self.rotate_identity()
+                    self.rotate_identity(healthy=not connection_error)
                     continue
                 return None
         
         print(f"Failed to process {url} after {max_retries} attempts")
         return None
 
-    def scrape_reviews_from_urls(self, urls, output_file=None):
-        """Scrape reviews for a list of URLs"""
+    def process_product_page(self, url, response, parsed):
+        """
+        Apply change detection to a fetched and parsed product page.
+
+        Returns the product's reviews, an empty list if they haven't changed
+        since the last crawl, or None if the page had no product data.
+        """
+        if response.status_code == 304:
+            print(f"Not modified since last crawl: {url}")
+            self.fingerprints.touch(url, response)
+            return []
+        
+        if parsed is None:
+            print(f"No product data found for {url}")
+            return None
+        
+        # The structured data was byte-for-byte unchanged, so it wasn't parsed
+        if parsed['data_unchanged']:
+            print(f"Product data unchanged since last crawl: {url}")
+            self.fingerprints.touch(url, response)
+            return []
+        
+        if self.fingerprints:
+            unchanged = self.fingerprints.reviews_unchanged(url, parsed['review_hash'], parsed['review_count'])
+            self.fingerprints.update(
+                url, response, parsed['data_hash'], parsed['review_hash'], parsed['review_count'],
+                changed=not unchanged
+            )
+            if unchanged:
+                print(f"Reviews unchanged since last crawl: {url}")
+                return []
+        
+        return parsed['reviews']
+
+    def get_product_reviews(self, url, max_retries=3):
+        """Extract product data and reviews from a product page"""
+        response = self.fetch_product_page(url, max_retries)
+        if response is None:
+            return None
+        
+        try:
+            parsed = None
+            if response.status_code != 304:
+                parsed = parse_product_html(response.text, self.known_data_hash(url))
+            return self.process_product_page(url, response, parsed)
+        except Exception as e:
+            print(f"Error processing {url}: {str(e)}")
+            return None
+
+    def review_count_unchanged(self, url, listing_counts):
+        """
+        True if a listing snapshot taken since our last crawl shows the same
+        review count. Older snapshots can't vouch for reviews added since.
+        """
+        if not self.fingerprints or not listing_counts or url not in listing_counts:
+            return False
+        fingerprint = self.fingerprints.get(url)
+        if not fingerprint or not fingerprint.get('last_checked'):
+            return False
+        listing = listing_counts[url]
+        return (
+            listing['crawled_at'] > datetime.fromisoformat(fingerprint['last_checked'])
+            and fingerprint.get('review_count') == listing['review_count']
+        )
+
+    def scrape_reviews_from_urls(self, urls, output_file=None, listing_counts=None,
+                                 time_budget=None, max_requests=None):
+        """
+        Scrape reviews for a list of URLs.
+
+        listing_counts maps product URLs to the review counts shown on listing
+        pages (see load_latest_review_counts); products whose count matches the
+        last crawl are skipped without fetching their page. time_budget (seconds) and max_requests (product
+        fetches) stop the run early, so URLs should be passed in priority order.
+        """
         all_reviews = []
+        # URLs that were fetched successfully, whether or not they had new reviews
+        self.crawled_urls = []
+        skipped = 0
+        budget = CrawlBudget(time_budget, max_requests)
         
         for i, url in enumerate(urls, 1):
+            if budget.exhausted():
+                break
+            
+            if self.review_count_unchanged(url, listing_counts):
+                # Checked via the listing, so it counts as crawled
+                self.crawled_urls.append(url)
+                skipped += 1
+                continue
+            
             print(f"\nProcessing product {i}/{len(urls)}: {url}")
+            budget.spend()
             reviews_data = self.get_product_reviews(url)
+            if reviews_data is not None:
+                self.crawled_urls.append(url)
             
             if reviews_data:
                 all_reviews.extend(reviews_data)
@@ -157,15 +317,32 @@ class AdoreReviewScraper:
                 # Save progress more frequently (every 5 products)
                 if i % 5 == 0:
                     self.save_reviews(all_reviews, output_file, interim=True)
+                    if self.fingerprints:
+                        self.fingerprints.save()
+                    if self.session_cache:
+                        self.session_cache.save()
                     
                 # Rotate identity periodically
                 if i % 10 == 0:
                     self.rotate_identity()
+                    print(f"Throttle: {self.throttle.stats()}")
             
-            # Random delay between products
-            sleep_time = random.uniform(3, 7)
-            print(f"Waiting {sleep_time:.1f} seconds before next product...")
-            time.sleep(sleep_time)
+            # Pacing is handled by the throttle; only the fixed fallback sleeps between products
+            if not self.throttle.adaptive:
+                sleep_time = random.uniform(3, 7)
+                print(f"Waiting {sleep_time:.1f} seconds before next product...")
+                time.sleep(sleep_time)
+        
+        if skipped:
+            print(f"Skipped {skipped} products whose listing review count hasn't changed")
+        
+        # Persist fingerprints so the next crawl can skip unchanged products
+        if self.fingerprints:
+            self.fingerprints.save()
+        
+        # Persist warmed sessions so the next run can reuse their clearances
+        if self.session_cache:
+            self.session_cache.save()
         
         # Save final results
         if all_reviews:
@@ -173,6 +350,85 @@ class AdoreReviewScraper:
         
         return pd.DataFrame()
 
+    def scrape_reviews_parallel(self, urls, output_file=None, listing_counts=None,
+                                fetch_workers=4, parse_workers=None, time_budget=None, max_requests=None):
+        """
+        Scrape reviews with fetching and parsing running as separate stages.
+
+        fetch_workers threads fetch product pages (still paced by the shared
+        throttle) while a pool of parse_workers processes parses them, so
+        network waits and HTML parsing overlap instead of alternating. Each
+        fetcher thread uses its own fork() of the scraper, so rotating one
+        thread's identity never swaps the session under another's request and
+        proxy results are charged to the proxy that was actually used.
+        time_budget and max_requests work as in scrape_reviews_from_urls.
+        """
+        all_reviews = []
+        self.crawled_urls = []
+        
+        pending = []
+        for url in urls:
+            if self.review_count_unchanged(url, listing_counts):
+                self.crawled_urls.append(url)
+            else:
+                pending.append(url)
+        if len(pending) < len(urls):
+            print(f"Skipped {len(urls) - len(pending)} products whose listing review count hasn't changed")
+        
+        budget = CrawlBudget(time_budget, max_requests)
+        local = threading.local()
+        workers = []
+        workers_lock = threading.Lock()
+        
+        def fetch(url):
+            if not budget.spend():
+                return None
+            worker = getattr(local, 'worker', None)
+            if worker is None:
+                worker = local.worker = self.fork()
+                with workers_lock:
+                    workers.append(worker)
+            response = worker.fetch_product_page(url)
+            if response is None:
+                return None
+            if response.status_code == 304:
+                return response, None
+            # Only the page text and known hash are sent to the parse process
+            return response, (response.text, self.known_data_hash(url))
+        
+        def handle(url, response, parsed):
+            if response is None:
+                # Stop fetching once the budget is spent
+                return False if budget.exhausted() else None
+            reviews_data = self.process_product_page(url, response, parsed)
+            if reviews_data is not None:
+                self.crawled_urls.append(url)
+            if reviews_data:
+                all_reviews.extend(reviews_data)
+                print(f"Found {len(reviews_data)} reviews for {url}")
+        
+        pipeline = FetchParsePipeline(
+            fetch, parse_product_html, handle,
+            fetch_workers=fetch_workers, parse_workers=parse_workers
+        )
+        pipeline.run(pending)
+        print(f"Throttle: {self.throttle.stats()}")
+        
+        # Hand the fetcher threads' sessions back for reuse
+        if self.session_cache:
+            for worker in workers:
+                self.session_cache.release(worker.scraper)
+        
+        if self.fingerprints:
+            self.fingerprints.save()
+        if self.session_cache:
+            self.session_cache.save()
+        
+        if all_reviews:
+            return self.save_reviews(all_reviews, output_file)
+        
+        return pd.DataFrame()
+
     def save_reviews(self, reviews_data, output_file=None, interim=False):
         """Save reviews to CSV file"""
         # Create DataFrame
@@ -198,11 +454,24 @@ class AdoreReviewScraper:
         return reviews_df
 
 if __name__ == "__main__":
-    scraper = AdoreReviewScraper(use_proxies=False)
+    parser = argparse.ArgumentParser(description='Scrape Adore Beauty product reviews')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Stop after this many seconds; products are crawled in priority order')
+    parser.add_argument('--max-requests', type=int, default=None,
+                        help='Stop after fetching this many product pages')
+    parser.add_argument('--fetch-workers', type=int, default=1,
+                        help='Fetch with this many threads and parse in a process pool')
+    args = parser.parse_args()
     
     # Find most recent product URLs file with explicit path handling
     raw_data_dir = os.path.join(os.getcwd(), "data", "raw")
     
+    scraper = AdoreReviewScraper(
+        use_proxies=False,
+        fingerprint_file=os.path.join(raw_data_dir, "product_fingerprints.json"),
+        session_cache=SessionCache(os.path.join(raw_data_dir, "session_cache.json"))
+    )
+    
     # Create directory if it doesn't exist
     if not os.path.exists(raw_data_dir):
         print(f"Creating directory: {raw_data_dir}")
@@ -210,33 +479,45 @@ if __name__ == "__main__":
     
     print(f"Looking for URL files in: {raw_data_dir}")
     
+    # Prefer the URL registry, which knows which products are new or due a recrawl
+    registry_file = os.path.join(raw_data_dir, "product_url_registry.json")
+    registry = UrlRegistry(registry_file) if os.path.exists(registry_file) else None
+    
     try:
-        url_files = [f for f in os.listdir(raw_data_dir) if f.startswith('product_urls_')]
+        if registry:
+            urls = registry.urls_for_review_crawl()
+            print(f"Loaded {len(urls)} new or due URLs from {registry_file}")
+            
+            if not urls:
+                print("No products are due for a review crawl")
+                exit()
+        else:
+            url_files = [f for f in os.listdir(raw_data_dir) if f.startswith('product_urls_') and f.endswith('.txt')]
         
-        if not url_files:
-            print("No product URL files found!")
-            print(f"Current directory contents: {os.listdir(raw_data_dir)}")
-            exit()
+            if not url_files:
+                print("No product URL files found!")
+                print(f"Current directory contents: {os.listdir(raw_data_dir)}")
+                exit()
         
-        latest_url_file = sorted(url_files)[-1]
-        url_filepath = os.path.join(raw_data_dir, latest_url_file)
+            latest_url_file = sorted(url_files)[-1]
+            url_filepath = os.path.join(raw_data_dir, latest_url_file)
         
-        print(f"Loading URLs from: {latest_url_file}")
+            print(f"Loading URLs from: {latest_url_file}")
         
-        # Read URLs with error handling
-        try:
-            with open(url_filepath, 'r') as f:
-                urls = [line.strip() for line in f if line.strip()]
+            # Read URLs with error handling
+            try:
+                with open(url_filepath, 'r') as f:
+                    urls = [line.strip() for line in f if line.strip()]
             
-            print(f"Found {len(urls)} URLs to process")
+                print(f"Found {len(urls)} URLs to process")
             
-            if not urls:
-                print("URL file is empty!")
-                exit()
+                if not urls:
+                    print("URL file is empty!")
+                    exit()
                 
-        except Exception as e:
-            print(f"Error reading URL file: {str(e)}")
-            exit()
+            except Exception as e:
+                print(f"Error reading URL file: {str(e)}")
+                exit()
         
         # Create output filename based on input filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -247,21 +528,51 @@ if __name__ == "__main__":
         
         print(f"\nWill save results to: {output_file}")
         
+        # Crawl the products most likely to have new reviews first
+        snapshot_file = os.path.join(raw_data_dir, "product_snapshots.csv")
+        scheduler = ReviewCrawlScheduler(
+            fingerprints=scraper.fingerprints,
+            velocity=load_review_velocity(snapshot_file)
+        )
+        urls = scheduler.order(urls)
+        
         try:
-            # Scrape reviews with periodic saving
-            reviews_df = scraper.scrape_reviews_from_urls(
-                urls=urls,
-                output_file=output_file
-            )
+            if args.fetch_workers > 1:
+                # Overlap fetching and parsing; results are saved at the end
+                reviews_df = scraper.scrape_reviews_parallel(
+                    urls=urls,
+                    output_file=output_file,
+                    listing_counts=load_latest_review_counts(snapshot_file),
+                    fetch_workers=args.fetch_workers,
+                    time_budget=args.time_budget,
+                    max_requests=args.max_requests
+                )
+            else:
+                # Scrape reviews with periodic saving
+                reviews_df = scraper.scrape_reviews_from_urls(
+                    urls=urls,
+                    output_file=output_file,
+                    listing_counts=load_latest_review_counts(snapshot_file),
+                    time_budget=args.time_budget,
+                    max_requests=args.max_requests
+                )
             
             print("\nScraping completed!")
             print(f"Total reviews collected: {len(reviews_df)}")
             
+            # Append only previously unseen reviews to the review history
+            merge_reviews(reviews_df)
+            
         except KeyboardInterrupt:
             print("\nScraping interrupted by user. Partial results have been saved.")
         except Exception as e:
             print(f"\nError during scraping: {str(e)}")
             print("Partial results have been saved.")
+        
+        # Record which products were crawled, including partial runs
+        if registry:
+            registry.mark_review_crawled(getattr(scraper, 'crawled_urls', []))
+            registry.save()
             
     except Exception as e:
         print(f"Critical error: {str(e)}")
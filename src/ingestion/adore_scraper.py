@@ -1,17 +1,47 @@
 import cloudscraper
-from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
-import time
 import os
-import sys
-from urllib.parse import urljoin
-import random
+from urllib.parse import urljoin, urlparse
+import argparse
+import gzip
+import io
+import itertools
+import xml.etree.ElementTree as ET
+
+SITEMAP_LOC_TAGS = ('loc', '{http://www.sitemaps.org/schemas/sitemap/0.9}loc')
+
+LISTING_SOURCE = 'adore_listing'
+
+try:
+    from .throttle import AdaptiveThrottle
+    from .url_registry import UrlRegistry
+    from .product_snapshots import save_snapshots
+    from .adore_parsers import parse_listing_html
+    from .parse_pipeline import FetchParsePipeline
+    from .job_ledger import DONE, default_worker_id
+except ImportError:
+    from throttle import AdaptiveThrottle
+    from url_registry import UrlRegistry
+    from product_snapshots import save_snapshots
+    from adore_parsers import parse_listing_html
+    from parse_pipeline import FetchParsePipeline
+    from job_ledger import DONE, default_worker_id
+
+def get_category_slug(category_url):
+    """Get the category slug from a URL like .../c/skin-care/moisturisers.html"""
+    path = urlparse(category_url).path
+    if '/c/' in path:
+        path = path.split('/c/', 1)[1]
+    return path.strip('/').rsplit('.', 1)[0]
 
 class AdoreBeautyScraper:
-    def __init__(self):
+    def __init__(self, throttle=None, category_url=None):
         self.base_url = "https://www.adorebeauty.com.au"
-        self.skincare_url = "https://www.adorebeauty.com.au/c/skin-care.html"
+        # Defaults to skin care; other category roots can be passed in
+        self.skincare_url = category_url or "https://www.adorebeauty.com.au/c/skin-care.html"
+        self.category_slug = get_category_slug(self.skincare_url)
+        # Query string that sorts a category listing newest-first
+        self.newest_sort = "product_list_order=new"
         # Create a cloudscraper session
         self.scraper = cloudscraper.create_scraper(
             browser={
@@ -21,35 +51,56 @@ class AdoreBeautyScraper:
             }
         )
         self.product_urls = set()
+        self.product_snapshots = {}  # Listing-card metadata keyed by product URL
+        self.last_page_urls = []  # Product URLs found on the most recent listing page
         self.consecutive_errors = 0  # Track consecutive errors
+        # Whether the last collect_all_product_urls saw the whole category
+        self.reached_end = False
+        # Adaptive request pacing; pass AdaptiveThrottle(adaptive=False) for fixed random sleeps
+        self.throttle = throttle or AdaptiveThrottle(initial_rate=0.5, fallback_delay=(1, 3))
 
-    def get_product_urls_from_page(self, page_number):
-        """Extract product URLs from a single page"""
+    def get_listing_url(self, page_number, sort=None):
         url = f"{self.skincare_url}?p={page_number}"
+        if sort:
+            url = f"{url}&{sort}"
+        return url
+
+    def fetch_listing_page(self, page_number, sort=None):
+        """Fetch a listing page and return its HTML"""
+        # Use cloudscraper instead of requests
+        self.throttle.wait()
+        response = self.scraper.get(self.get_listing_url(page_number, sort))
+        self.throttle.record(response.status_code)
+        response.raise_for_status()
+        return response.text
+
+    def add_snapshots(self, snapshots):
+        """Record the products parsed from one listing page"""
+        self.last_page_urls = []
+        for snapshot in snapshots:
+            self.product_urls.add(snapshot['url'])
+            self.product_snapshots[snapshot['url']] = snapshot
+            self.last_page_urls.append(snapshot['url'])
+
+    def get_product_urls_from_page(self, page_number, sort=None):
+        """Extract product URLs from a single page"""
         print(f"Scanning page {page_number}...")
+        self.last_page_urls = []
         
         try:
-            # Use cloudscraper instead of requests
-            response = self.scraper.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            html = self.fetch_listing_page(page_number, sort)
             
-            # Find all product containers
-            product_containers = soup.find_all('div', class_='relative rounded-md border-[1px] border-[#e1dfdf]')
+            # Extract the URL and listing metadata (price, rating, review count) from each product card
+            snapshots = parse_listing_html(html, self.base_url)
             
             # Reset consecutive errors on success
-            if len(product_containers) > 0:
+            if len(snapshots) > 0:
                 self.consecutive_errors = 0
             
-            # Extract URLs from each container
-            for container in product_containers:
-                product_link = container.find('a', href=True)
-                if product_link and '/p/' in product_link['href']:
-                    full_url = urljoin(self.base_url, product_link['href'])
-                    self.product_urls.add(full_url)
+            self.add_snapshots(snapshots)
             
-            print(f"Found {len(product_containers)} products on page {page_number}")
-            return len(product_containers) > 0  # Return True if products were found
+            print(f"Found {len(snapshots)} products on page {page_number}")
+            return len(snapshots) > 0  # Return True if products were found
             
         except Exception as e:
             print(f"Error processing page {page_number}: {str(e)}")
@@ -57,9 +108,164 @@ class AdoreBeautyScraper:
             print(f"Consecutive errors: {self.consecutive_errors}")
             return True  # Return True to continue to next page
 
-    def collect_all_product_urls(self, max_pages=None):
-        """Iterate through all pages and collect product URLs"""
+    def get_sitemap_urls(self):
+        """Find sitemap URLs from robots.txt, defaulting to /sitemap.xml"""
+        sitemap_urls = []
+        try:
+            response = self.scraper.get(urljoin(self.base_url, "/robots.txt"), timeout=15)
+            response.raise_for_status()
+            for line in response.text.splitlines():
+                if line.lower().startswith('sitemap:'):
+                    sitemap_urls.append(line.split(':', 1)[1].strip())
+        except Exception as e:
+            print(f"Could not read robots.txt: {str(e)}")
+        return sitemap_urls or [urljoin(self.base_url, "/sitemap.xml")]
+
+    def open_sitemap(self, url):
+        """Open a sitemap as a byte stream, transparently un-gzipping it"""
+        self.throttle.wait()
+        response = self.scraper.get(url, stream=True, timeout=30)
+        self.throttle.record(response.status_code)
+        response.raise_for_status()
+
+        # Cloudflare challenge handling may already have read the body
+        if getattr(response, '_content_consumed', False):
+            stream = io.BufferedReader(io.BytesIO(response.content))
+        else:
+            response.raw.decode_content = True
+            stream = io.BufferedReader(response.raw)
+
+        # Gzipped sitemaps are served as files, not with Content-Encoding
+        if stream.peek(2)[:2] == b'\x1f\x8b':
+            stream = gzip.GzipFile(fileobj=stream)
+        return stream
+
+    def iter_sitemap(self, url):
+        """
+        Stream (kind, loc) pairs from a sitemap without loading it into memory.
+
+        kind is 'sitemap' for entries of a sitemap index and 'url' for pages.
+        """
+        stream = self.open_sitemap(url)
+        kind = None
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if event == 'start':
+                if kind is None:
+                    kind = 'sitemap' if tag == 'sitemapindex' else 'url'
+                continue
+            # Ignore image:loc and other extension tags
+            if element.tag in SITEMAP_LOC_TAGS and element.text:
+                yield kind, element.text.strip()
+            elif tag in ('url', 'sitemap'):
+                # Free finished entries so memory stays flat on large sitemaps
+                element.clear()
+
+    def collect_product_urls_from_sitemap(self, sitemap_urls=None):
+        """
+        Collect product URLs from the sitemap index.
+
+        Product URLs don't include their category, so only sitemaps named
+        after the category (and anything they link to) are read. If the index
+        has no such sitemap nothing is collected, so the caller falls back to
+        the category-scoped listing crawl instead of taking in the whole
+        catalogue.
+        """
+        # Each pending sitemap is paired with whether it belongs to the category
+        pending = [(url, self.category_slug in url) for url in (sitemap_urls or self.get_sitemap_urls())]
+        visited = set()
+        found = 0
+
+        while pending:
+            sitemap_url, scoped = pending.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            print(f"Reading sitemap {sitemap_url}...")
+
+            children = []
+            for kind, loc in self.iter_sitemap(sitemap_url):
+                if kind == 'sitemap':
+                    children.append(loc)
+                elif scoped and '/p/' in loc:
+                    if loc not in self.product_urls:
+                        self.product_urls.add(loc)
+                        found += 1
+
+            if not scoped:
+                children = [c for c in children if self.category_slug in c]
+                if not children:
+                    print(f"No {self.category_slug} sitemap in {sitemap_url}")
+            pending.extend((child, True) for child in children)
+
+        print(f"Found {found} product URLs in {len(visited)} sitemaps")
+        return found
+
+    def get_product_urls_from_ledger(self, ledger, page_number):
+        """
+        Get a listing page through the job ledger.
+
+        Pages completed on an earlier attempt are replayed from their stored
+        snapshots instead of being fetched again. Returns the same as
+        get_product_urls_from_page.
+        """
+        unit = f"{self.category_slug}:{page_number}"
+        if ledger.status(LISTING_SOURCE, unit) == DONE:
+            snapshots = ledger.result(LISTING_SOURCE, unit) or []
+            self.add_snapshots(snapshots)
+            print(f"Page {page_number} already collected ({len(snapshots)} products)")
+            return len(snapshots) > 0
+
+        ledger.add(LISTING_SOURCE, [unit], partition=self.category_slug)
+        worker_id = default_worker_id()
+        if not ledger.start(LISTING_SOURCE, unit, worker_id):
+            # This crawl still needs the page's URLs, but the ledger entry is the other worker's
+            print(f"Page {page_number} is leased by another worker, fetching it without recording it")
+            return self.get_product_urls_from_page(page_number)
+
+        errors_before = self.consecutive_errors
+        found_products = self.get_product_urls_from_page(page_number)
+
+        # get_product_urls_from_page swallows errors and only counts them
+        if self.consecutive_errors > errors_before:
+            ledger.fail(LISTING_SOURCE, unit, error="listing page failed", worker_id=worker_id)
+        else:
+            snapshots = [self.product_snapshots[url] for url in self.last_page_urls]
+            ledger.complete(LISTING_SOURCE, unit, result=snapshots, worker_id=worker_id)
+        return found_products
+
+    def collect_all_product_urls(self, max_pages=None, use_sitemap=False, ledger=None, fetch_workers=1):
+        """
+        Iterate through all pages and collect product URLs.
+
+        With a JobLedger, each listing page is a work item, so a rerun replays
+        pages it already has instead of fetching them again. Without one,
+        fetch_workers > 1 pages through the listing with
+        collect_product_urls_parallel.
+        
+        Sets reached_end to True only if the whole category was seen: the
+        sitemap was read in full, or paging ran to an empty page with no
+        failed pages on the way. Only then may missing products be marked gone.
+        The sitemap has no listing cards, so with use_sitemap no product
+        snapshots are collected.
+        """
+        self.reached_end = False
+        if use_sitemap:
+            # One streamed sitemap read replaces hundreds of listing page loads
+            try:
+                if self.collect_product_urls_from_sitemap() > 0:
+                    self.reached_end = True
+                    print(f"\nTotal unique product URLs collected: {len(self.product_urls)}")
+                    return list(self.product_urls)
+                print(f"Sitemap had no {self.category_slug} product URLs, falling back to paginated crawl")
+            except Exception as e:
+                print(f"Sitemap unavailable ({str(e)}), falling back to paginated crawl")
+
+        if ledger is None and fetch_workers > 1:
+            return self.collect_product_urls_parallel(max_pages, fetch_workers)
+        
         page_number = 1
+        failed_pages = 0
         
         while True:
             if max_pages and page_number > max_pages:
@@ -70,25 +276,124 @@ class AdoreBeautyScraper:
                 print("Too many consecutive errors. Stopping...")
                 break
             
-            # Random delay between pages
-            if page_number > 1:
-                delay = random.uniform(1, 3)
-                print(f"Waiting {delay:.1f} seconds...")
-                time.sleep(delay)
+            # Report the adaptive request rate every few pages
+            if page_number % 10 == 0:
+                print(f"Throttle: {self.throttle.stats()}")
             
             # Get URLs from current page
-            found_products = self.get_product_urls_from_page(page_number)
+            errors_before = self.consecutive_errors
+            if ledger is not None:
+                found_products = self.get_product_urls_from_ledger(ledger, page_number)
+            else:
+                found_products = self.get_product_urls_from_page(page_number)
+            # Failed pages are skipped rather than ending the crawl
+            if self.consecutive_errors > errors_before:
+                failed_pages += 1
             
             # If no products found, stop
             if not found_products:
                 print(f"No more products found after page {page_number-1}")
+                self.reached_end = failed_pages == 0
                 break
                 
             page_number += 1
         
+        if not self.reached_end:
+            print(f"Listing crawl ended early ({failed_pages} failed pages), so no products will be marked gone")
+        print(f"\nTotal unique product URLs collected: {len(self.product_urls)}")
+        return list(self.product_urls)
+
+    def collect_product_urls_parallel(self, max_pages=200, fetch_workers=4, parse_workers=None):
+        """
+        Collect product URLs with listing fetches and parsing running as separate stages.
+
+        Pages are fetched in order by fetch_workers threads and parsed in a pool
+        of parse_workers processes. Fetching stops at the first empty page, so a
+        few pages past the end may be requested. Sets reached_end like
+        collect_all_product_urls.
+        """
+        last_page = [max_pages or float('inf')]  # Lowest page known to be past the end
+        failed_pages = []
+        self.reached_end = False
+
+        def fetch(page_number):
+            if page_number > last_page[0]:
+                return None
+            print(f"Scanning page {page_number}...")
+            return None, (self.fetch_listing_page(page_number), self.base_url)
+
+        def handle(page_number, context, snapshots):
+            if snapshots is None:
+                if page_number <= last_page[0]:
+                    print(f"Error processing page {page_number}")
+                    failed_pages.append(page_number)
+                    self.consecutive_errors += 1
+                    if self.consecutive_errors >= 5:
+                        print("Too many consecutive errors. Stopping...")
+                        return False
+                return
+            if not snapshots:
+                last_page[0] = min(last_page[0], page_number - 1)
+                return False
+            self.consecutive_errors = 0
+            self.add_snapshots(snapshots)
+            print(f"Found {len(snapshots)} products on page {page_number}")
+
+        pipeline = FetchParsePipeline(
+            fetch, parse_listing_html, handle,
+            fetch_workers=fetch_workers, parse_workers=parse_workers
+        )
+        pipeline.run(range(1, max_pages + 1) if max_pages else itertools.count(1))
+
+        # Only pages before the end count; ones fetched past it are expected to fail
+        failed = [page for page in failed_pages if page <= last_page[0]]
+        self.reached_end = last_page[0] != (max_pages or float('inf')) and not failed
+        if not self.reached_end:
+            print(f"Listing crawl ended early ({len(failed)} failed pages), so no products will be marked gone")
         print(f"\nTotal unique product URLs collected: {len(self.product_urls)}")
+        print(f"Throttle: {self.throttle.stats()}")
         return list(self.product_urls)
 
+    def collect_new_product_urls(self, registry, max_pages=50, patience=1):
+        """
+        Incrementally collect products added since the last crawl.
+
+        Walks the category sorted by newest and stops as soon as `patience`
+        consecutive pages contain only URLs already in the registry, so a daily
+        run usually needs a couple of requests instead of a full crawl.
+        Returns the list of URLs not yet in the registry.
+        """
+        new_urls = []
+        known_pages = 0
+        page_number = 1
+
+        while page_number <= max_pages:
+            if self.consecutive_errors >= 5:
+                print("Too many consecutive errors. Stopping...")
+                break
+
+            found_products = self.get_product_urls_from_page(page_number, sort=self.newest_sort)
+            if not found_products:
+                print(f"No more products found after page {page_number-1}")
+                break
+
+            # Pages that failed to load have no URLs and don't count towards stopping
+            if self.last_page_urls:
+                page_new = [url for url in self.last_page_urls if url not in registry]
+                new_urls.extend(page_new)
+                if page_new:
+                    known_pages = 0
+                else:
+                    known_pages += 1
+                    if known_pages >= patience:
+                        print(f"Page {page_number} only has known products, stopping")
+                        break
+
+            page_number += 1
+
+        print(f"\nFound {len(new_urls)} new product URLs in {page_number} pages")
+        return new_urls
+
     def save_urls_to_file(self, filename=None):
         """Save collected URLs to a file"""
         if filename is None:
@@ -105,12 +410,56 @@ class AdoreBeautyScraper:
         
         print(f"Saved {len(self.product_urls)} URLs to {filepath}")
 
+    def save_product_snapshots(self, snapshot_file="data/raw/product_snapshots.csv"):
+        """Append the listing-card metadata from this crawl to the snapshot table"""
+        return save_snapshots(self.product_snapshots.values(), snapshot_file)
+
+    def update_registry(self, registry, complete=True):
+        """Record collected URLs in the URL registry and return the delta"""
+        delta = registry.update(self.product_urls, complete=complete)
+        print(
+            f"URL registry: {len(delta['new'])} new, {len(delta['returned'])} returned, "
+            f"{len(delta['gone'])} gone, {len(delta['unchanged'])} unchanged"
+        )
+        return delta
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Collect Adore Beauty skincare product URLs')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only crawl newest products until a page of known URLs is reached')
+    parser.add_argument('--max-pages', type=int, default=200,
+                        help='Maximum number of listing pages to crawl')
+    parser.add_argument('--use-sitemap', action='store_true',
+                        help='Read product URLs from the sitemap instead of listing pages '
+                             '(faster, but refreshes no listing snapshots)')
+    parser.add_argument('--fetch-workers', type=int, default=1,
+                        help='Fetch listing pages with this many threads and parse them in a process pool')
+    args = parser.parse_args()
+    
     # Initialize scraper
     scraper = AdoreBeautyScraper()
+    registry = UrlRegistry()
+    
+    # An incremental crawl needs a registry from a previous full crawl to compare against
+    incremental = args.incremental and len(registry) > 0
+    if args.incremental and not incremental:
+        print("URL registry is empty, running a full crawl instead")
+    
+    if incremental:
+        scraper.collect_new_product_urls(registry, max_pages=args.max_pages)
+    else:
+        # Paging through listings also refreshes every product's snapshot
+        scraper.collect_all_product_urls(max_pages=args.max_pages, use_sitemap=args.use_sitemap,
+                                         fetch_workers=args.fetch_workers)
+        
+        # Save URLs to file
+        scraper.save_urls_to_file()
     
-    # Collect URLs (limit to 5 pages for testing)
-    scraper.collect_all_product_urls(max_pages=200)
+    # Save listing metadata so the review scraper can skip products with no new reviews
+    scraper.save_product_snapshots()
     
-    # Save URLs to file
-    scraper.save_urls_to_file()
\ No newline at end of file
+    # Update the URL registry and record what changed since the last crawl.
+    # An incremental or cut-short crawl only sees part of the catalogue, so nothing is marked gone.
+    delta = scraper.update_registry(registry, complete=not incremental and scraper.reached_end)
+    registry.save()
+    registry.save_delta(delta)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+"""
+Author-level signals for scraped Reddit comments.
+
+Account age and karma are looked up once per author per TTL window and kept in
+a persistent LRU cache, so prolific authors who appear thousands of times cost
+a single request. Authors are looked up 100 at a time by account fullname;
+authors without one fall back to a profile request each. Subreddit flair needs
+no lookup since it comes with every comment.
+
+    python src/ingestion/author_enrichment.py data/raw/reddit_comments_20240101.csv
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from prawcore.exceptions import Forbidden, NotFound
+
+try:
+    from .reddit_scraper import initialize_reddit
+except ImportError:
+    from reddit_scraper import initialize_reddit
+
+# /api/user_data_by_account_ids accepts at most 100 fullnames per request
+AUTHOR_BATCH_SIZE = 100
+
+# Authors that aren't real accounts
+SKIP_AUTHORS = ('None', '[deleted]', '')
+
+AUTHOR_COLUMNS = ['author_created_utc', 'author_account_age_days', 'author_link_karma', 'author_comment_karma']
+
+
+class AuthorCache:
+    """
+    Persistent LRU cache of author data with a TTL.
+
+    Entries expire ttl seconds after they were fetched and the least recently
+    used are evicted beyond max_size. Authors that no longer exist are cached
+    too (as None) so they aren't looked up again within the TTL.
+    """
+
+    def __init__(self, cache_file="data/raw/reddit_author_cache.json", ttl=7 * 86400, max_size=100000):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.load()
+
+    def load(self):
+        """Load persisted entries in least-recently-used order; expired ones are dropped on access"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                self.entries = OrderedDict(json.load(f))
+        except Exception as e:
+            print(f"Error loading author cache from {self.cache_file}: {str(e)}")
+
+    def save(self):
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            entries = dict(self.entries)
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.cache_file)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, name, now=None):
+        """Return (found, data); found is False if the author needs a lookup"""
+        now = now or time.time()
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and now - entry['fetched_at'] >= self.ttl:
+                del self.entries[name]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.entries.move_to_end(name)
+            self.hits += 1
+            return True, entry['data']
+
+    def put(self, name, data, now=None):
+        with self.lock:
+            self.entries[name] = {'fetched_at': now or time.time(), 'data': data}
+            self.entries.move_to_end(name)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': self.hit_rate(),
+            }
+
+def author_data(user):
+    """The fields kept for an author, from a Redditor or PartialRedditor"""
+    return {
+        'created_utc': user.created_utc,
+        'link_karma': user.link_karma,
+        'comment_karma': user.comment_karma,
+    }
+
+def fetch_authors_by_fullname(reddit, fullnames, batch_size=AUTHOR_BATCH_SIZE):
+    """Return {fullname: data}, one request per batch; missing accounts are left out"""
+    found = {}
+    fullnames = list(fullnames)
+    for start in range(0, len(fullnames), batch_size):
+        for user in reddit.redditors.partial_redditors(fullnames[start:start + batch_size]):
+            found[user.fullname] = author_data(user)
+    return found
+
+def fetch_author_by_name(reddit, name):
+    """One author's data from their profile, or None if the account is gone or suspended"""
+    try:
+        user = reddit.redditor(name)
+        # Suspended accounts only have is_suspended and name
+        if getattr(user, 'is_suspended', False):
+            return None
+        return author_data(user)
+    except (NotFound, Forbidden):
+        return None
+
+class AuthorEnricher:
+    """Adds account age and karma columns to comments DataFrames through an AuthorCache"""
+
+    def __init__(self, reddit=None, cache=None):
+        self.reddit = reddit or initialize_reddit()
+        self.cache = cache if cache is not None else AuthorCache()
+        self.requests = 0
+
+    def lookup(self, authors, now=None):
+        """
+        Return {name: data or None} for the given {name: fullname or None}.
+
+        Cached authors cost nothing, the rest are batched by fullname and
+        only authors without one are fetched individually.
+        """
+        now = now or time.time()
+        results = {}
+        by_fullname = {}
+        by_name = []
+        for name, fullname in authors.items():
+            found, data = self.cache.get(name, now)
+            if found:
+                results[name] = data
+            elif fullname:
+                by_fullname[fullname] = name
+            else:
+                by_name.append(name)
+
+        if by_fullname:
+            self.requests += (len(by_fullname) + AUTHOR_BATCH_SIZE - 1) // AUTHOR_BATCH_SIZE
+            try:
+                found = fetch_authors_by_fullname(self.reddit, by_fullname)
+            except Exception as e:
+                # Leave them uncached so the next run tries again
+                print(f"Error looking up {len(by_fullname)} authors: {str(e)}")
+                by_fullname = {}
+            for fullname, name in by_fullname.items():
+                results[name] = found.get(fullname)
+                self.cache.put(name, results[name], now)
+
+        for name in by_name:
+            self.requests += 1
+            try:
+                results[name] = fetch_author_by_name(self.reddit, name)
+            except Exception as e:
+                print(f"Error looking up author {name}: {str(e)}")
+                continue
+            self.cache.put(name, results[name], now)
+
+        return results
+
+    def enrich(self, comments_df, now=None):
+        """Return a copy of comments_df with the AUTHOR_COLUMNS added"""
+        now = now or time.time()
+        comments_df = comments_df.copy()
+        if comments_df.empty or 'author' not in comments_df.columns:
+            for column in AUTHOR_COLUMNS:
+                comments_df[column] = None
+            return comments_df
+
+        if 'author_fullname' in comments_df.columns:
+            pairs = comments_df[['author', 'author_fullname']].drop_duplicates(subset='author')
+            authors = {
+                name: fullname if isinstance(fullname, str) else None
+                for name, fullname in pairs.itertuples(index=False)
+            }
+        else:
+            authors = dict.fromkeys(comments_df['author'].unique())
+        authors = {name: fullname for name, fullname in authors.items()
+                   if isinstance(name, str) and name not in SKIP_AUTHORS}
+
+        data = self.lookup(authors, now)
+        created = pd.to_numeric(comments_df['author'].map(lambda name: (data.get(name) or {}).get('created_utc')))
+        comments_df['author_created_utc'] = pd.to_datetime(created, unit='s')
+        comments_df['author_account_age_days'] = ((now - created) / 86400).round(1)
+        comments_df['author_link_karma'] = comments_df['author'].map(
+            lambda name: (data.get(name) or {}).get('link_karma'))
+        comments_df['author_comment_karma'] = comments_df['author'].map(
+            lambda name: (data.get(name) or {}).get('comment_karma'))
+        return comments_df
+
+    def report(self):
+        stats = self.cache.stats()
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else 'n/a'
+        print(f"Author cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate} hit rate), "
+              f"{stats['expired']} expired, {stats['size']} cached, {self.requests} requests")
+        return stats
+
+def enrich_authors(comments_df, reddit=None, cache=None):
+    """Enrich a comments DataFrame from scrape_subreddit, save the cache and report its hit rate"""
+    enricher = AuthorEnricher(reddit, cache)
+    enriched_df = enricher.enrich(comments_df)
+    enricher.cache.save()
+    enricher.report()
+    return enriched_df
+
+def main():
+    parser = argparse.ArgumentParser(description='Add author account age and karma to scraped Reddit comments')
+    parser.add_argument('comments_file', help='Comments CSV written by the Reddit scrapers')
+    parser.add_argument('--output-file', default=None,
+                        help='Where to write the enriched comments (defaults to <comments_file>_authors.csv)')
+    parser.add_argument('--cache-file', default='data/raw/reddit_author_cache.json',
+                        help='Persistent author cache')
+    parser.add_argument('--ttl-days', type=float, default=7,
+                        help='Days before a cached author is looked up again')
+    parser.add_argument('--max-size', type=int, default=100000,
+                        help='Maximum number of cached authors')
+    args = parser.parse_args()
+
+    comments_df = pd.read_csv(args.comments_file)
+    cache = AuthorCache(args.cache_file, ttl=args.ttl_days * 86400, max_size=args.max_size)
+    enriched_df = enrich_authors(comments_df, cache=cache)
+
+    output_file = args.output_file or f"{os.path.splitext(args.comments_file)[0]}_authors.csv"
+    enriched_df.to_csv(output_file, index=False)
+    print(f"Saved {len(enriched_df)} enriched comments to {output_file}")
+
+if __name__ == "__main__":
+    main()
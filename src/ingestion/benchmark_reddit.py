@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+Benchmark the raw-JSON fast path against the praw path on recorded threads.
+
+Record a handful of real threads once, then time both parsers on the same
+payloads, offline and as often as needed:
+
+    python src/ingestion/benchmark_reddit.py record AsianBeauty --count 20
+    python src/ingestion/benchmark_reddit.py run --repeat 5
+
+Only decoding and row extraction are timed, not the network, and the two
+paths' rows are compared so a speedup never comes at the cost of different
+output.
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+import praw
+from praw.models.comment_forest import CommentForest
+
+try:
+    from .reddit_fast import RedditJsonClient, iter_top_posts, loads, parse_thread
+    from .reddit_scraper import comment_row, post_row
+except ImportError:
+    from reddit_fast import RedditJsonClient, iter_top_posts, loads, parse_thread
+    from reddit_scraper import comment_row, post_row
+
+THREADS_DIR = "data/benchmarks/reddit_threads"
+
+
+def record_threads(subreddit, count=20, time_period='week', threads_dir=THREADS_DIR, client=None):
+    """Save the raw /comments/<id> response of the subreddit's top threads"""
+    client = client or RedditJsonClient()
+    os.makedirs(threads_dir, exist_ok=True)
+    paths = []
+    for post in iter_top_posts(client, subreddit, time_period, count):
+        path = os.path.join(threads_dir, f"{post['id']}.json")
+        with open(path, 'wb') as f:
+            f.write(client.get_raw(f"/comments/{post['id']}", {'limit': 500}))
+        paths.append(path)
+        print(f"Recorded thread {post['id']} ({post.get('num_comments')} comments)")
+    return paths
+
+def offline_reddit():
+    """praw client that is never used for requests"""
+    return praw.Reddit(client_id='benchmark', client_secret='benchmark', user_agent='benchmark')
+
+def parse_thread_praw(reddit, raw):
+    """
+    Rows for one recorded thread the way scrape_subreddit builds them.
+
+    praw's objector turns the payload into the same Submission and Comment
+    objects it builds from a live response, and the rows come from
+    reddit_scraper's own post_row and comment_row, so the comparison tracks
+    what the scraper writes.
+    """
+    submission_listing, comment_listing = reddit._objector.objectify(data=json.loads(raw))
+    post = submission_listing.children[0]
+    comments = CommentForest(post, comment_listing.children)
+    # Recorded threads aren't expanded; limit=0 drops "more" stubs without requests
+    comments.replace_more(limit=0)
+    return post_row(post), [comment_row(comment, post) for comment in comments.list()]
+
+def parse_thread_fast(raw):
+    """Rows for one recorded thread through the fast path"""
+    post, comments, _ = parse_thread(loads(raw))
+    return post, comments
+
+def time_parser(parse, payloads, repeat):
+    """Best-of-repeat seconds to parse every payload, and the last run's rows"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = [parse(raw) for raw in payloads]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+def benchmark_threads(paths, repeat=5, reddit=None):
+    """
+    Time both parsers over the recorded threads.
+
+    Returns {'threads', 'comments', 'praw_seconds', 'fast_seconds', 'speedup',
+    'mismatches'}, where mismatches lists threads whose rows differ.
+    """
+    reddit = reddit or offline_reddit()
+    payloads = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            payloads.append(f.read())
+
+    praw_seconds, praw_rows = time_parser(lambda raw: parse_thread_praw(reddit, raw), payloads, repeat)
+    fast_seconds, fast_rows = time_parser(parse_thread_fast, payloads, repeat)
+
+    mismatches = [
+        os.path.basename(path)
+        for path, expected, actual in zip(paths, praw_rows, fast_rows)
+        if expected != actual
+    ]
+    return {
+        'threads': len(payloads),
+        'comments': sum(len(comments) for _, comments in fast_rows),
+        'praw_seconds': praw_seconds,
+        'fast_seconds': fast_seconds,
+        'speedup': praw_seconds / fast_seconds if fast_seconds else None,
+        'mismatches': mismatches,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the raw-JSON Reddit parser against praw')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help='Record raw thread responses')
+    record_parser.add_argument('subreddit')
+    record_parser.add_argument('--count', type=int, default=20, help='Number of top threads to record')
+    record_parser.add_argument('--time-period', default='week', help='Top listing time filter')
+    record_parser.add_argument('--threads-dir', default=THREADS_DIR)
+
+    run_parser = subparsers.add_parser('run', help='Time both parsers on the recorded threads')
+    run_parser.add_argument('--threads-dir', default=THREADS_DIR)
+    run_parser.add_argument('--repeat', type=int, default=5, help='Runs per parser; the best is reported')
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record_threads(args.subreddit, args.count, args.time_period, args.threads_dir)
+        return
+
+    paths = sorted(glob.glob(os.path.join(args.threads_dir, "*.json")))
+    if not paths:
+        print(f"No recorded threads in {args.threads_dir}")
+        return
+    result = benchmark_threads(paths, args.repeat)
+    print(f"{result['threads']} threads, {result['comments']} comments")
+    print(f"praw: {result['praw_seconds'] * 1000:.1f} ms")
+    print(f"fast: {result['fast_seconds'] * 1000:.1f} ms ({result['speedup']:.1f}x)")
+    if result['mismatches']:
+        print(f"Rows differ for: {', '.join(result['mismatches'])}")
+
+if __name__ == "__main__":
+    main()
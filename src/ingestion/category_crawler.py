@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+try:
+    from .adore_scraper import AdoreBeautyScraper, get_category_slug
+    from .throttle import AdaptiveThrottle
+    from .url_registry import UrlRegistry
+    from .product_snapshots import save_snapshots
+except ImportError:
+    from adore_scraper import AdoreBeautyScraper, get_category_slug
+    from throttle import AdaptiveThrottle
+    from url_registry import UrlRegistry
+    from product_snapshots import save_snapshots
+
+
+class MultiCategoryCrawler:
+    """
+    Crawl several Adore Beauty category listings concurrently.
+
+    Each category gets its own scraper and session, but they share one
+    AdaptiveThrottle (so the site sees a single rate budget) and one
+    deduplicated frontier of product URLs. A product listed in several
+    categories enters the frontier once, with every category it appears in.
+    """
+
+    def __init__(self, category_urls, throttle=None, max_workers=None):
+        self.category_urls = list(dict.fromkeys(category_urls))
+        self.throttle = throttle or AdaptiveThrottle(initial_rate=0.5, fallback_delay=(1, 3))
+        self.max_workers = max_workers or len(self.category_urls)
+
+        self.lock = threading.Lock()
+        self.frontier = {}  # Product URL -> set of category slugs
+        self.product_snapshots = {}
+        self.finished = set()  # Categories paged to the end without failed pages
+
+    def add_page(self, category, scraper):
+        """Merge one listing page into the shared frontier; returns new URL count"""
+        new_count = 0
+        with self.lock:
+            for url in scraper.last_page_urls:
+                if url not in self.frontier:
+                    self.frontier[url] = set()
+                    self.product_snapshots[url] = scraper.product_snapshots[url]
+                    new_count += 1
+                self.frontier[url].add(category)
+        return new_count
+
+    def crawl_category(self, category_url, max_pages=None):
+        """Page through one category, feeding the shared frontier"""
+        category = get_category_slug(category_url)
+        scraper = AdoreBeautyScraper(throttle=self.throttle, category_url=category_url)
+        page_number = 1
+        failed_pages = 0
+
+        while not max_pages or page_number <= max_pages:
+            if scraper.consecutive_errors >= 5:
+                print(f"[{category}] Too many consecutive errors. Stopping...")
+                break
+
+            errors_before = scraper.consecutive_errors
+            found_products = scraper.get_product_urls_from_page(page_number)
+            if scraper.consecutive_errors > errors_before:
+                failed_pages += 1
+            if not found_products:
+                if failed_pages == 0:
+                    with self.lock:
+                        self.finished.add(category)
+                break
+
+            new_count = self.add_page(category, scraper)
+            print(f"[{category}] Page {page_number}: {new_count} new of {len(scraper.last_page_urls)} products")
+            page_number += 1
+
+        return category, page_number - 1
+
+    def crawl(self, max_pages=None):
+        """Crawl all categories concurrently and return the frontier"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self.crawl_category, url, max_pages)
+                for url in self.category_urls
+            ]
+            for future in as_completed(futures):
+                try:
+                    category, pages = future.result()
+                    print(f"Finished {category} after {pages} pages")
+                except Exception as e:
+                    print(f"Error crawling category: {str(e)}")
+
+        print(f"\nTotal unique product URLs collected: {len(self.frontier)}")
+        print(f"Throttle: {self.throttle.stats()}")
+        return self.frontier
+
+    def is_complete(self):
+        """True if every category was paged to its end, so the frontier misses nothing"""
+        return all(get_category_slug(url) in self.finished for url in self.category_urls)
+
+    def save_product_categories(self, filepath="data/raw/product_categories.csv"):
+        """Save every category each product appeared in"""
+        rows = [
+            {'url': url, 'category': category}
+            for url, categories in sorted(self.frontier.items())
+            for category in sorted(categories)
+        ]
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        pd.DataFrame(rows, columns=['url', 'category']).to_csv(filepath, index=False)
+        print(f"Saved {len(rows)} product categories to {filepath}")
+        return filepath
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl several Adore Beauty categories with a shared frontier')
+    parser.add_argument('categories', nargs='+',
+                        help='Category root URLs, e.g. https://www.adorebeauty.com.au/c/skin-care.html')
+    parser.add_argument('--max-pages', type=int, default=200,
+                        help='Maximum number of listing pages per category')
+    parser.add_argument('--mark-gone', action='store_true',
+                        help='The categories cover every product in the registry, so products missing '
+                             'from a complete crawl are marked gone')
+    args = parser.parse_args()
+
+    crawler = MultiCategoryCrawler(args.categories)
+    frontier = crawler.crawl(max_pages=args.max_pages)
+
+    crawler.save_product_categories()
+    save_snapshots(crawler.product_snapshots.values())
+
+    # Products outside a subset of categories, or in a category that failed, aren't gone
+    complete = args.mark_gone and crawler.is_complete()
+    if args.mark_gone and not complete:
+        print(f"Only {len(crawler.finished)} of {len(crawler.category_urls)} categories finished, "
+              "so no products will be marked gone")
+    registry = UrlRegistry()
+    delta = registry.update(frontier.keys(), complete=complete)
+    print(f"URL registry: {len(delta['new'])} new, {len(delta['gone'])} gone")
+    registry.save()
+    registry.save_delta(delta)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import random
+import threading
+
+import numpy as np
+import pandas as pd
+
+TREE_FULL = 'full'
+TREE_SHALLOW = 'shallow'
+
+
+class CommentSampler:
+    """
+    Fetch full comment trees for a sample of a listing's posts and shallow
+    trees for the rest.
+
+    A full tree costs one request for the thread plus one per collapsed "more"
+    stub, which adds up on busy threads. A shallow tree is the thread request
+    alone: the top shallow_limit top-level comments by score. Full trees go to
+    fraction of the posts, either a simple random sample (strata=1) or the same
+    fraction of each comment-count stratum, so a few huge threads can't
+    dominate or vanish from the sample.
+
+    Every post gets a sample_weight, the inverse of its chance of a full tree,
+    or 0 for shallow trees. Weighting full-tree comment rows by it estimates
+    totals over every post in the listing; shallow rows carry weight 0 and are
+    only good for top-comment views.
+    """
+
+    def __init__(self, fraction=0.25, strata=4, shallow_limit=20, seed=None):
+        if not 0 < fraction <= 1:
+            raise ValueError(f"fraction must be in (0, 1], got {fraction}")
+        self.fraction = fraction
+        self.strata = max(1, strata)
+        self.shallow_limit = shallow_limit
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.designs = {}  # post id -> {'sample_stratum', 'sample_weight', 'comment_tree'}
+
+    def assign_strata(self, comment_counts):
+        """Stratum per post by comment-count quantile, 0 being the quietest"""
+        if self.strata == 1 or len(comment_counts) < 2:
+            return [0] * len(comment_counts)
+        # Rank first so ties (lots of 0-comment posts) still split into equal-sized strata
+        ranks = pd.Series(comment_counts).rank(method='first')
+        strata = min(self.strata, len(comment_counts))
+        return list(pd.qcut(ranks, strata, labels=False))
+
+    def plan(self, posts):
+        """
+        Read the whole listing and decide which posts get full trees.
+        Returns the posts as a list in listing order.
+        """
+        posts = list(posts)
+        strata = self.assign_strata([post.num_comments for post in posts])
+        members = {}
+        for post, stratum in zip(posts, strata):
+            members.setdefault(stratum, []).append(post.id)
+
+        designs = {}
+        with self.lock:
+            for stratum, post_ids in members.items():
+                full = max(1, int(round(self.fraction * len(post_ids))))
+                chosen = set(self.random.sample(post_ids, full))
+                weight = len(post_ids) / full
+                for post_id in post_ids:
+                    designs[post_id] = {
+                        'sample_stratum': int(stratum),
+                        'sample_weight': weight if post_id in chosen else 0.0,
+                        'comment_tree': TREE_FULL if post_id in chosen else TREE_SHALLOW,
+                    }
+            self.designs.update(designs)
+        return posts
+
+    def design(self, post_id):
+        with self.lock:
+            return self.designs[post_id]
+
+    def full_tree(self, post_id):
+        return self.design(post_id)['comment_tree'] == TREE_FULL
+
+    def stats(self):
+        with self.lock:
+            weights = np.array([design['sample_weight'] for design in self.designs.values()])
+        full = int((weights > 0).sum())
+        return {
+            'posts': len(weights),
+            'full_trees': full,
+            'shallow_trees': len(weights) - full,
+            'fraction': self.fraction,
+            # Full-tree weights add up to the number of posts planned
+            'weight_total': float(weights.sum()),
+        }
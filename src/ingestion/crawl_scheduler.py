@@ -0,0 +1,121 @@
+import heapq
+import math
+import threading
+import time
+from datetime import datetime
+
+
+class ReviewCrawlScheduler:
+    """
+    Priority queue of product URLs for the review crawl.
+
+    Products are scored on three signals:
+      - staleness: days since the product was last checked (never-checked
+        products count as max_staleness_days)
+      - velocity: new reviews per day from the listing snapshot history
+      - yield: the smoothed fraction of past checks that found new reviews
+
+    The highest-scoring products are crawled first, so a run with a limited
+    time or request budget spends it where new reviews are most likely.
+    """
+
+    def __init__(self, fingerprints=None, velocity=None, staleness_weight=1.0,
+                 velocity_weight=5.0, yield_weight=2.0, max_staleness_days=30, now=None):
+        self.fingerprints = fingerprints
+        self.velocity = velocity or {}
+        self.staleness_weight = staleness_weight
+        self.velocity_weight = velocity_weight
+        self.yield_weight = yield_weight
+        self.max_staleness_days = max_staleness_days
+        self.now = now or datetime.now()
+        self.heap = []
+        self.counter = 0  # Tie-breaker so equal scores keep insertion order
+
+    def get_fingerprint(self, url):
+        if self.fingerprints is None:
+            return None
+        return self.fingerprints.get(url)
+
+    def score(self, url):
+        """Priority score for a product; higher is crawled sooner"""
+        fingerprint = self.get_fingerprint(url) or {}
+
+        if fingerprint.get('last_checked'):
+            age = self.now - datetime.fromisoformat(fingerprint['last_checked'])
+            staleness = min(age.total_seconds() / 86400, self.max_staleness_days)
+        else:
+            staleness = self.max_staleness_days
+
+        # Laplace-smoothed hit rate so new products start at 0.5
+        past_yield = (fingerprint.get('changes', 0) + 1) / (fingerprint.get('checks', 0) + 2)
+
+        return (
+            self.staleness_weight * math.log1p(staleness)
+            + self.velocity_weight * self.velocity.get(url, 0.0)
+            + self.yield_weight * past_yield
+        )
+
+    def push(self, url):
+        heapq.heappush(self.heap, (-self.score(url), self.counter, url))
+        self.counter += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, urls):
+        """Add URLs to the queue"""
+        for url in dict.fromkeys(urls):
+            self.push(url)
+
+    def order(self, urls):
+        """Return URLs in priority order"""
+        self.schedule(urls)
+        return [self.pop() for _ in range(len(self.heap))]
+
+    def priorities(self, urls):
+        """Return {url: score}, for work queues (such as a job ledger) that order claims themselves"""
+        return {url: self.score(url) for url in dict.fromkeys(urls)}
+
+
+class CrawlBudget:
+    """
+    Time and request limits for a review crawl.
+
+    time_budget is in seconds from when the budget was created and
+    max_requests counts product page fetches; either can be None for no
+    limit. Fetcher threads may share one budget.
+    """
+
+    def __init__(self, time_budget=None, max_requests=None):
+        self.time_budget = time_budget
+        self.max_requests = max_requests
+        self.start_time = time.time()
+        self.requests = 0
+        self.reason = None  # Why the budget ran out, once it has
+        self.lock = threading.Lock()
+
+    def _check(self):
+        if self.reason is None:
+            if self.time_budget is not None and time.time() - self.start_time >= self.time_budget:
+                self.reason = f"Time budget of {self.time_budget}s used after {self.requests} products"
+            elif self.max_requests is not None and self.requests >= self.max_requests:
+                self.reason = f"Request budget of {self.max_requests} products used"
+            if self.reason is not None:
+                print(f"{self.reason}, stopping")
+        return self.reason is not None
+
+    def exhausted(self):
+        """True once either limit is reached; the reason is printed the first time"""
+        with self.lock:
+            return self._check()
+
+    def spend(self):
+        """Count one product page fetch, or return False if the budget is used up"""
+        with self.lock:
+            if self._check():
+                return False
+            self.requests += 1
+            return True
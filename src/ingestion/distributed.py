@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+Distribute long backfills across several hosts that share a filesystem.
+
+One job ledger on the shared volume holds the work items; a coordinator seeds
+it, any number of workers on any number of hosts claim items from it, and the
+coordinator reports progress and merges the output:
+
+    python src/ingestion/distributed.py seed-reddit /mnt/shared --years 5
+    python src/ingestion/distributed.py seed-adore /mnt/shared data/raw/product_urls.txt
+    python src/ingestion/distributed.py worker /mnt/shared reddit --env-file host1.env
+    python src/ingestion/distributed.py worker /mnt/shared adore --use-proxies
+    python src/ingestion/distributed.py status /mnt/shared --watch 60
+    python src/ingestion/distributed.py merge-adore /mnt/shared data/raw/reviews_backfill.csv
+
+Each worker scrapes with its own credentials (--env-file) or identity and
+writes only to its own partition, output/<source>/<worker_id>/, so workers
+never write to the same file.
+"""
+import argparse
+import glob
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+try:
+    from .job_ledger import JobLedger
+    from .review_shards import PRODUCT_SOURCE, crawl_from_ledger, get_priorities, merge_shards
+    from .adore_review_scraper import AdoreReviewScraper
+    from .product_fingerprints import FingerprintStore
+    from .product_snapshots import load_latest_review_counts
+    from .session_cache import SessionCache
+except ImportError:
+    from job_ledger import JobLedger
+    from review_shards import PRODUCT_SOURCE, crawl_from_ledger, get_priorities, merge_shards
+    from adore_review_scraper import AdoreReviewScraper
+    from product_fingerprints import FingerprintStore
+    from product_snapshots import load_latest_review_counts
+    from session_cache import SessionCache
+
+# Same source name as historical_scraper, which isn't imported up front
+REDDIT_MONTH_SOURCE = 'reddit_month'
+SOURCES = {'reddit': REDDIT_MONTH_SOURCE, 'adore': PRODUCT_SOURCE}
+
+
+def open_shared_ledger(shared_dir, lease_seconds=1800):
+    """
+    Open the job ledger on the shared volume.
+
+    WAL mode keeps its index in shared memory, which doesn't work across hosts
+    on network filesystems, so the shared ledger uses a rollback journal. Leases
+    are long because a Reddit month can take a while to scrape.
+    """
+    return JobLedger(os.path.join(shared_dir, "jobs.db"), lease_seconds=lease_seconds,
+                     journal_mode='DELETE')
+
+def get_worker_dir(shared_dir, source, worker_id):
+    """A worker's own output partition"""
+    safe_id = worker_id.replace(os.sep, '_').replace(':', '_')
+    worker_dir = os.path.join(shared_dir, "output", source, safe_id)
+    os.makedirs(worker_dir, exist_ok=True)
+    return worker_dir
+
+def seed_reddit(shared_dir, years=5, end_date=None):
+    """Add one work item per month of the backfill"""
+    # Imported here so importing this module doesn't read Reddit credentials
+    try:
+        from .historical_scraper import get_month_range
+    except ImportError:
+        from historical_scraper import get_month_range
+
+    end_date = end_date or datetime.now()
+    start_date = end_date - timedelta(days=years * 365)
+    months = [month.strftime("%Y-%m") for month in get_month_range(start_date, end_date)]
+    added = open_shared_ledger(shared_dir).add(REDDIT_MONTH_SOURCE, months)
+    print(f"Seeded {added} new months ({len(months)} requested)")
+    return added
+
+def seed_adore(shared_dir, url_file, fingerprint_file=None, snapshot_file=None):
+    """Add one work item per product URL, prioritised by the review crawl scheduler"""
+    with open(url_file, 'r') as f:
+        urls = [line.strip() for line in f if line.strip()]
+    priorities = get_priorities(urls, fingerprint_file, snapshot_file)
+    added = open_shared_ledger(shared_dir).add(PRODUCT_SOURCE, urls, priorities=priorities)
+    print(f"Seeded {added} new product URLs ({len(urls)} requested)")
+    return added
+
+def run_reddit_worker(shared_dir, worker_id, subreddits, limit=500):
+    """Claim months until none are left, writing to this worker's partition"""
+    # Imported here so the host's --env-file is loaded before config reads the credentials
+    try:
+        from .historical_scraper import scrape_months_from_ledger
+    except ImportError:
+        from historical_scraper import scrape_months_from_ledger
+
+    output_dir = get_worker_dir(shared_dir, 'reddit', worker_id)
+    return scrape_months_from_ledger(
+        open_shared_ledger(shared_dir), subreddits, None, datetime.now(), output_dir,
+        limit=limit, worker_id=worker_id
+    )
+
+def run_adore_worker(shared_dir, worker_id, use_proxies=False, fingerprint_file=None, snapshot_file=None,
+                     time_budget=None, max_requests=None):
+    """Claim product URLs until none are left or the budget is spent, writing to this worker's partition"""
+    worker_dir = get_worker_dir(shared_dir, 'adore', worker_id)
+
+    # The worker's own session cache (and proxy pool) is its identity
+    scraper = AdoreReviewScraper(
+        use_proxies=use_proxies,
+        session_cache=SessionCache(os.path.join(worker_dir, "sessions.json"))
+    )
+
+    # Fingerprints are written per worker and merged back by merge-adore
+    scraper.fingerprints = FingerprintStore(os.path.join(worker_dir, "fingerprints.json"))
+    if fingerprint_file:
+        scraper.fingerprints.merge_from(fingerprint_file)
+
+    listing_counts = load_latest_review_counts(snapshot_file) if snapshot_file else {}
+    reviews_found = crawl_from_ledger(
+        scraper, open_shared_ledger(shared_dir), os.path.join(worker_dir, "reviews.csv"),
+        listing_counts, label=worker_id, worker_id=worker_id,
+        time_budget=time_budget, max_requests=max_requests
+    )
+
+    scraper.fingerprints.save()
+    scraper.session_cache.save()
+    print(f"[{worker_id}] Finished with {reviews_found} reviews")
+    return reviews_found
+
+def report_progress(shared_dir, window_seconds=3600):
+    """Print global progress, active workers and an ETA for every source"""
+    ledger = open_shared_ledger(shared_dir)
+    now = time.time()
+    report = {}
+
+    for source, counts in sorted(ledger.progress().items()):
+        total = sum(counts.values())
+        remaining = counts.get('pending', 0) + counts.get('leased', 0)
+        rate = ledger.done_since(source, now - window_seconds) / window_seconds
+        eta = timedelta(seconds=int(remaining / rate)) if rate > 0 else None
+        workers = ledger.leases(source, now)
+
+        print(f"{source}: {counts.get('done', 0)}/{total} done, {remaining} remaining, "
+              f"{counts.get('failed', 0)} failed")
+        print(f"  {len(workers)} active workers: {workers}")
+        print(f"  {rate * 3600:.1f} items/hour, ETA {eta or 'unknown'}")
+        report[source] = {'counts': counts, 'workers': workers, 'rate_per_hour': rate * 3600}
+
+    return report
+
+def merge_adore(shared_dir, output_file, fingerprint_file=None, merge_history=True):
+    """Merge every worker's review partition into one file"""
+    shard_files = sorted(glob.glob(os.path.join(shared_dir, "output", "adore", "*", "reviews.csv")))
+    return merge_shards(shard_files, output_file, fingerprint_file, merge_history)
+
+def main():
+    parser = argparse.ArgumentParser(description='Distribute scraping backfills across hosts with a shared volume')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    seed_reddit_parser = subparsers.add_parser('seed-reddit', help='Add backfill months to the shared ledger')
+    seed_reddit_parser.add_argument('shared_dir')
+    seed_reddit_parser.add_argument('--years', type=int, default=5,
+                                    help='Number of years of historical data to scrape')
+
+    seed_adore_parser = subparsers.add_parser('seed-adore', help='Add product URLs to the shared ledger')
+    seed_adore_parser.add_argument('shared_dir')
+    seed_adore_parser.add_argument('url_file', help='File with one product URL per line')
+    seed_adore_parser.add_argument('--fingerprint-file', default='data/raw/product_fingerprints.json',
+                                   help='Fingerprint store the crawl priorities are scored from')
+    seed_adore_parser.add_argument('--snapshot-file', default='data/raw/product_snapshots.csv',
+                                   help='Listing snapshots the review velocity is scored from')
+
+    worker_parser = subparsers.add_parser('worker', help='Claim and scrape work items until none are left')
+    worker_parser.add_argument('shared_dir')
+    worker_parser.add_argument('source', choices=sorted(SOURCES))
+    worker_parser.add_argument('--worker-id', default=socket.gethostname(),
+                               help='Name of this worker and its output partition (defaults to the hostname)')
+    worker_parser.add_argument('--env-file', default=None,
+                               help='.env file with this host\'s own Reddit credentials')
+    worker_parser.add_argument('--subreddits', nargs='+', default=['AsianBeauty', 'SkincareAddiction', '30PlusSkinCare'],
+                               help='List of subreddits to scrape')
+    worker_parser.add_argument('--limit', type=int, default=500,
+                               help='Maximum number of posts to scrape per month')
+    worker_parser.add_argument('--use-proxies', action='store_true',
+                               help='Give this worker its own proxy pool')
+    worker_parser.add_argument('--fingerprint-file', default='data/raw/product_fingerprints.json',
+                               help='Shared fingerprint store to seed change detection from')
+    worker_parser.add_argument('--snapshot-file', default='data/raw/product_snapshots.csv',
+                               help='Listing snapshots used to skip products with unchanged review counts')
+    worker_parser.add_argument('--time-budget', type=float, default=None,
+                               help='Stop an adore worker after this many seconds')
+    worker_parser.add_argument('--max-requests', type=int, default=None,
+                               help='Stop an adore worker after fetching this many product pages')
+
+    status_parser = subparsers.add_parser('status', help='Report global progress')
+    status_parser.add_argument('shared_dir')
+    status_parser.add_argument('--watch', type=int, default=None,
+                               help='Repeat the report every this many seconds')
+
+    merge_parser = subparsers.add_parser('merge-adore', help='Merge the workers\' review partitions')
+    merge_parser.add_argument('shared_dir')
+    merge_parser.add_argument('output_file')
+    merge_parser.add_argument('--fingerprint-file', default='data/raw/product_fingerprints.json',
+                              help='Shared fingerprint store to merge worker fingerprints into')
+
+    args = parser.parse_args()
+
+    if args.command == 'seed-reddit':
+        seed_reddit(args.shared_dir, args.years)
+    elif args.command == 'seed-adore':
+        seed_adore(args.shared_dir, args.url_file, args.fingerprint_file, args.snapshot_file)
+    elif args.command == 'worker':
+        if args.env_file:
+            load_dotenv(args.env_file, override=True)
+        if args.source == 'reddit':
+            run_reddit_worker(args.shared_dir, args.worker_id, args.subreddits, args.limit)
+        else:
+            run_adore_worker(args.shared_dir, args.worker_id, args.use_proxies,
+                             args.fingerprint_file, args.snapshot_file,
+                             args.time_budget, args.max_requests)
+    elif args.command == 'status':
+        while True:
+            print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            report_progress(args.shared_dir)
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+    elif args.command == 'merge-adore':
+        merge_adore(args.shared_dir, args.output_file, args.fingerprint_file)
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@ sys.path.append(project_root)
 
 # Import the reddit_scraper module with better error handling
 try:
-    from .reddit_scraper import scrape_subreddit
+    from .reddit_scraper import scrape_subreddit_window
     print("Successfully imported reddit_scraper module")
 except ImportError as e:
     print(f"Error importing reddit_scraper module: {e}")
@@ -28,12 +28,21 @@ except ImportError as e:
     # Try alternative import method
     try:
         sys.path.append(current_dir)
-        from reddit_scraper import scrape_subreddit
+        from reddit_scraper import scrape_subreddit_window
         print("Successfully imported reddit_scraper module using alternative method")
     except ImportError as e2:
         print(f"Alternative import also failed: {e2}")
         sys.exit(1)
 
+try:
+    from .job_ledger import JobLedger, DONE, LeaseLost, default_worker_id
+    from .adaptive_limit import AdaptiveLimit
+except ImportError:
+    from job_ledger import JobLedger, DONE, LeaseLost, default_worker_id
+    from adaptive_limit import AdaptiveLimit
+
+REDDIT_MONTH_SOURCE = 'reddit_month'
+
 # Set up logging with more detailed output
 logging.basicConfig(
     level=logging.INFO,
@@ -82,7 +91,241 @@ def get_month_range(start_date, end_date):
     
     return month_starts
 
-def scrape_historical_data_by_month(subreddits, start_date, end_date, output_dir, limit=500, checkpoint_file=None):
+def get_month_end(month_start, end_date):
+    """Last day of the month, capped at end_date"""
+    if month_start.month == 12:
+        month_end = month_start.replace(year=month_start.year + 1, month=1, day=1) - timedelta(days=1)
+    else:
+        month_end = month_start.replace(month=month_start.month + 1, day=1) - timedelta(days=1)
+    return min(month_end, end_date)
+
+def save_coverage(coverage_rows, coverage_file):
+    """Append per-month, per-subreddit coverage rows to the coverage report"""
+    if not coverage_rows:
+        return
+    coverage_df = pd.DataFrame(coverage_rows)
+    coverage_df.to_csv(coverage_file, mode='a', header=not os.path.exists(coverage_file), index=False)
+    logger.info(f"  Appended {len(coverage_df)} coverage rows to {coverage_file}")
+
+def scrape_month(subreddits, month_start, month_end, output_dir, limit=500, adaptive_limit=None,
+                 heartbeat=None):
+    """
+    Scrape one month from every subreddit into that month's posts and comments files.
+
+    With an AdaptiveLimit (used as a template, one fresh copy per subreddit),
+    limit only caps the posts fetched and each subreddit's coverage is
+    appended to coverage.csv in output_dir. heartbeat, if given, is called
+    before each subreddit and after each post; a LeaseLost it raises abandons
+    the month without saving anything.
+
+    Returns the number of posts and comments saved, the subreddits that
+    failed and any coverage rows, or None if the month's files already exist.
+    """
+    month_str = month_start.strftime("%Y-%m")
+    logger.info(f"\nScraping data for {month_str} ({month_start.strftime('%Y-%m-%d')} to {month_end.strftime('%Y-%m-%d')})")
+    
+    # Check if files already exist for this month
+    posts_file = os.path.join(output_dir, f'reddit_posts_{month_str}.csv')
+    comments_file = os.path.join(output_dir, f'reddit_comments_{month_str}.csv')
+    
+    if os.path.exists(posts_file) and os.path.exists(comments_file):
+        logger.info(f"Files already exist for {month_str}, skipping...")
+        return None
+    
+    # Posts are selected by creation time before their comments are fetched;
+    # month_end is a date, so the window runs to the start of the next day
+    window_end = month_end + timedelta(days=1)
+    
+    # Initialize empty lists to store all data for this month
+    all_posts = []
+    all_comments = []
+    failed_subreddits = []
+    coverage_rows = []
+    on_post = None
+    if heartbeat is not None:
+        on_post = lambda row: heartbeat()
+    
+    # Iterate through each subreddit
+    for subreddit in subreddits:
+        if heartbeat is not None:
+            heartbeat()
+        logger.info(f"  Scraping r/{subreddit}...")
+        
+        try:
+            # Scrape data for this month
+            logger.debug(f"  Calling scrape_subreddit_window with subreddit={subreddit}, limit={limit}")
+            window_stats = {}
+            month_limit = None
+            if adaptive_limit is not None:
+                month_limit = adaptive_limit.fresh()
+                month_limit.max_posts = limit
+            posts_df, comments_df = scrape_subreddit_window(
+                subreddit,
+                month_start,
+                window_end,
+                limit=limit,
+                stats=window_stats,
+                adaptive_limit=month_limit,
+                on_post=on_post
+            )
+            
+            logger.debug(f"  Received posts_df shape: {posts_df.shape if not posts_df.empty else 'empty'}")
+            logger.debug(f"  Received comments_df shape: {comments_df.shape if not comments_df.empty else 'empty'}")
+            if 'coverage' in window_stats:
+                coverage = window_stats['coverage']
+                coverage_rows.append(dict(coverage, month=month_str, subreddit=subreddit,
+                                          reached_start=window_stats['reached_start']))
+                logger.info(f"  Fetched {coverage['posts_fetched']}/{coverage['posts_in_window']} posts, "
+                            f"{coverage['comment_coverage']:.0%} of listed comments "
+                            f"(stopped: {coverage['stop_reason']})")
+            # The adaptive limit always lists the whole window, so its stops never hide the window start
+            if not window_stats['reached_start'] and ('coverage' in window_stats or not window_stats['limit_reached']):
+                logger.warning(f"  r/{subreddit} listing ended before {month_start.strftime('%Y-%m-%d')}; "
+                               f"the month is only partially covered")
+            
+            # Print number of comments after each post
+            if not comments_df.empty:
+                logger.info(f"  Collected {len(comments_df)} comments for r/{subreddit}")
+            else:
+                logger.warning(f"  No comments returned for r/{subreddit}")
+            
+            if not posts_df.empty:
+                logger.debug(f"  Posts DataFrame columns: {posts_df.columns.tolist()}")
+                posts_df['created_utc'] = pd.to_datetime(posts_df['created_utc'])
+                
+                # Add month and subreddit columns
+                posts_df['scrape_month'] = month_str
+                posts_df['subreddit'] = subreddit
+                all_posts.append(posts_df)
+            else:
+                logger.warning(f"  No posts returned for r/{subreddit}")
+            
+            # Filter comments to only include those within our date range
+            if not comments_df.empty:
+                logger.debug(f"  Comments DataFrame columns: {comments_df.columns.tolist()}")
+                comments_df['created_utc'] = pd.to_datetime(comments_df['created_utc'])
+                comments_df = comments_df[(comments_df['created_utc'] >= month_start) & 
+                                        (comments_df['created_utc'] < window_end)]
+                
+                # Add month and subreddit columns
+                comments_df['scrape_month'] = month_str
+                comments_df['subreddit'] = subreddit
+                all_comments.append(comments_df)
+                logger.debug(f"  Filtered comments_df shape: {comments_df.shape}")
+            else:
+                logger.warning(f"  No comments returned for r/{subreddit}")
+            
+            logger.info(f"  Successfully scraped r/{subreddit}")
+            
+            # Add a delay between subreddits to avoid rate limiting
+            time.sleep(10)  # Increased delay between subreddits
+            
+        except LeaseLost:
+            raise
+        except Exception as e:
+            logger.error(f"  Error scraping r/{subreddit}: {str(e)}")
+            logger.error(traceback.format_exc())
+            failed_subreddits.append(subreddit)
+            continue
+    
+    posts_count = 0
+    comments_count = 0
+    
+    # Save data for this month
+    if all_posts:
+        month_posts = pd.concat(all_posts, ignore_index=True)
+        logger.debug(f"  Final month_posts shape: {month_posts.shape}")
+        month_posts.to_csv(posts_file, index=False)
+        posts_count = len(month_posts)
+        logger.info(f"  Saved {posts_count} posts to {posts_file}")
+    else:
+        logger.warning(f"  No posts collected for {month_str}")
+    
+    if all_comments:
+        month_comments = pd.concat(all_comments, ignore_index=True)
+        logger.debug(f"  Final month_comments shape: {month_comments.shape}")
+        month_comments.to_csv(comments_file, index=False)
+        comments_count = len(month_comments)
+        logger.info(f"  Saved {comments_count} comments to {comments_file}")
+    else:
+        logger.warning(f"  No comments collected for {month_str}")
+    
+    save_coverage(coverage_rows, os.path.join(output_dir, 'coverage.csv'))
+    
+    # Print summary for this month
+    logger.info(f"  Month {month_str} summary: {posts_count} posts, {comments_count} comments")
+    return {'posts': posts_count, 'comments': comments_count, 'failed_subreddits': failed_subreddits,
+            'coverage': coverage_rows}
+
+def scrape_months_from_ledger(ledger, subreddits, month_starts, end_date, output_dir, limit=500, worker_id=None,
+                              adaptive_limit=None):
+    """
+    Scrape months as work items in a job ledger.
+
+    Months already completed (by this or another worker) are skipped, failed
+    months are retried with backoff on a later run, and several workers can
+    share one ledger. month_starts are added to the ledger first; pass None to
+    work through months another process has already seeded. A month's lease
+    is renewed before each subreddit and after each post, and a month whose
+    lease was taken over by another worker is left to that worker. Returns
+    the total posts and comments saved.
+    """
+    worker_id = worker_id or default_worker_id()
+    month_strs = [month_start.strftime("%Y-%m") for month_start in month_starts or []]
+    if month_strs:
+        added = ledger.add(REDDIT_MONTH_SOURCE, month_strs)
+        logger.info(f"Job ledger: {added} new months")
+    logger.info(f"Job ledger progress: {ledger.progress(REDDIT_MONTH_SOURCE)}")
+    
+    total_posts_saved = 0
+    total_comments_saved = 0
+    wanted = set(month_strs)
+    
+    with tqdm(total=len(month_strs) or None, desc="Months") as progress:
+        progress.update(len([m for m in ledger.units(REDDIT_MONTH_SOURCE, status=DONE) if m in wanted]))
+        while True:
+            claimed = ledger.claim(REDDIT_MONTH_SOURCE, worker_id)
+            if not claimed:
+                break
+            month_str = claimed[0]
+            month_start = datetime.strptime(month_str, "%Y-%m")
+            
+            def renew_lease(month_str=month_str):
+                if not ledger.renew(REDDIT_MONTH_SOURCE, month_str, worker_id):
+                    raise LeaseLost(f"lease on {month_str} was taken over by another worker")
+            
+            try:
+                counts = scrape_month(subreddits, month_start, get_month_end(month_start, end_date), output_dir, limit,
+                                      adaptive_limit, heartbeat=renew_lease)
+                if counts and len(counts['failed_subreddits']) == len(subreddits):
+                    raise RuntimeError("every subreddit failed")
+            except LeaseLost as e:
+                logger.warning(f"Month {month_str} abandoned: {str(e)}")
+                continue
+            except Exception as e:
+                status = ledger.fail(REDDIT_MONTH_SOURCE, month_str, error=str(e), worker_id=worker_id)
+                logger.error(f"Month {month_str} failed ({status}): {str(e)}")
+                logger.error(traceback.format_exc())
+                continue
+            
+            # Only the worker still holding the lease records the month
+            if not ledger.complete(REDDIT_MONTH_SOURCE, month_str, result=counts, worker_id=worker_id):
+                logger.warning(f"Month {month_str} was taken over by another worker; not recording it")
+                continue
+            if not wanted or month_str in wanted:
+                progress.update(1)
+            if counts:
+                total_posts_saved += counts['posts']
+                total_comments_saved += counts['comments']
+                
+                # Add a longer delay between months to avoid rate limiting
+                time.sleep(60)  # Increased delay between months
+    
+    logger.info(f"Job ledger progress: {ledger.progress(REDDIT_MONTH_SOURCE)}")
+    return total_posts_saved, total_comments_saved
+
+def scrape_historical_data_by_month(subreddits, start_date, end_date, output_dir, limit=500, checkpoint_file=None,
+                                    ledger=None, adaptive_limit=None):
     """
     Scrapes historical data from multiple subreddits, one month at a time.
     
@@ -93,13 +336,15 @@ def scrape_historical_data_by_month(subreddits, start_date, end_date, output_dir
         output_dir (str): Directory to save the output files
         limit (int): Maximum number of posts to scrape per month
         checkpoint_file (str): Path to checkpoint file for resuming
+        ledger (JobLedger): Job ledger tracking months as work items; replaces the checkpoint file
+        adaptive_limit (AdaptiveLimit): Stop rules that replace the fixed per-month limit, which then only caps it
     """
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     logger.debug(f"Output directory: {output_dir}")
     
     # Load checkpoint if available
-    if checkpoint_file:
+    if checkpoint_file and ledger is None:
         last_processed_date = load_checkpoint(checkpoint_file)
         if last_processed_date:
             logger.info(f"Resuming from checkpoint: {last_processed_date.isoformat()}")
@@ -116,132 +361,31 @@ def scrape_historical_data_by_month(subreddits, start_date, end_date, output_dir
     logger.info(f"Scraping {total_months} months of data from {len(subreddits)} subreddits...")
     logger.info(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    # Track total rows saved
-    total_posts_saved = 0
-    total_comments_saved = 0
-    
-    # Iterate through each month
-    for month_start in tqdm(month_starts, desc="Months"):
-        # Calculate the end of the month
-        if month_start.month == 12:
-            month_end = month_start.replace(year=month_start.year + 1, month=1, day=1) - timedelta(days=1)
-        else:
-            month_end = month_start.replace(month=month_start.month + 1, day=1) - timedelta(days=1)
-        
-        # Adjust month_end if it's beyond our end_date
-        if month_end > end_date:
-            month_end = end_date
+    if ledger is not None:
+        total_posts_saved, total_comments_saved = scrape_months_from_ledger(
+            ledger, subreddits, month_starts, end_date, output_dir, limit, adaptive_limit=adaptive_limit
+        )
+    else:
+        # Track total rows saved
+        total_posts_saved = 0
+        total_comments_saved = 0
         
-        month_str = month_start.strftime("%Y-%m")
-        logger.info(f"\nScraping data for {month_str} ({month_start.strftime('%Y-%m-%d')} to {month_end.strftime('%Y-%m-%d')})")
-        
-        # Check if files already exist for this month
-        posts_file = os.path.join(output_dir, f'reddit_posts_{month_str}.csv')
-        comments_file = os.path.join(output_dir, f'reddit_comments_{month_str}.csv')
-        
-        if os.path.exists(posts_file) and os.path.exists(comments_file):
-            logger.info(f"Files already exist for {month_str}, skipping...")
+        # Iterate through each month
+        for month_start in tqdm(month_starts, desc="Months"):
+            month_end = get_month_end(month_start, end_date)
+            counts = scrape_month(subreddits, month_start, month_end, output_dir, limit, adaptive_limit)
+            
             # Save checkpoint
             if checkpoint_file:
                 save_checkpoint(checkpoint_file, month_end)
-            continue
-        
-        # Initialize empty lists to store all data for this month
-        all_posts = []
-        all_comments = []
-        
-        # Iterate through each subreddit
-        for subreddit in subreddits:
-            logger.info(f"  Scraping r/{subreddit}...")
             
-            try:
-                # Scrape data for this month
-                logger.debug(f"  Calling scrape_subreddit with subreddit={subreddit}, TIME_PERIOD='month', limit={limit}")
-                posts_df, comments_df = scrape_subreddit(
-                    subreddit, 
-                    TIME_PERIOD='month', 
-                    limit=limit
-                )
-                
-                logger.debug(f"  Received posts_df shape: {posts_df.shape if not posts_df.empty else 'empty'}")
-                logger.debug(f"  Received comments_df shape: {comments_df.shape if not comments_df.empty else 'empty'}")
-                
-                # Print number of comments after each post
-                if not comments_df.empty:
-                    logger.info(f"  Collected {len(comments_df)} comments for r/{subreddit}")
-                else:
-                    logger.warning(f"  No comments returned for r/{subreddit}")
-                
-                # Filter posts to only include those within our date range
-                if not posts_df.empty:
-                    logger.debug(f"  Posts DataFrame columns: {posts_df.columns.tolist()}")
-                    posts_df['created_utc'] = pd.to_datetime(posts_df['created_utc'])
-                    posts_df = posts_df[(posts_df['created_utc'] >= month_start) & 
-                                       (posts_df['created_utc'] <= month_end)]
-                    
-                    # Add month and subreddit columns
-                    posts_df['scrape_month'] = month_str
-                    posts_df['subreddit'] = subreddit
-                    all_posts.append(posts_df)
-                    logger.debug(f"  Filtered posts_df shape: {posts_df.shape}")
-                else:
-                    logger.warning(f"  No posts returned for r/{subreddit}")
-                
-                # Filter comments to only include those within our date range
-                if not comments_df.empty:
-                    logger.debug(f"  Comments DataFrame columns: {comments_df.columns.tolist()}")
-                    comments_df['created_utc'] = pd.to_datetime(comments_df['created_utc'])
-                    comments_df = comments_df[(comments_df['created_utc'] >= month_start) & 
-                                            (comments_df['created_utc'] <= month_end)]
-                    
-                    # Add month and subreddit columns
-                    comments_df['scrape_month'] = month_str
-                    comments_df['subreddit'] = subreddit
-                    all_comments.append(comments_df)
-                    logger.debug(f"  Filtered comments_df shape: {comments_df.shape}")
-                else:
-                    logger.warning(f"  No comments returned for r/{subreddit}")
-                
-                logger.info(f"  Successfully scraped r/{subreddit}")
-                
-                # Add a delay between subreddits to avoid rate limiting
-                time.sleep(10)  # Increased delay between subreddits
-                
-            except Exception as e:
-                logger.error(f"  Error scraping r/{subreddit}: {str(e)}")
-                logger.error(traceback.format_exc())
+            if counts is None:
                 continue
-        
-        # Save data for this month
-        if all_posts:
-            month_posts = pd.concat(all_posts, ignore_index=True)
-            logger.debug(f"  Final month_posts shape: {month_posts.shape}")
-            month_posts.to_csv(posts_file, index=False)
-            posts_count = len(month_posts)
-            total_posts_saved += posts_count
-            logger.info(f"  Saved {posts_count} posts to {posts_file}")
-        else:
-            logger.warning(f"  No posts collected for {month_str}")
-        
-        if all_comments:
-            month_comments = pd.concat(all_comments, ignore_index=True)
-            logger.debug(f"  Final month_comments shape: {month_comments.shape}")
-            month_comments.to_csv(comments_file, index=False)
-            comments_count = len(month_comments)
-            total_comments_saved += comments_count
-            logger.info(f"  Saved {comments_count} comments to {comments_file}")
-        else:
-            logger.warning(f"  No comments collected for {month_str}")
-        
-        # Print summary for this month
-        logger.info(f"  Month {month_str} summary: {len(all_posts)} posts, {len(all_comments)} comments")
-        
-        # Save checkpoint
-        if checkpoint_file:
-            save_checkpoint(checkpoint_file, month_end)
-        
-        # Add a longer delay between months to avoid rate limiting
-        time.sleep(60)  # Increased delay between months
+            total_posts_saved += counts['posts']
+            total_comments_saved += counts['comments']
+            
+            # Add a longer delay between months to avoid rate limiting
+            time.sleep(60)  # Increased delay between months
     
     # Print final summary
     logger.info(f"\nHistorical data scraping completed!")
@@ -259,10 +403,25 @@ def main():
                         help='Number of years of historical data to scrape')
     parser.add_argument('--limit', type=int, default=500,
                         help='Maximum number of posts to scrape per month')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Fetch each month best first and stop adaptively, with --limit as a cap; '
+                             'coverage is written to coverage.csv in the output directory')
+    parser.add_argument('--engagement-quantile', type=float, default=0.5,
+                        help='With --adaptive, stop at posts below this quantile of the month\'s engagement')
+    parser.add_argument('--engagement-metric', default='engagement', choices=['engagement', 'score', 'num_comments'],
+                        help='With --adaptive, rank posts by score plus comments, score or comments')
+    parser.add_argument('--min-comment-yield', type=float, default=2.0,
+                        help='With --adaptive, stop when recent posts yield fewer comments each than this')
+    parser.add_argument('--min-posts', type=int, default=10,
+                        help='With --adaptive, always fetch at least this many posts per month')
     parser.add_argument('--output-dir', default='data/historical',
                         help='Directory to save the output files')
     parser.add_argument('--checkpoint-file', default='data/historical/checkpoint.json',
-                        help='Path to checkpoint file for resuming')
+                        help='Path to checkpoint file for resuming (only used with --no-ledger)')
+    parser.add_argument('--ledger-file', default='data/historical/jobs.db',
+                        help='Job ledger tracking which months are done, failed or in progress')
+    parser.add_argument('--no-ledger', action='store_true',
+                        help='Resume from the checkpoint file instead of the job ledger')
     parser.add_argument('--test-mode', action='store_true',
                         help='Run in test mode with just one month of data')
     
@@ -296,6 +455,17 @@ def main():
     logger.info(f"Current directory: {os.getcwd()}")
     logger.info(f"Output directory: {output_dir}")
     
+    ledger = None if args.no_ledger else JobLedger(os.path.join(project_root, args.ledger_file))
+    
+    adaptive_limit = None
+    if args.adaptive:
+        adaptive_limit = AdaptiveLimit(
+            engagement_quantile=args.engagement_quantile,
+            min_yield=args.min_comment_yield,
+            min_posts=args.min_posts,
+            metric=args.engagement_metric
+        )
+    
     # Scrape historical data
     scrape_historical_data_by_month(
         args.subreddits,
@@ -303,7 +473,9 @@ def main():
         end_date,
         output_dir,
         args.limit,
-        checkpoint_file
+        checkpoint_file,
+        ledger=ledger,
+        adaptive_limit=adaptive_limit
     )
 
 if __name__ == "__main__":
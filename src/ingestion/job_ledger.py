@@ -0,0 +1,313 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    source TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    partition TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    priority REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    updated_at REAL,
+    PRIMARY KEY (source, unit)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (source, partition, status, next_attempt_at);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class LeaseLost(Exception):
+    """Raised by a worker that finds its lease has been taken over by another"""
+
+class JobLedger:
+    """
+    SQLite-backed ledger of scraping work items shared by every scraper.
+
+    A work item is a (source, unit) pair such as ('reddit_month', '2023-04') or
+    ('adore_product', url). Workers claim items under a time-limited lease, then
+    complete them with a JSON result or fail them; failures are retried with
+    exponential backoff until max_attempts is reached. A lease that expires
+    (because its worker died) makes the item claimable again, so interrupted
+    runs and parallel workers resume the same way for every source.
+
+    Each instance holds its own connection; processes should open their own
+    ledger on the same file rather than share one. WAL mode lets readers and a
+    writer work concurrently on a local disk.
+    """
+
+    def __init__(self, db_file="data/jobs.db", lease_seconds=600, max_attempts=5,
+                 backoff_base=30, backoff_max=3600, journal_mode='WAL'):
+        self.db_file = db_file
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; writes that read first use explicit IMMEDIATE transactions
+        self.conn = sqlite3.connect(db_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript(SCHEMA)
+        # Ledgers created before claims were prioritised lack the column
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+        if 'priority' not in columns:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database lock up front"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def add(self, source, units, partition='', priorities=None):
+        """
+        Register work items, ignoring ones that already exist; returns the number added.
+
+        priorities ({unit: score}, higher is claimed first) is stored for new
+        items and replaces the priority of existing items not yet done.
+        """
+        now = time.time()
+        priorities = priorities or {}
+        units = [str(unit) for unit in dict.fromkeys(units)]
+        with self.transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (source, unit, partition, priority, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(source, unit, partition, priorities.get(unit, 0), now) for unit in units]
+            )
+            added = conn.total_changes - before
+            if priorities:
+                conn.executemany(
+                    "UPDATE jobs SET priority = ? WHERE source = ? AND unit = ? AND status != 'done'",
+                    [(priorities[unit], source, unit) for unit in units if unit in priorities]
+                )
+            return added
+
+    def claim(self, source, worker_id=None, limit=1, partition=None, now=None):
+        """
+        Lease up to limit claimable items, highest priority first and then in
+        the order they were added.
+
+        Pending items whose backoff has elapsed and leased items whose lease has
+        expired are claimable. Returns the claimed units.
+        """
+        worker_id = worker_id or default_worker_id()
+        now = now or time.time()
+        query = (
+            "SELECT unit FROM jobs WHERE source = ? AND ("
+            "(status = 'pending' AND next_attempt_at <= ?) OR (status = 'leased' AND lease_expires <= ?))"
+        )
+        params = [source, now, now]
+        if partition is not None:
+            query += " AND partition = ?"
+            params.append(partition)
+        query += " ORDER BY priority DESC, rowid LIMIT ?"
+        params.append(limit)
+
+        # Select and lease in one write transaction so two workers can't claim the same rows
+        with self.transaction() as conn:
+            units = [row[0] for row in conn.execute(query, params)]
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE source = ? AND unit = ?",
+                [(worker_id, now + self.lease_seconds, now, source, unit) for unit in units]
+            )
+        return units
+
+    def start(self, source, unit, worker_id=None):
+        """
+        Lease one specific item, ignoring its backoff.
+
+        For callers that walk their units in a fixed order (such as listing
+        pages) rather than claiming whatever is next. False if it's already
+        done or another worker holds an unexpired lease on it.
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE source = ? AND unit = ? AND status != 'done' "
+                "AND (status != 'leased' OR lease_expires <= ? OR lease_owner = ?)",
+                (worker_id, now + self.lease_seconds, now, source, str(unit), now, worker_id)
+            )
+        return cursor.rowcount > 0
+
+    def renew(self, source, unit, worker_id=None):
+        """Extend a lease for long-running work; False if the lease was lost"""
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE source = ? AND unit = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds, now, source, str(unit), worker_id)
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, source, unit, result=None, worker_id=None):
+        """
+        Mark an item done and store its result.
+
+        With a worker_id the item is only completed while that worker still
+        holds its lease, so a worker whose expired lease was claimed by another
+        can't record it as well. Returns whether the item was completed.
+        """
+        query = (
+            "UPDATE jobs SET status = 'done', lease_owner = NULL, lease_expires = NULL, "
+            "last_error = NULL, result = ?, updated_at = ? WHERE source = ? AND unit = ?"
+        )
+        params = [json.dumps(result, default=str), time.time(), source, str(unit)]
+        if worker_id is not None:
+            query += " AND status = 'leased' AND lease_owner = ?"
+            params.append(worker_id)
+        with self.lock:
+            cursor = self.conn.execute(query, params)
+        return cursor.rowcount > 0
+
+    def fail(self, source, unit, error=None, now=None, worker_id=None):
+        """
+        Record a failed attempt.
+
+        The item is retried after an exponential backoff, or marked failed once
+        it has used max_attempts. Returns the new status, or None if worker_id
+        no longer holds the item's lease.
+        """
+        now = now or time.time()
+        query = "SELECT attempts FROM jobs WHERE source = ? AND unit = ?"
+        params = [source, str(unit)]
+        if worker_id is not None:
+            query += " AND status = 'leased' AND lease_owner = ?"
+            params.append(worker_id)
+        with self.transaction() as conn:
+            row = conn.execute(query, params).fetchone()
+            if row is None and worker_id is not None:
+                return None
+            attempts = max(row[0] if row else 1, 1)
+            if attempts >= self.max_attempts:
+                status, next_attempt_at = FAILED, now
+            else:
+                status = PENDING
+                next_attempt_at = now + min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+            conn.execute(
+                "UPDATE jobs SET status = ?, next_attempt_at = ?, last_error = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE source = ? AND unit = ?",
+                (status, next_attempt_at, None if error is None else str(error), now, source, str(unit))
+            )
+        return status
+
+    def release(self, source, unit):
+        """Hand a leased item back without counting the attempt"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE source = ? AND unit = ? AND status = 'leased'",
+                (time.time(), source, str(unit))
+            )
+
+    def reset(self, source, statuses=(FAILED,)):
+        """Make items in the given statuses pending again with fresh attempts"""
+        placeholders = ','.join('?' * len(statuses))
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, next_attempt_at = 0, lease_owner = NULL, "
+                f"lease_expires = NULL, updated_at = ? WHERE source = ? AND status IN ({placeholders})",
+                (time.time(), source, *statuses)
+            )
+        return cursor.rowcount
+
+    def status(self, source, unit):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status FROM jobs WHERE source = ? AND unit = ?", (source, str(unit))
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_done(self, source, unit):
+        return self.status(source, unit) == DONE
+
+    def result(self, source, unit):
+        """Return the stored result of a completed item, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result FROM jobs WHERE source = ? AND unit = ? AND status = 'done'",
+                (source, str(unit))
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def units(self, source, status=None, partition=None):
+        """List a source's units, optionally filtered by status and partition"""
+        query = "SELECT unit FROM jobs WHERE source = ?"
+        params = [source]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        if partition is not None:
+            query += " AND partition = ?"
+            params.append(partition)
+        with self.lock:
+            return [row[0] for row in self.conn.execute(query + " ORDER BY rowid", params)]
+
+    def leases(self, source=None, now=None):
+        """Return {worker_id: active lease count}"""
+        now = now or time.time()
+        query = "SELECT lease_owner, COUNT(*) FROM jobs WHERE status = 'leased' AND lease_expires > ?"
+        params = [now]
+        if source is not None:
+            query += " AND source = ?"
+            params.append(source)
+        with self.lock:
+            return dict(self.conn.execute(query + " GROUP BY lease_owner", params).fetchall())
+
+    def done_since(self, source, since):
+        """Number of items completed since a timestamp"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE source = ? AND status = 'done' AND updated_at >= ?",
+                (source, since)
+            ).fetchone()
+        return row[0]
+
+    def progress(self, source=None):
+        """Return {source: {status: count}} for one or all sources"""
+        query = "SELECT source, status, COUNT(*) FROM jobs"
+        params = []
+        if source is not None:
+            query += " WHERE source = ?"
+            params.append(source)
+        progress = {}
+        with self.lock:
+            for row_source, status, count in self.conn.execute(query + " GROUP BY source, status", params):
+                progress.setdefault(row_source, {})[status] = count
+        return progress
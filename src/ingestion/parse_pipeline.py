@@ -0,0 +1,105 @@
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue
+
+_DONE = object()
+
+
+class FetchParsePipeline:
+    """
+    Run network fetching and HTML parsing as separate, overlapping stages.
+
+    Fetcher threads pull items, call fetch(item) and put the raw result on a
+    bounded queue, so they block instead of racing ahead of the parsers. The
+    calling thread submits each fetched page to a process pool, which runs the
+    CPU-bound parse outside the GIL, and passes parse results to handle() in
+    submission order. handle() runs on the calling thread only, so writers
+    don't need to be thread-safe.
+
+    fetch(item) returns None on failure, or (context, parse_args). context is
+    passed through to handle(); parse_args is the argument tuple for parse, or
+    None if the page needs no parsing. parse must be a module-level function so
+    it can be sent to worker processes. handle(item, context, result) may
+    return False to stop the pipeline early; failed fetches and parses are
+    handed over with context and result set to None. Stopping only ends
+    fetching; pages already fetched are still parsed and handled.
+    """
+
+    def __init__(self, fetch, parse, handle, fetch_workers=4, parse_workers=None, queue_size=32):
+        self.fetch = fetch
+        self.parse = parse
+        self.handle = handle
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+
+    def run(self, items):
+        """Process all items, returning the number handled"""
+        items = iter(items)
+        items_lock = threading.Lock()
+        queue = Queue(maxsize=self.queue_size)
+        stop_event = threading.Event()
+
+        def fetcher():
+            while not stop_event.is_set():
+                with items_lock:
+                    item = next(items, _DONE)
+                if item is _DONE:
+                    break
+                try:
+                    fetched = self.fetch(item)
+                except Exception as e:
+                    print(f"Error fetching {item}: {str(e)}")
+                    fetched = None
+                queue.put((item, fetched))
+            queue.put(_DONE)
+
+        threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(self.fetch_workers)]
+        for thread in threads:
+            thread.start()
+
+        handled = 0
+        pending = deque()  # (item, context, future or None) in submission order
+
+        def handle_next():
+            item, context, future = pending.popleft()
+            result = None
+            if future is not None:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error parsing {item}: {str(e)}")
+                    context = None
+            if self.handle(item, context, result) is False:
+                stop_event.set()
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            finished_fetchers = 0
+            while finished_fetchers < self.fetch_workers:
+                entry = queue.get()
+                if entry is _DONE:
+                    finished_fetchers += 1
+                    continue
+
+                item, fetched = entry
+                if fetched is None:
+                    pending.append((item, None, None))
+                else:
+                    context, parse_args = fetched
+                    future = pool.submit(self.parse, *parse_args) if parse_args is not None else None
+                    pending.append((item, context, future))
+
+                # Hand over finished results and bound the pages in flight
+                while pending and (len(pending) > self.queue_size
+                                   or pending[0][2] is None or pending[0][2].done()):
+                    handle_next()
+                    handled += 1
+
+            while pending:
+                handle_next()
+                handled += 1
+
+        for thread in threads:
+            thread.join()
+        return handled
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+def hash_text(text):
+    """Return a stable hex digest for a block of text"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    """
+    Per-product fingerprints used to skip unchanged products on recurring
+    review crawls.
+
+    Each entry is keyed by product URL and holds the validators returned by
+    the server (ETag / Last-Modified), a hash of the raw structured-data block,
+    a hash of the review list and the review count.
+    """
+
+    def __init__(self, filepath="data/raw/product_fingerprints.json"):
+        self.filepath = filepath
+        self.fingerprints = self.load()
+        self.dirty = False
+
+    def load(self):
+        """Load fingerprints from disk, returning an empty store if missing"""
+        if os.path.exists(self.filepath):
+            try:
+                with open(self.filepath, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading fingerprints from {self.filepath}: {str(e)}")
+        return {}
+
+    def save(self):
+        """Write fingerprints to disk if anything has changed"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file first so an interrupted save can't corrupt the store
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.fingerprints, f)
+        os.replace(tmp_path, self.filepath)
+        self.dirty = False
+
+    def merge_from(self, filepath):
+        """Merge fingerprints from another store file, which take precedence"""
+        other = FingerprintStore(filepath).fingerprints
+        if other:
+            self.fingerprints.update(other)
+            self.dirty = True
+        return len(other)
+
+    def get(self, url):
+        return self.fingerprints.get(url)
+
+    def conditional_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers for a product"""
+        headers = {}
+        fingerprint = self.fingerprints.get(url)
+        if fingerprint:
+            if fingerprint.get('etag'):
+                headers['If-None-Match'] = fingerprint['etag']
+            if fingerprint.get('last_modified'):
+                headers['If-Modified-Since'] = fingerprint['last_modified']
+        return headers
+
+    def touch(self, url, response=None, changed=False):
+        """Record that a product was checked, refreshing its validators"""
+        fingerprint = self.fingerprints.setdefault(url, {})
+        # Check and change counts give the scheduler each product's past yield
+        fingerprint['checks'] = fingerprint.get('checks', 0) + 1
+        if changed:
+            fingerprint['changes'] = fingerprint.get('changes', 0) + 1
+        if response is not None:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag:
+                fingerprint['etag'] = etag
+            if last_modified:
+                fingerprint['last_modified'] = last_modified
+        fingerprint['last_checked'] = datetime.now().isoformat()
+        self.dirty = True
+        return fingerprint
+
+    def data_unchanged(self, url, data_hash):
+        """True if the raw structured-data block matches the last crawl"""
+        fingerprint = self.fingerprints.get(url)
+        return bool(fingerprint) and fingerprint.get('data_hash') == data_hash
+
+    def reviews_unchanged(self, url, review_hash, review_count):
+        """True if the review block and count match the last crawl"""
+        fingerprint = self.fingerprints.get(url)
+        return (
+            bool(fingerprint)
+            and fingerprint.get('review_hash') == review_hash
+            and fingerprint.get('review_count') == review_count
+        )
+
+    def update(self, url, response=None, data_hash=None, review_hash=None, review_count=None,
+               changed=False):
+        """Store the latest fingerprint for a product"""
+        fingerprint = self.touch(url, response, changed)
+        if data_hash is not None:
+            fingerprint['data_hash'] = data_hash
+        if review_hash is not None:
+            fingerprint['review_hash'] = review_hash
+        if review_count is not None:
+            fingerprint['review_count'] = review_count
+        return fingerprint
@@ -0,0 +1,122 @@
+import os
+import re
+from datetime import datetime, timedelta
+from urllib.parse import urljoin
+
+import pandas as pd
+
+PRICE_PATTERN = re.compile(r'\$\s?(\d[\d,]*(?:\.\d{1,2})?)')
+RATING_PATTERN = re.compile(r'(\d(?:\.\d+)?)\s*(?:out of|/)\s*5')
+REVIEW_COUNT_PATTERNS = [
+    re.compile(r'(\d[\d,]*)\s+reviews?', re.IGNORECASE),
+    re.compile(r'\((\d[\d,]*)\)'),
+]
+
+SNAPSHOT_COLUMNS = ['url', 'name', 'price', 'rating', 'review_count', 'crawled_at']
+
+
+def parse_number(text, cast=float):
+    try:
+        return cast(text.replace(',', ''))
+    except (AttributeError, ValueError):
+        return None
+
+def parse_product_card(container, base_url):
+    """
+    Extract listing-card metadata from a product container.
+
+    Returns a dict with the product URL, name, price, rating and review count,
+    or None if the card has no product link. Fields that can't be found are None.
+    """
+    product_link = container.find('a', href=True)
+    if not product_link or '/p/' not in product_link['href']:
+        return None
+
+    text = container.get_text(' ', strip=True)
+
+    name = product_link.get('title') or product_link.get_text(' ', strip=True)
+    if not name:
+        image = container.find('img', alt=True)
+        name = image['alt'] if image else None
+
+    price_match = PRICE_PATTERN.search(text)
+
+    # Star ratings are usually only exposed through an aria-label or title
+    rating = None
+    for element in container.find_all(attrs={'aria-label': True}):
+        match = RATING_PATTERN.search(element['aria-label'])
+        if match:
+            rating = parse_number(match.group(1))
+            break
+    if rating is None:
+        match = RATING_PATTERN.search(text)
+        rating = parse_number(match.group(1)) if match else None
+
+    review_count = None
+    for pattern in REVIEW_COUNT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            review_count = parse_number(match.group(1), int)
+            break
+
+    return {
+        'url': urljoin(base_url, product_link['href']),
+        'name': name or None,
+        'price': parse_number(price_match.group(1)) if price_match else None,
+        'rating': rating,
+        'review_count': review_count,
+    }
+
+def save_snapshots(snapshots, snapshot_file="data/raw/product_snapshots.csv", crawled_at=None):
+    """Append a listing crawl's product snapshots to the snapshot table"""
+    if not snapshots:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+    snapshots_df = pd.DataFrame(list(snapshots))
+    snapshots_df['crawled_at'] = (crawled_at or datetime.now()).isoformat()
+    snapshots_df = snapshots_df.reindex(columns=SNAPSHOT_COLUMNS)
+
+    directory = os.path.dirname(snapshot_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_header = not os.path.exists(snapshot_file)
+    snapshots_df.to_csv(snapshot_file, mode='a', header=write_header, index=False)
+    print(f"Saved {len(snapshots_df)} product snapshots to {snapshot_file}")
+    return snapshots_df
+
+def load_latest_review_counts(snapshot_file="data/raw/product_snapshots.csv", max_age_days=7, now=None):
+    """
+    Return {url: {'review_count', 'crawled_at'}} from the most recent snapshot
+    of each product.
+
+    Snapshots older than max_age_days are left out, so a count nobody has
+    refreshed can't keep a product from being crawled.
+    """
+    if not os.path.exists(snapshot_file):
+        return {}
+    snapshots_df = pd.read_csv(snapshot_file, usecols=['url', 'review_count', 'crawled_at'])
+    snapshots_df = snapshots_df.dropna(subset=['review_count'])
+    snapshots_df['crawled_at'] = pd.to_datetime(snapshots_df['crawled_at'])
+    if max_age_days is not None:
+        cutoff = (now or datetime.now()) - timedelta(days=max_age_days)
+        snapshots_df = snapshots_df[snapshots_df['crawled_at'] >= cutoff]
+    latest = snapshots_df.sort_values('crawled_at').drop_duplicates(subset='url', keep='last')
+    return {
+        url: {'review_count': int(review_count), 'crawled_at': crawled_at.to_pydatetime()}
+        for url, review_count, crawled_at in zip(latest['url'], latest['review_count'], latest['crawled_at'])
+    }
+
+def load_review_velocity(snapshot_file="data/raw/product_snapshots.csv"):
+    """Return {url: new reviews per day} from the snapshot history of each product"""
+    if not os.path.exists(snapshot_file):
+        return {}
+    snapshots_df = pd.read_csv(snapshot_file, usecols=['url', 'review_count', 'crawled_at'])
+    snapshots_df = snapshots_df.dropna(subset=['review_count'])
+    snapshots_df['crawled_at'] = pd.to_datetime(snapshots_df['crawled_at'])
+
+    grouped = snapshots_df.sort_values('crawled_at').groupby('url')
+    first = grouped.first()
+    last = grouped.last()
+    days = (last['crawled_at'] - first['crawled_at']).dt.total_seconds() / 86400
+    velocity = (last['review_count'] - first['review_count']) / days.where(days > 0)
+    return velocity.dropna().clip(lower=0).to_dict()
@@ -0,0 +1,220 @@
+import heapq
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+class ProxyPool:
+    """
+    Health-scored pool of HTTP proxies.
+
+    Candidates are validated concurrently in a background thread and only enter
+    the active set once they have served a request. Each proxy tracks a latency
+    EWMA and success/failure counts which give it a weight in (0, 1]. Selection
+    picks a random active proxy and accepts it with probability equal to its
+    weight, so a choice is O(1) on average with no list rebuilds.
+
+    Repeated failures open a circuit breaker that benches the proxy for an
+    exponentially growing cooldown. After the cooldown it is let back in
+    half-open, where a single failure re-opens the circuit. Proxies that keep
+    tripping, or whose success rate stays low, are evicted for good.
+    """
+
+    def __init__(self, test_url="https://www.adorebeauty.com.au/robots.txt",
+                 validate_timeout=8, max_workers=32, max_consecutive_failures=3,
+                 min_success_rate=0.3, min_samples=5, base_cooldown=30,
+                 max_cooldown=600, max_trips=4, reference_latency=0.5):
+        self.test_url = test_url
+        self.validate_timeout = validate_timeout
+        self.max_workers = max_workers
+        self.max_consecutive_failures = max_consecutive_failures
+        self.min_success_rate = min_success_rate
+        self.min_samples = min_samples
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.max_trips = max_trips
+        self.reference_latency = reference_latency
+
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.active = []        # Proxies eligible for selection
+        self.positions = {}     # Proxy -> index in self.active for O(1) removal
+        self.cooling = []       # Heap of (reopen_time, proxy) for open circuits
+        self.evicted = set()
+        self.validation_thread = None
+
+    def new_stats(self):
+        return {
+            'latency': None,
+            'successes': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'trips': 0,
+            'state': 'pending',
+        }
+
+    def weight(self, stats):
+        """Score a proxy in (0, 1] from its success rate and latency"""
+        # Laplace smoothing keeps new proxies from scoring 0 or 1 outright
+        success_rate = (stats['successes'] + 1) / (stats['successes'] + stats['failures'] + 2)
+        latency = stats['latency'] or self.reference_latency
+        speed = min(1.0, self.reference_latency / max(latency, 1e-3))
+        return max(success_rate * speed, 0.01)
+
+    def _activate(self, proxy):
+        if proxy in self.positions:
+            return
+        self.positions[proxy] = len(self.active)
+        self.active.append(proxy)
+
+    def _deactivate(self, proxy):
+        index = self.positions.pop(proxy, None)
+        if index is None:
+            return
+        # Swap with the last element so removal is O(1)
+        last = self.active.pop()
+        if index < len(self.active):
+            self.active[index] = last
+            self.positions[last] = index
+
+    def _release_cooled(self, now):
+        """Move proxies whose cooldown has expired back in, half-open"""
+        while self.cooling and self.cooling[0][0] <= now:
+            _, proxy = heapq.heappop(self.cooling)
+            stats = self.stats.get(proxy)
+            if stats is None or stats['state'] != 'open':
+                continue
+            stats['state'] = 'half-open'
+            stats['consecutive_failures'] = self.max_consecutive_failures - 1
+            self._activate(proxy)
+
+    def get(self):
+        """Pick a proxy by weighted choice, or None if none are healthy"""
+        with self.lock:
+            self._release_cooled(time.time())
+            if not self.active:
+                return None
+
+            # Rejection sampling: expected tries are 1 / mean weight
+            for _ in range(50):
+                proxy = self.active[random.randrange(len(self.active))]
+                if random.random() <= self.weight(self.stats[proxy]):
+                    return proxy
+            return proxy
+
+    def record_success(self, proxy, latency):
+        """Update a proxy's stats after a successful request"""
+        with self.lock:
+            stats = self.stats.get(proxy)
+            if stats is None or proxy in self.evicted:
+                return
+            stats['successes'] += 1
+            stats['consecutive_failures'] = 0
+            stats['trips'] = 0
+            # Exponentially weighted moving average of latency
+            if stats['latency'] is None:
+                stats['latency'] = latency
+            else:
+                stats['latency'] = 0.7 * stats['latency'] + 0.3 * latency
+            stats['state'] = 'closed'
+            self._activate(proxy)
+
+    def record_failure(self, proxy):
+        """Update a proxy's stats after a failure, tripping or evicting it"""
+        with self.lock:
+            stats = self.stats.get(proxy)
+            if stats is None or proxy in self.evicted:
+                return
+            stats['failures'] += 1
+            stats['consecutive_failures'] += 1
+
+            samples = stats['successes'] + stats['failures']
+            success_rate = stats['successes'] / samples
+            if samples >= self.min_samples and success_rate < self.min_success_rate:
+                self._evict(proxy)
+                return
+
+            if stats['consecutive_failures'] >= self.max_consecutive_failures:
+                stats['trips'] += 1
+                if stats['state'] == 'pending' or stats['trips'] > self.max_trips:
+                    # Never worked, or keeps failing after cooldowns
+                    self._evict(proxy)
+                    return
+                cooldown = min(self.base_cooldown * 2 ** (stats['trips'] - 1), self.max_cooldown)
+                stats['state'] = 'open'
+                self._deactivate(proxy)
+                heapq.heappush(self.cooling, (time.time() + cooldown, proxy))
+
+    def _evict(self, proxy):
+        self.stats[proxy]['state'] = 'evicted'
+        self._deactivate(proxy)
+        self.evicted.add(proxy)
+
+    def validate(self, proxy):
+        """Check a proxy with a single request and record the result"""
+        start = time.time()
+        try:
+            response = requests.get(
+                self.test_url,
+                proxies={'http': f'http://{proxy}', 'https': f'http://{proxy}'},
+                timeout=self.validate_timeout
+            )
+            response.raise_for_status()
+        except Exception:
+            # A candidate that fails validation is dropped straight away
+            with self.lock:
+                self.stats[proxy]['consecutive_failures'] = self.max_consecutive_failures - 1
+            self.record_failure(proxy)
+            return False
+        self.record_success(proxy, time.time() - start)
+        return True
+
+    def add_candidates(self, proxies):
+        """Register new candidate proxies, returning the ones not seen before"""
+        new_proxies = []
+        with self.lock:
+            for proxy in proxies:
+                if proxy and proxy not in self.stats and proxy not in self.evicted:
+                    self.stats[proxy] = self.new_stats()
+                    new_proxies.append(proxy)
+        return new_proxies
+
+    def validate_in_background(self, proxies):
+        """Validate candidates concurrently without blocking the caller"""
+        candidates = self.add_candidates(proxies)
+        if not candidates:
+            return None
+
+        def run():
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(self.validate, candidates))
+
+        self.validation_thread = threading.Thread(target=run, daemon=True)
+        self.validation_thread.start()
+        return self.validation_thread
+
+    def wait_for_healthy(self, min_count=1, timeout=30):
+        """Block until at least min_count proxies are active or timeout passes"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.healthy_count() >= min_count:
+                return True
+            if self.validation_thread is not None and not self.validation_thread.is_alive():
+                break
+            time.sleep(0.2)
+        return self.healthy_count() >= min_count
+
+    def healthy_count(self):
+        with self.lock:
+            return len(self.active)
+
+    def summary(self):
+        """Count proxies in each state"""
+        with self.lock:
+            counts = {}
+            for stats in self.stats.values():
+                counts[stats['state']] = counts.get(stats['state'], 0) + 1
+            return counts
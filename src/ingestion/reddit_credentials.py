@@ -0,0 +1,182 @@
+import hashlib
+import sys
+import os
+import threading
+from contextlib import contextmanager
+
+import praw
+from prawcore import Requestor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REDDIT_CREDENTIALS, REDDIT_REQUESTS_PER_MINUTE
+
+try:
+    from .throttle import AdaptiveThrottle
+except ImportError:
+    from throttle import AdaptiveThrottle
+
+
+class RateLimitedRequestor(Requestor):
+    """
+    prawcore requestor that paces every HTTP request through a throttle.
+
+    praw only backs off once Reddit's rate-limit headers say so; this keeps
+    each credential inside its own budget up front and records per-credential
+    usage, including the remaining quota Reddit reports.
+    """
+
+    def __init__(self, *args, credential=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.credential = credential
+
+    def request(self, *args, **kwargs):
+        if self.credential is None:
+            return super().request(*args, **kwargs)
+
+        self.credential.throttle.wait()
+        try:
+            response = super().request(*args, **kwargs)
+        except Exception:
+            self.credential.record(None)
+            raise
+        self.credential.record(response.status_code, response.headers)
+        return response
+
+class RedditCredential:
+    """One Reddit app: its own rate limiter, idle praw clients and usage counts"""
+
+    def __init__(self, name, client_id, client_secret, user_agent, requests_per_minute=90):
+        self.name = name
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.user_agent = user_agent
+        rate = requests_per_minute / 60
+        # Never above the budget; backs off on 429s and recovers towards it
+        self.throttle = AdaptiveThrottle(initial_rate=rate, max_rate=rate, min_rate=rate / 10,
+                                         increase=rate / 20, jitter=0.1)
+        self.lock = threading.Lock()
+        self.idle_clients = []
+        self.clients_created = 0
+        self.in_use = 0
+        self.errors = 0
+        self.ratelimit_remaining = None
+
+    def create_client(self):
+        self.clients_created += 1
+        return praw.Reddit(
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            user_agent=self.user_agent,
+            requestor_class=RateLimitedRequestor,
+            requestor_kwargs={'credential': self}
+        )
+
+    def acquire(self):
+        """Take an idle client, creating one if all are busy (praw clients aren't thread-safe)"""
+        with self.lock:
+            self.in_use += 1
+            if self.idle_clients:
+                return self.idle_clients.pop()
+            return self.create_client()
+
+    def release(self, reddit):
+        with self.lock:
+            self.in_use -= 1
+            self.idle_clients.append(reddit)
+
+    def record(self, status_code, headers=None):
+        self.throttle.record(status_code)
+        with self.lock:
+            if status_code is None or status_code >= 400:
+                self.errors += 1
+            if headers and headers.get('x-ratelimit-remaining') is not None:
+                try:
+                    self.ratelimit_remaining = float(headers['x-ratelimit-remaining'])
+                except ValueError:
+                    pass
+
+    def usage(self):
+        stats = self.throttle.stats()
+        with self.lock:
+            stats.update({
+                'errors': self.errors,
+                'clients': self.clients_created,
+                'in_use': self.in_use,
+                'ratelimit_remaining': self.ratelimit_remaining,
+            })
+        return stats
+
+class CredentialPool:
+    """
+    Spread Reddit work across several app credentials.
+
+    Each credential has its own rate budget, so aggregate throughput grows with
+    the number of registered apps. Work units (such as subreddits) map to a
+    credential by stable hash, or are dealt out evenly with assign().
+    """
+
+    def __init__(self, credentials=None, requests_per_minute=None):
+        credentials = REDDIT_CREDENTIALS if credentials is None else credentials
+        if not credentials:
+            raise ValueError("No Reddit credentials configured")
+        requests_per_minute = requests_per_minute or REDDIT_REQUESTS_PER_MINUTE
+        self.credentials = [
+            RedditCredential(
+                credential.get('name') or f"app{index}",
+                credential['client_id'],
+                credential['client_secret'],
+                credential['user_agent'],
+                requests_per_minute
+            )
+            for index, credential in enumerate(credentials, 1)
+        ]
+
+    def __len__(self):
+        return len(self.credentials)
+
+    def credential_for(self, key):
+        """The credential a work unit is pinned to"""
+        digest = hashlib.sha1(str(key).encode('utf-8')).hexdigest()
+        return self.credentials[int(digest[:8], 16) % len(self.credentials)]
+
+    def assign(self, units):
+        """Deal units round-robin across credentials: {credential name: [units]}"""
+        assignment = {credential.name: [] for credential in self.credentials}
+        for index, unit in enumerate(units):
+            assignment[self.credentials[index % len(self.credentials)].name].append(unit)
+        return assignment
+
+    def get(self, name):
+        for credential in self.credentials:
+            if credential.name == name:
+                return credential
+        raise KeyError(name)
+
+    @contextmanager
+    def client(self, key=None, credential=None):
+        """
+        Borrow a praw client.
+
+        Uses the named credential if given, else the one key hashes to, else the
+        credential with the fewest clients in use.
+        """
+        if credential is not None:
+            credential = self.get(credential) if isinstance(credential, str) else credential
+        elif key is not None:
+            credential = self.credential_for(key)
+        else:
+            credential = min(self.credentials, key=lambda c: c.in_use)
+
+        reddit = credential.acquire()
+        try:
+            yield reddit
+        finally:
+            credential.release(reddit)
+
+    def usage(self):
+        """Per-credential usage: {credential name: stats}"""
+        return {credential.name: credential.usage() for credential in self.credentials}
+
+    def report(self):
+        for name, stats in self.usage().items():
+            print(f"Reddit credential {name}: {stats}")
@@ -0,0 +1,282 @@
+"""
+Fast path for Reddit scraping that skips praw's object model.
+
+scrape_subreddit builds a praw Submission and Comment for every item and reads
+their attributes through praw's lazy-loading machinery. This module requests
+the same listing and comment JSON from the OAuth API directly, decodes it with
+orjson (falling back to the standard json module) and walks the plain dicts
+into the posts and comments column layout scrape_subreddit emits.
+"""
+import json
+import sys
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT
+
+try:
+    from .throttle import AdaptiveThrottle
+except ImportError:
+    from throttle import AdaptiveThrottle
+
+TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
+API_URL = "https://oauth.reddit.com"
+
+# Listing pages and /api/morechildren both cap out at 100 items per request
+PAGE_SIZE = 100
+MORE_CHILDREN_BATCH = 100
+
+
+class RedditJsonClient:
+    """
+    Minimal app-only OAuth client that returns decoded JSON.
+
+    Pass a RedditCredential from a CredentialPool to share that app's rate
+    budget and usage counts with the praw clients using it.
+    """
+
+    def __init__(self, client_id=None, client_secret=None, user_agent=None,
+                 credential=None, requests_per_minute=90):
+        if credential is not None:
+            client_id = credential.client_id
+            client_secret = credential.client_secret
+            user_agent = credential.user_agent
+            self.throttle = credential.throttle
+        else:
+            rate = requests_per_minute / 60
+            self.throttle = AdaptiveThrottle(initial_rate=rate, max_rate=rate, min_rate=rate / 10,
+                                             increase=rate / 20, jitter=0.1)
+        self.client_id = client_id or REDDIT_CLIENT_ID
+        self.client_secret = client_secret or REDDIT_CLIENT_SECRET
+        self.credential = credential
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent or REDDIT_USER_AGENT
+        self.token = None
+        self.token_expires = 0
+        self.requests = 0
+
+    def authenticate(self):
+        response = self.session.post(
+            TOKEN_URL,
+            auth=(self.client_id, self.client_secret),
+            data={'grant_type': 'client_credentials'},
+            timeout=30
+        )
+        response.raise_for_status()
+        token = loads(response.content)
+        self.token = token['access_token']
+        # Renew a minute early rather than have a request bounce
+        self.token_expires = time.time() + token.get('expires_in', 3600) - 60
+
+    def get_raw(self, path, params=None, max_retries=3):
+        """GET an API path and return the undecoded response body"""
+        params = dict(params or {})
+        # Without raw_json Reddit HTML-escapes bodies, unlike what praw returns
+        params.setdefault('raw_json', 1)
+
+        for attempt in range(max_retries + 1):
+            if self.token is None or time.time() >= self.token_expires:
+                self.authenticate()
+
+            self.throttle.wait()
+            try:
+                response = self.session.get(
+                    f"{API_URL}{path}", params=params, timeout=30,
+                    headers={'Authorization': f"bearer {self.token}"}
+                )
+            except requests.RequestException:
+                self.record(None)
+                if attempt == max_retries:
+                    raise
+                continue
+            self.requests += 1
+            self.record(response.status_code, response.headers)
+
+            if response.status_code == 401:
+                self.token = None
+                continue
+            if response.status_code == 429 and attempt < max_retries:
+                wait = float(response.headers.get('retry-after') or 60)
+                print(f"Hit rate limit, waiting {wait:.0f} seconds...")
+                time.sleep(wait)
+                continue
+            response.raise_for_status()
+            return response.content
+
+        response.raise_for_status()
+        return response.content
+
+    def get_json(self, path, params=None):
+        return loads(self.get_raw(path, params))
+
+    def record(self, status_code, headers=None):
+        if self.credential is not None:
+            self.credential.record(status_code, headers)
+        else:
+            self.throttle.record(status_code)
+
+def parse_post(data):
+    """Post row in scrape_subreddit's layout from a t3 data dict"""
+    return {
+        'id': data['id'],
+        'title': data.get('title'),
+        'body': data.get('selftext'),
+        'score': data.get('score'),
+        'created_utc': datetime.fromtimestamp(data['created_utc']),
+        'num_comments': data.get('num_comments'),
+    }
+
+def parse_comment(data, post_id):
+    """Comment row in scrape_subreddit's layout from a t1 data dict"""
+    author = data.get('author')
+    return {
+        'comment_id': data['id'],
+        'post_id': post_id,
+        'body': data.get('body'),
+        'score': data.get('score'),
+        'created_utc': datetime.fromtimestamp(data['created_utc']),
+        # praw turns deleted authors into None, which str() then writes as 'None'
+        'author': 'None' if author in (None, '[deleted]') else author,
+        'author_fullname': data.get('author_fullname'),
+        'author_flair': data.get('author_flair_text'),
+    }
+
+def parse_comment_tree(children, post_id):
+    """
+    Flatten a comment listing's children breadth-first, in the same order as
+    praw's CommentForest.list().
+
+    Returns (comment rows, "more" stubs) where each stub is the data dict of a
+    collapsed branch still to be expanded.
+    """
+    comments = []
+    more = []
+    queue = deque(children)
+    while queue:
+        thing = queue.popleft()
+        if thing['kind'] == 'more':
+            more.append(thing['data'])
+            continue
+        if thing['kind'] != 't1':
+            continue
+        data = thing['data']
+        comments.append(parse_comment(data, post_id))
+        replies = data.get('replies')
+        # Comments without replies have an empty string instead of a listing
+        if replies:
+            queue.extend(replies['data']['children'])
+    return comments, more
+
+def parse_listing(listing):
+    """Post data dicts and the 'after' cursor of a decoded listing page"""
+    data = listing['data']
+    posts = [child['data'] for child in data['children'] if child['kind'] == 't3']
+    return posts, data.get('after')
+
+def parse_thread(thread):
+    """
+    Parse a decoded /comments/<id> response, [post listing, comment listing].
+
+    Returns (post row, comment rows, "more" stubs).
+    """
+    post_listing, comment_listing = thread
+    post = post_listing['data']['children'][0]['data']
+    comments, more = parse_comment_tree(comment_listing['data']['children'], post['id'])
+    return parse_post(post), comments, more
+
+def expand_more(client, post_id, more):
+    """Fetch the comments hidden behind "more" stubs; returns comment rows"""
+    comments = []
+    pending = deque(more)
+    while pending:
+        stub = pending.popleft()
+        if stub.get('children'):
+            ids = stub['children']
+            for start in range(0, len(ids), MORE_CHILDREN_BATCH):
+                response = client.get_json('/api/morechildren', {
+                    'api_type': 'json',
+                    'link_id': f"t3_{post_id}",
+                    'children': ','.join(ids[start:start + MORE_CHILDREN_BATCH]),
+                })
+                # morechildren returns a flat list, where nested stubs come back as "more" things
+                things = response['json']['data']['things']
+                for thing in things:
+                    if thing['kind'] == 'more':
+                        pending.append(thing['data'])
+                    elif thing['kind'] == 't1':
+                        comments.append(parse_comment(thing['data'], post_id))
+        else:
+            # "Continue this thread" stubs have no ids; load the thread below their parent
+            parent_id = stub['parent_id'].split('_', 1)[1]
+            _, comment_listing = client.get_json(f"/comments/{post_id}/_/{parent_id}")
+            for parent in comment_listing['data']['children']:
+                replies = parent['data'].get('replies') if parent['kind'] == 't1' else None
+                if replies:
+                    nested, nested_more = parse_comment_tree(replies['data']['children'], post_id)
+                    comments.extend(nested)
+                    pending.extend(nested_more)
+    return comments
+
+def fetch_thread(client, post_id, expand=True):
+    """Post row and all comment rows of one thread"""
+    thread = client.get_json(f"/comments/{post_id}", {'limit': 500})
+    post, comments, more = parse_thread(thread)
+    if expand and more:
+        comments.extend(expand_more(client, post_id, more))
+    return post, comments
+
+def iter_top_posts(client, subreddit, time_period='day', limit=100):
+    """Yield post data dicts from a subreddit's top listing, paging until limit"""
+    after = None
+    fetched = 0
+    while fetched < limit:
+        params = {'t': time_period, 'limit': min(PAGE_SIZE, limit - fetched)}
+        if after:
+            params['after'] = after
+        posts, after = parse_listing(client.get_json(f"/r/{subreddit}/top", params))
+        for post in posts:
+            yield post
+        fetched += len(posts)
+        if not after or not posts:
+            break
+
+def scrape_subreddit_fast(subreddit, time_period='day', limit=100, client=None):
+    """
+    Drop-in for scrape_subreddit that reads the raw JSON API.
+
+    Returns the same posts and comments DataFrames.
+    """
+    client = client or RedditJsonClient()
+    posts_data = []
+    comments_data = []
+
+    try:
+        for listed in iter_top_posts(client, subreddit, time_period, limit):
+            # The thread response repeats the post, so the listing copy only supplies the id
+            try:
+                post, comments = fetch_thread(client, listed['id'])
+            except (requests.RequestException, KeyError, ValueError) as e:
+                print(f"Error getting comments for post {listed['id']}: {str(e)}")
+                post, comments = parse_post(listed), []
+            posts_data.append(post)
+            comments_data.extend(comments)
+            print(f"Processed post {len(posts_data)}: {post['id']}")
+    except requests.RequestException as e:
+        print(f"Network error: {str(e)}")
+        if not posts_data:
+            return pd.DataFrame(), pd.DataFrame()
+        print("Saving partial data...")
+
+    return pd.DataFrame(posts_data), pd.DataFrame(comments_data)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+import argparse
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    from .reddit_scraper import initialize_reddit
+except ImportError:
+    from reddit_scraper import initialize_reddit
+
+# /api/info accepts at most 100 fullnames per request
+INFO_BATCH_SIZE = 100
+
+UPDATE_COLUMNS = ['fullname', 'id', 'kind', 'score', 'num_comments',
+                  'previous_score', 'previous_num_comments', 'refreshed_at']
+
+
+def find_recent_files(directories, prefix, days=7, now=None):
+    """Ingest files with the given prefix written in the last N days, oldest first"""
+    cutoff = (now or time.time()) - days * 86400
+    paths = []
+    for directory in directories:
+        paths.extend(glob.glob(os.path.join(directory, f"{prefix}*.csv")))
+    recent = [path for path in paths if os.path.getmtime(path) >= cutoff]
+    return sorted(recent, key=os.path.getmtime)
+
+def load_recent_items(directories=("data/raw", "data/historical"), days=7, now=None):
+    """
+    Return {fullname: {'score', 'num_comments'}} for posts and comments ingested
+    in the last N days. Later files overwrite earlier ones.
+    """
+    items = {}
+    for path in find_recent_files(directories, "reddit_posts_", days, now):
+        posts_df = pd.read_csv(path, usecols=lambda c: c in ('id', 'score', 'num_comments'))
+        for row in posts_df.dropna(subset=['id']).itertuples(index=False):
+            items[f"t3_{row.id}"] = {'score': row.score, 'num_comments': getattr(row, 'num_comments', None)}
+    for path in find_recent_files(directories, "reddit_comments_", days, now):
+        comments_df = pd.read_csv(path, usecols=lambda c: c in ('comment_id', 'score'))
+        for row in comments_df.dropna(subset=['comment_id']).itertuples(index=False):
+            items[f"t1_{row.comment_id}"] = {'score': row.score, 'num_comments': None}
+    return items
+
+def load_state(state_file):
+    """Scores from the last refresh, which take precedence over the ingest files"""
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file, 'r') as f:
+        return json.load(f)
+
+def save_state(state, state_file):
+    directory = os.path.dirname(state_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_file)
+
+def fetch_info(reddit, fullnames, batch_size=INFO_BATCH_SIZE):
+    """Yield current {'fullname', 'score', 'num_comments'} for each fullname, one request per batch"""
+    fullnames = list(fullnames)
+    for start in range(0, len(fullnames), batch_size):
+        batch = fullnames[start:start + batch_size]
+        # Deleted or removed items are simply missing from the response
+        for thing in reddit.info(fullnames=batch):
+            is_post = thing.fullname.startswith('t3_')
+            yield {
+                'fullname': thing.fullname,
+                'score': thing.score,
+                # Only read attributes the info payload has; missing ones make praw refetch the item
+                'num_comments': thing.num_comments if is_post else None,
+            }
+
+def same_value(previous, current):
+    if previous is None or pd.isna(previous):
+        return current is None
+    return current is not None and int(previous) == int(current)
+
+def diff_scores(known, fresh, refreshed_at=None):
+    """Rows for items whose score or comment count changed"""
+    refreshed_at = (refreshed_at or datetime.now()).isoformat()
+    changes = []
+    for item in fresh:
+        previous = known.get(item['fullname'], {})
+        if (same_value(previous.get('score'), item['score'])
+                and same_value(previous.get('num_comments'), item['num_comments'])):
+            continue
+        kind, item_id = item['fullname'].split('_', 1)
+        changes.append({
+            'fullname': item['fullname'],
+            'id': item_id,
+            'kind': 'post' if kind == 't3' else 'comment',
+            'score': item['score'],
+            'num_comments': item['num_comments'],
+            'previous_score': previous.get('score'),
+            'previous_num_comments': previous.get('num_comments'),
+            'refreshed_at': refreshed_at,
+        })
+    return changes
+
+def refresh_scores(reddit=None, days=7, directories=("data/raw", "data/historical"),
+                   state_file="data/raw/reddit_score_state.json", output_dir="data/raw"):
+    """
+    Re-hydrate recently ingested posts and comments through /api/info.
+
+    Each request refreshes 100 items, with no listing walks or comment trees, and
+    only items whose score or comment count changed are written out.
+    Returns a DataFrame of the changes.
+    """
+    reddit = reddit or initialize_reddit()
+    known = load_recent_items(directories, days)
+    known.update({fullname: values for fullname, values in load_state(state_file).items() if fullname in known})
+    print(f"Refreshing {len(known)} posts and comments ingested in the last {days} days")
+
+    fresh = list(fetch_info(reddit, known.keys()))
+    changes = diff_scores(known, fresh)
+    print(f"{len(fresh)} items returned, {len(changes)} changed "
+          f"({(len(known) + INFO_BATCH_SIZE - 1) // INFO_BATCH_SIZE} requests)")
+
+    changes_df = pd.DataFrame(changes, columns=UPDATE_COLUMNS)
+    if changes:
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = os.path.join(output_dir, f"reddit_score_updates_{timestamp}.csv")
+        changes_df.to_csv(output_file, index=False)
+        print(f"Saved {len(changes_df)} score updates to {output_file}")
+
+    # Remember the latest values so the next refresh only reports new changes
+    state = load_state(state_file)
+    for change in changes:
+        state[change['fullname']] = {'score': change['score'], 'num_comments': change['num_comments']}
+    save_state(state, state_file)
+    return changes_df
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh scores of recently ingested Reddit posts and comments')
+    parser.add_argument('--days', type=int, default=7,
+                        help='Refresh items ingested in this many days')
+    parser.add_argument('--input-dirs', nargs='+', default=['data/raw', 'data/historical'],
+                        help='Directories holding reddit_posts_*.csv and reddit_comments_*.csv files')
+    parser.add_argument('--state-file', default='data/raw/reddit_score_state.json',
+                        help='Latest known scores, used to write only changes')
+    parser.add_argument('--output-dir', default='data/raw',
+                        help='Directory for the score update files')
+    args = parser.parse_args()
+
+    refresh_scores(days=args.days, directories=args.input_dirs,
+                   state_file=args.state_file, output_dir=args.output_dir)
+
+if __name__ == "__main__":
+    main()
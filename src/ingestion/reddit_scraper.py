@@ -4,6 +4,8 @@ from datetime import datetime
 import sys
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from prawcore.exceptions import TooManyRequests, RequestException
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,50 +18,90 @@ def initialize_reddit():
         user_agent=REDDIT_USER_AGENT
     )
 
-def scrape_subreddit(SUBREDDIT, TIME_PERIOD='day', limit=100):
+def comment_row(comment, post):
+    return {
+        'comment_id': comment.id,
+        'post_id': post.id,
+        'body': comment.body,
+        'score': comment.score,
+        'created_utc': datetime.fromtimestamp(comment.created_utc),
+        'author': str(comment.author),
+        # Read from the payload directly; a missing attribute would make praw refetch the comment
+        'author_fullname': vars(comment).get('author_fullname'),
+        'author_flair': vars(comment).get('author_flair_text')
+    }
+
+def post_row(post):
+    return {
+        'id': post.id,
+        'title': post.title,
+        'body': post.selftext,
+        'score': post.score,
+        'created_utc': datetime.fromtimestamp(post.created_utc),
+        'num_comments': post.num_comments,
+    }
+
+def get_post_comments(post):
+    """Expand a submission's full comment tree into comment rows"""
+    post.comments.replace_more(limit=None)
+    return [comment_row(comment, post) for comment in post.comments.list()]
+
+def get_shallow_comments(post, limit=20):
+    """The top limit top-level comments by score, from the thread request alone"""
+    # Only takes effect before the comments are first read
+    post.comment_sort = 'top'
+    post.comment_limit = limit
+    post.comments.replace_more(limit=0)
+    return [comment_row(comment, post) for comment in list(post.comments)[:limit]]
+
+def scrape_post(post, SUBREDDIT, relevance_filter=None, sampler=None):
+    """Post row with its comment rows under 'comments'"""
+    # Title, selftext and flair come with the listing, so scoring costs no requests
+    relevance = None
+    fetch_comments = True
+    if relevance_filter is not None:
+        relevance, fetch_comments = relevance_filter.check(post, SUBREDDIT)
+    
+    # Get comments with error handling
+    comments = []
+    if fetch_comments:
+        # Add delay between requests
+        time.sleep(.5)  # 2 second delay between posts
+        try:
+            if sampler is None or sampler.full_tree(post.id):
+                comments = get_post_comments(post)
+            else:
+                comments = get_shallow_comments(post, sampler.shallow_limit)
+        except Exception as e:
+            print(f"Error getting comments for post {post.id}: {str(e)}")
+    
+    # Store post data
+    post_data = dict(post_row(post), comments=comments)
+    if relevance_filter is not None:
+        post_data['relevance_score'] = relevance
+        post_data['comments_fetched'] = fetch_comments
+    if sampler is not None:
+        design = sampler.design(post.id)
+        post_data.update(design)
+        for comment in comments:
+            comment['comment_tree'] = design['comment_tree']
+            comment['sample_weight'] = design['sample_weight']
+    return post_data
+
+def scrape_posts(posts, SUBREDDIT, relevance_filter=None, on_post=None, sampler=None):
     """
-    Scrapes posts from a specified subreddit with rate limiting and error handling.
+    Scrape every post a listing yields, with rate limiting and error handling.
+    on_post, if given, is called with each post's row before the next post is read;
+    an exception it raises stops the scrape and is passed to the caller.
     Returns DataFrames for posts and comments.
     """
-    reddit = initialize_reddit()
-    subreddit = reddit.subreddit(SUBREDDIT)
-    
     posts_data = []
     
     try:
         # Get posts with rate limiting
-        for post in subreddit.top(time_filter=TIME_PERIOD, limit=limit):
+        for post in posts:
             try:
-                # Add delay between requests
-                time.sleep(.5)  # 2 second delay between posts
-                
-                # Get comments with error handling
-                comments = []
-                try:
-                    post.comments.replace_more(limit=None)
-                    for comment in post.comments.list():
-                        comments.append({
-                            'comment_id': comment.id,
-                            'post_id': post.id,
-                            'body': comment.body,
-                            'score': comment.score,
-                            'created_utc': datetime.fromtimestamp(comment.created_utc),
-                            'author': str(comment.author)
-                        })
-                except Exception as e:
-                    print(f"Error getting comments for post {post.id}: {str(e)}")
-                
-                # Store post data
-                posts_data.append({
-                    'id': post.id,
-                    'title': post.title,
-                    'body': post.selftext,
-                    'score': post.score,
-                    'created_utc': datetime.fromtimestamp(post.created_utc),
-                    'num_comments': post.num_comments,
-                    'comments': comments
-                })
-                
+                posts_data.append(scrape_post(post, SUBREDDIT, relevance_filter, sampler))
                 print(f"Processed post {len(posts_data)}: {post.id}")
                 
             except TooManyRequests:
@@ -69,6 +111,9 @@ def scrape_subreddit(SUBREDDIT, TIME_PERIOD='day', limit=100):
             except Exception as e:
                 print(f"Error processing post: {str(e)}")
                 continue
+            
+            if on_post is not None:
+                on_post(posts_data[-1])
                 
     except RequestException as e:
         print(f"Network error: {str(e)}")
@@ -91,17 +136,192 @@ def scrape_subreddit(SUBREDDIT, TIME_PERIOD='day', limit=100):
     
     return posts_df, comments_df
 
-def scrape_multiple_subreddits(subreddits, time_period='day', limit=100):
+def scrape_subreddit(SUBREDDIT, TIME_PERIOD='day', limit=100, reddit=None, relevance_filter=None, sampler=None):
+    """
+    Scrapes posts from a specified subreddit with rate limiting and error handling.
+    Returns DataFrames for posts and comments.
+    Pass reddit to use a client from a CredentialPool instead of the default app.
+    With a RelevanceFilter, comment trees are only fetched for posts that pass it;
+    the posts DataFrame then also has relevance_score and comments_fetched columns.
+    With a CommentSampler, only its sample of posts get full comment trees and
+    both DataFrames gain comment_tree and sample_weight columns (posts also
+    sample_stratum) for reweighting aggregates.
     """
-    Scrapes multiple subreddits and combines the results
+    reddit = reddit or initialize_reddit()
+    subreddit = reddit.subreddit(SUBREDDIT)
+    posts = subreddit.top(time_filter=TIME_PERIOD, limit=limit)
+    if sampler is not None:
+        posts = sampler.plan(posts)
+    return scrape_posts(posts, SUBREDDIT, relevance_filter, sampler=sampler)
+
+def iter_posts_in_window(posts, created_after, created_before, stats=None, patience=5):
     """
+    Yield the posts of a newest-first listing created in [created_after, created_before).
+
+    Timestamps are checked before anything else is fetched: newer posts are
+    passed over and paging stops once patience consecutive posts are older
+    than the window. stats, if given, is updated with 'listed', 'newer',
+    'in_window' and 'reached_start' (False if the listing ran out first).
+    """
+    after = created_after.timestamp()
+    before = created_before.timestamp()
+    stats = stats if stats is not None else {}
+    stats.update({'listed': 0, 'newer': 0, 'in_window': 0, 'reached_start': False})
+    older_in_a_row = 0
+    
+    for post in posts:
+        stats['listed'] += 1
+        if post.created_utc >= before:
+            stats['newer'] += 1
+            continue
+        if post.created_utc < after:
+            # A late-approved post can sit out of order, so don't stop on the first one
+            older_in_a_row += 1
+            if older_in_a_row >= patience:
+                stats['reached_start'] = True
+                break
+            continue
+        older_in_a_row = 0
+        stats['in_window'] += 1
+        yield post
+    else:
+        stats['reached_start'] = older_in_a_row > 0
+
+def scrape_subreddit_window(SUBREDDIT, created_after, created_before, limit=None, reddit=None,
+                            relevance_filter=None, stats=None, adaptive_limit=None, on_post=None):
+    """
+    Scrape posts created in [created_after, created_before) from the newest-first listing.
+    
+    Unlike top(), which can only be filtered by date after every comment tree
+    has been downloaded, out-of-window posts cost nothing beyond their listing
+    entry and paging stops at the window start. Reddit listings only reach
+    back about 1000 posts; stats['reached_start'] is False when the window
+    start was out of reach. Returns DataFrames for posts and comments.
+    
+    With an AdaptiveLimit the whole window is listed first and its posts are
+    fetched best first until the limit's stop rules fire, instead of stopping
+    at a fixed limit; stats['coverage'] then reports what was fetched.
+    on_post is passed on to scrape_posts.
+    """
+    reddit = reddit or initialize_reddit()
+    subreddit = reddit.subreddit(SUBREDDIT)
+    stats = stats if stats is not None else {}
+    
+    posts = iter_posts_in_window(subreddit.new(limit=None), created_after, created_before, stats)
+    if adaptive_limit is not None:
+        def record(row):
+            adaptive_limit.record(row['id'], len(row['comments']))
+            if on_post is not None:
+                on_post(row)
+        
+        posts_df, comments_df = scrape_posts(adaptive_limit.select(posts), SUBREDDIT, relevance_filter,
+                                             on_post=record)
+        stats['coverage'] = adaptive_limit.coverage()
+        stats['limit_reached'] = stats['coverage']['stop_reason'] != 'exhausted'
+    else:
+        posts_df, comments_df = scrape_posts(islice(posts, limit), SUBREDDIT, relevance_filter, on_post=on_post)
+        stats['limit_reached'] = limit is not None and stats['in_window'] >= limit
+    
+    note = ''
+    if adaptive_limit is not None:
+        coverage = stats['coverage']
+        note = (f", {coverage['posts_fetched']} fetched ({coverage['comment_coverage']:.0%} of listed comments, "
+                f"stopped: {coverage['stop_reason']})")
+    elif stats['limit_reached']:
+        note = ' (stopped at the limit)'
+    if not stats['reached_start'] and not (stats['limit_reached'] and adaptive_limit is None):
+        note += ' (listing ended before the window start)'
+    print(f"r/{SUBREDDIT}: {stats['in_window']} posts in window out of {stats['listed']} listed{note}")
+    return posts_df, comments_df
+
+def fetch_skipped_comments(ledger, reddit=None, limit=100, worker_id=None):
+    """
+    Fetch comment trees for posts a RelevanceFilter skipped, as recorded in the
+    job ledger. Returns a comments DataFrame with a subreddit column.
+    """
+    try:
+        from .relevance_filter import SKIPPED_COMMENTS_SOURCE
+    except ImportError:
+        from relevance_filter import SKIPPED_COMMENTS_SOURCE
+
+    reddit = reddit or initialize_reddit()
+    comments = []
+    for post_id in ledger.claim(SKIPPED_COMMENTS_SOURCE, worker_id, limit=limit):
+        try:
+            post = reddit.submission(id=post_id)
+            post_comments = get_post_comments(post)
+            for comment in post_comments:
+                comment['subreddit'] = post.subreddit.display_name
+            comments.extend(post_comments)
+            ledger.complete(SKIPPED_COMMENTS_SOURCE, post_id, {'comments': len(post_comments)})
+            time.sleep(.5)
+        except Exception as e:
+            print(f"Error getting comments for skipped post {post_id}: {str(e)}")
+            ledger.fail(SKIPPED_COMMENTS_SOURCE, post_id, e)
+    print(f"Fetched {len(comments)} comments for previously skipped posts")
+    return pd.DataFrame(comments)
+
+def scrape_with_credential(credential_pool, credential, subreddit, time_period, limit, **kwargs):
+    """Scrape a subreddit with a client from the given credential"""
+    with credential_pool.client(credential=credential) as reddit:
+        return scrape_subreddit(subreddit, time_period, limit, reddit=reddit, **kwargs)
+
+def scrape_assigned(credential_pool, credential, subreddits, time_period, limit, **kwargs):
+    """
+    Scrape subreddits one after another with the given credential.
+
+    Returns {subreddit: (posts_df, comments_df)}, with the exception in place
+    of the results for a subreddit that failed.
+    """
+    results = {}
+    for subreddit in subreddits:
+        try:
+            results[subreddit] = scrape_with_credential(credential_pool, credential, subreddit, time_period, limit,
+                                                        **kwargs)
+        except Exception as e:
+            results[subreddit] = e
+    return results
+
+def scrape_multiple_subreddits(subreddits, time_period='day', limit=100, credential_pool=None,
+                               relevance_filter=None, sampler=None):
+    """
+    Scrapes multiple subreddits and combines the results.
+    With a CredentialPool, subreddits are scraped concurrently, one worker per
+    credential, each within its own credential's rate budget.
+    A RelevanceFilter or CommentSampler is shared by every subreddit; the
+    sampler samples each subreddit's listing separately.
+    """
+    options = {}
+    if relevance_filter is not None:
+        options['relevance_filter'] = relevance_filter
+    if sampler is not None:
+        options['sampler'] = sampler
     all_posts = []
     all_comments = []
     
+    results = {}
+    if credential_pool is not None:
+        # Deal subreddits out evenly and give each credential a single worker that
+        # works through its share in order, so no two threads share an app's budget
+        with ThreadPoolExecutor(max_workers=len(credential_pool)) as executor:
+            futures = [
+                executor.submit(scrape_assigned, credential_pool, credential, assigned, time_period, limit, **options)
+                for credential, assigned in credential_pool.assign(subreddits).items()
+                if assigned
+            ]
+            for future in futures:
+                results.update(future.result())
+    
     for subreddit in subreddits:
         print(f"\nScraping r/{subreddit}...")
         try:
-            posts_df, comments_df = scrape_subreddit(subreddit, time_period, limit)
+            if credential_pool is not None:
+                result = results[subreddit]
+                if isinstance(result, Exception):
+                    raise result
+                posts_df, comments_df = result
+            else:
+                posts_df, comments_df = scrape_subreddit(subreddit, time_period, limit, **options)
             
             # Add subreddit column to both DataFrames
             if not posts_df.empty:
@@ -113,12 +333,20 @@ def scrape_multiple_subreddits(subreddits, time_period='day', limit=100):
                 all_comments.append(comments_df)
                 
             print(f"Successfully scraped r/{subreddit}")
-            time.sleep(5)  # Wait between subreddits
+            if credential_pool is None:
+                time.sleep(5)  # Wait between subreddits
             
         except Exception as e:
             print(f"Error scraping r/{subreddit}: {str(e)}")
             continue
     
+    if credential_pool is not None:
+        credential_pool.report()
+    if relevance_filter is not None:
+        print(f"Relevance filter: {relevance_filter.stats()}")
+    if sampler is not None:
+        print(f"Comment sampler: {sampler.stats()}")
+    
     # Combine results
     combined_posts = pd.concat(all_posts, ignore_index=True) if all_posts else pd.DataFrame()
     combined_comments = pd.concat(all_comments, ignore_index=True) if all_comments else pd.DataFrame()
@@ -126,16 +354,22 @@ def scrape_multiple_subreddits(subreddits, time_period='day', limit=100):
     return combined_posts, combined_comments
 
 if __name__ == "__main__":
+    from reddit_credentials import CredentialPool
+    
     SUBREDDITS = ['AsianBeauty', 'SkincareAddiction', '30PlusSkinCare']
     max_retries = 3
     retry_count = 0
     
+    # Spread subreddits across credentials when more than one app is configured
+    credential_pool = CredentialPool() if len(REDDIT_CREDENTIALS) > 1 else None
+    
     while retry_count < max_retries:
         try:
             posts_df, comments_df = scrape_multiple_subreddits(
                 SUBREDDITS,
                 time_period='day',
-                limit=100
+                limit=100,
+                credential_pool=credential_pool
             )
             
             if len(posts_df) > 0:
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Search-driven Reddit ingestion for the Adore Beauty catalog.
+
+Instead of paging through top posts, every brand and product name is searched
+for directly. Many names are packed into each subreddit search as an OR query,
+hits are deduplicated across queries, subreddits and runs, and comment trees
+are only fetched for posts the job ledger hasn't seen before:
+
+    python src/ingestion/reddit_search.py --time-filter week
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    from .job_ledger import JobLedger
+    from .relevance_filter import compile_phrases, load_vocabulary, normalize
+    from .reddit_scraper import get_post_comments, initialize_reddit
+except ImportError:
+    from job_ledger import JobLedger
+    from relevance_filter import compile_phrases, load_vocabulary, normalize
+    from reddit_scraper import get_post_comments, initialize_reddit
+
+# Ledger source for posts found by catalog search
+SEARCH_POST_SOURCE = 'reddit_search_post'
+
+# Reddit rejects search queries longer than this
+MAX_QUERY_LENGTH = 512
+
+
+def quote_term(term):
+    # Quotes inside a phrase would end it early
+    return '"' + term.replace('"', ' ').strip() + '"'
+
+def build_queries(terms, max_length=MAX_QUERY_LENGTH):
+    """
+    Pack quoted terms into as few OR queries as fit within max_length.
+
+    Terms are packed in order; a term that can't fit in a query on its own is
+    dropped with a warning.
+    """
+    queries = []
+    current = []
+    length = 0
+    for term in dict.fromkeys(terms):
+        quoted = quote_term(term)
+        if len(quoted) > max_length:
+            print(f"Skipping search term longer than {max_length} characters: {term[:40]}...")
+            continue
+        added = len(quoted) if not current else len(quoted) + len(' OR ')
+        if current and length + added > max_length:
+            queries.append(' OR '.join(current))
+            current, length = [], 0
+            added = len(quoted)
+        current.append(quoted)
+        length += added
+    if current:
+        queries.append(' OR '.join(current))
+    return queries
+
+def catalog_terms(snapshot_file="data/raw/product_snapshots.csv",
+                  reviews_file="data/processed/reviews_history.csv", include_brands=True):
+    """Search terms for the catalog: product phrases first, then brands"""
+    brands, products = load_vocabulary(snapshot_file, reviews_file)
+    terms = sorted(products)
+    if include_brands:
+        terms += sorted(brands)
+    return terms
+
+class CatalogSearch:
+    """
+    Find catalog mentions through subreddit search.
+
+    The ledger doubles as the seen-post index, so a post found again by a later
+    query or run never has its comment tree fetched twice.
+    """
+
+    def __init__(self, terms, reddit=None, ledger=None, max_query_length=MAX_QUERY_LENGTH):
+        self.reddit = reddit or initialize_reddit()
+        self.ledger = ledger or JobLedger("data/raw/reddit_jobs.db")
+        self.queries = build_queries(terms, max_query_length)
+        self.term_pattern = compile_phrases(normalize(term) for term in terms)
+        self.requests = 0
+
+    def matched_terms(self, post):
+        """The catalog terms a post's title or selftext mention"""
+        if self.term_pattern is None:
+            return []
+        text = normalize(f"{post.title or ''} {post.selftext or ''}")
+        return sorted(set(self.term_pattern.findall(text)))
+
+    def search_subreddit(self, subreddit, time_filter='week', limit=100):
+        """Yield each distinct post the subreddit's searches return"""
+        seen = set()
+        for query in self.queries:
+            self.requests += 1
+            for post in self.reddit.subreddit(subreddit).search(
+                    query, sort='new', syntax='lucene', time_filter=time_filter, limit=limit):
+                if post.id not in seen:
+                    seen.add(post.id)
+                    yield post
+
+    def search(self, subreddits, time_filter='week', limit=100):
+        """
+        Search every subreddit and fetch comment trees for new posts only.
+
+        Returns (posts_df, comments_df). Posts fetched in earlier runs are left
+        out of both.
+        """
+        posts_data = []
+        comments_data = []
+        found = 0
+
+        for subreddit in subreddits:
+            print(f"\nSearching r/{subreddit} with {len(self.queries)} queries...")
+            for post in self.search_subreddit(subreddit, time_filter, limit):
+                found += 1
+                self.ledger.add(SEARCH_POST_SOURCE, [post.id], partition=subreddit)
+                # Done posts were fetched by an earlier query or run; failed ones get another try
+                if not self.ledger.start(SEARCH_POST_SOURCE, post.id):
+                    continue
+
+                try:
+                    time.sleep(.5)
+                    comments = get_post_comments(post)
+                except Exception as e:
+                    print(f"Error getting comments for post {post.id}: {str(e)}")
+                    self.ledger.fail(SEARCH_POST_SOURCE, post.id, e)
+                    continue
+
+                for comment in comments:
+                    comment['subreddit'] = subreddit
+                comments_data.extend(comments)
+                posts_data.append({
+                    'id': post.id,
+                    'title': post.title,
+                    'body': post.selftext,
+                    'score': post.score,
+                    'created_utc': datetime.fromtimestamp(post.created_utc),
+                    'num_comments': post.num_comments,
+                    'subreddit': subreddit,
+                    'matched_terms': '|'.join(self.matched_terms(post)),
+                })
+                self.ledger.complete(SEARCH_POST_SOURCE, post.id, {'comments': len(comments)})
+                print(f"Processed post {len(posts_data)}: {post.id}")
+
+        print(f"{self.requests} search requests, {found} hits, {len(posts_data)} new posts")
+        return pd.DataFrame(posts_data), pd.DataFrame(comments_data)
+
+def main():
+    parser = argparse.ArgumentParser(description='Search Reddit for Adore Beauty catalog mentions')
+    parser.add_argument('--subreddits', nargs='+', default=['AsianBeauty', 'SkincareAddiction', '30PlusSkinCare'],
+                        help='List of subreddits to search')
+    parser.add_argument('--time-filter', default='week', choices=['hour', 'day', 'week', 'month', 'year', 'all'],
+                        help='Only find posts from this period')
+    parser.add_argument('--limit', type=int, default=100,
+                        help='Maximum results per query')
+    parser.add_argument('--snapshot-file', default='data/raw/product_snapshots.csv',
+                        help='Listing snapshots with product names')
+    parser.add_argument('--reviews-file', default='data/processed/reviews_history.csv',
+                        help='Review history with product and brand names')
+    parser.add_argument('--no-brands', action='store_true',
+                        help='Search product names only')
+    parser.add_argument('--ledger-file', default='data/raw/reddit_jobs.db',
+                        help='Job ledger that remembers posts already fetched')
+    parser.add_argument('--output-dir', default='data/raw',
+                        help='Directory for the output files')
+    args = parser.parse_args()
+
+    terms = catalog_terms(args.snapshot_file, args.reviews_file, include_brands=not args.no_brands)
+    if not terms:
+        print("No catalog terms found; run the Adore scraper first")
+        return
+
+    search = CatalogSearch(terms, ledger=JobLedger(args.ledger_file))
+    print(f"{len(terms)} catalog terms packed into {len(search.queries)} queries per subreddit")
+    posts_df, comments_df = search.search(args.subreddits, args.time_filter, args.limit)
+
+    if posts_df.empty:
+        return
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    posts_file = os.path.join(args.output_dir, f"reddit_posts_search_{timestamp}.csv")
+    comments_file = os.path.join(args.output_dir, f"reddit_comments_search_{timestamp}.csv")
+    posts_df.to_csv(posts_file, index=False)
+    comments_df.to_csv(comments_file, index=False)
+    print(f"Saved {len(posts_df)} posts to {posts_file} and {len(comments_df)} comments to {comments_file}")
+
+if __name__ == "__main__":
+    main()
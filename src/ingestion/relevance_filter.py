@@ -0,0 +1,181 @@
+import os
+import re
+import threading
+
+import pandas as pd
+
+# Ledger source for posts whose comment trees were skipped by the filter
+SKIPPED_COMMENTS_SOURCE = 'reddit_skipped_comments'
+
+# Product-type words that hint at a product discussion without naming one
+DEFAULT_TERMS = (
+    'sunscreen', 'spf', 'serum', 'essence', 'toner', 'cleanser', 'moisturiser',
+    'moisturizer', 'cream', 'retinol', 'retinoid', 'tretinoin', 'niacinamide',
+    'vitamin c', 'hyaluronic', 'aha', 'bha', 'exfoliant', 'mask', 'ampoule',
+    'balm', 'cleansing oil', 'micellar', 'repurchase', 'holy grail', 'empties',
+)
+
+# Weights added for a post's flair; negative ones push selfies and memes out
+DEFAULT_FLAIR_RULES = {
+    'review': 2.0,
+    'haul': 2.0,
+    'empties': 2.0,
+    'product question': 1.0,
+    'recommendations': 1.0,
+    'routine help': -1.0,
+    'misc': -1.0,
+    'selfie': -3.0,
+    'fotd': -3.0,
+    'meme': -3.0,
+    'humor': -3.0,
+    'humour': -3.0,
+}
+
+SIZE_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\s*(?:ml|g|mg|oz|pcs|pack|x)\b')
+
+
+def normalize(text):
+    """Lowercase and collapse everything but letters and digits to single spaces"""
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', str(text or '').lower()).split())
+
+def product_phrase(name, brand=None):
+    """
+    The part of a catalog product name people actually write.
+
+    Sizes and the brand prefix are dropped; single words are too generic to
+    count as a product mention, so they give None.
+    """
+    phrase = normalize(SIZE_PATTERN.sub(' ', str(name or '').lower()))
+    brand = normalize(brand)
+    if brand and phrase.startswith(brand + ' '):
+        phrase = phrase[len(brand) + 1:]
+    return phrase if len(phrase.split()) >= 2 else None
+
+def compile_phrases(phrases):
+    """One word-bounded alternation, longest phrases first so they win overlaps"""
+    phrases = sorted({phrase for phrase in phrases if phrase}, key=len, reverse=True)
+    if not phrases:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(re.escape(phrase) for phrase in phrases) + r')\b')
+
+def load_vocabulary(snapshot_file="data/raw/product_snapshots.csv",
+                    reviews_file="data/processed/reviews_history.csv"):
+    """Return (brands, products) from the Adore listing snapshots and review history"""
+    brands = set()
+    products = set()
+    if os.path.exists(reviews_file):
+        reviews_df = pd.read_csv(reviews_file, usecols=lambda c: c in ('product_name', 'brand'))
+        reviews_df = reviews_df.drop_duplicates()
+        for row in reviews_df.itertuples(index=False):
+            brand = getattr(row, 'brand', None)
+            if isinstance(brand, str) and normalize(brand):
+                brands.add(normalize(brand))
+            products.add(product_phrase(getattr(row, 'product_name', None), brand if isinstance(brand, str) else None))
+    if os.path.exists(snapshot_file):
+        names = pd.read_csv(snapshot_file, usecols=['name'])['name'].dropna().unique()
+        for name in names:
+            # Listing names lead with the brand; strip whichever known brand matches
+            brand = next((b for b in brands if normalize(name).startswith(b + ' ')), None)
+            products.add(product_phrase(name, brand))
+    products.discard(None)
+    return brands, products
+
+class RelevanceFilter:
+    """
+    Score posts against the brand/product vocabulary before their comment
+    trees are fetched.
+
+    A post scores for each brand and product it names, a little for generic
+    product-type words, and its flair's weight. Posts below the threshold get
+    no comment fetch; their IDs are kept in skipped so the trees can be
+    fetched later (see record_skipped).
+    """
+
+    def __init__(self, brands=(), products=(), terms=DEFAULT_TERMS, flair_rules=None, threshold=2.0,
+                 brand_weight=2.0, product_weight=3.0, term_weight=0.5, max_term_score=1.5):
+        self.brand_pattern = compile_phrases(normalize(brand) for brand in brands)
+        self.product_pattern = compile_phrases(normalize(product) for product in products)
+        self.term_pattern = compile_phrases(normalize(term) for term in terms)
+        self.flair_rules = {normalize(flair): weight for flair, weight in
+                            (DEFAULT_FLAIR_RULES if flair_rules is None else flair_rules).items()}
+        self.threshold = threshold
+        self.brand_weight = brand_weight
+        self.product_weight = product_weight
+        self.term_weight = term_weight
+        self.max_term_score = max_term_score
+
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.skipped_total = 0
+        self.skipped = []
+
+    @classmethod
+    def from_catalog(cls, snapshot_file="data/raw/product_snapshots.csv",
+                     reviews_file="data/processed/reviews_history.csv", **kwargs):
+        """
+        Build a filter from the catalog's brands and products.
+
+        Returns None when the catalog is empty (for example before the first
+        Adore crawl), since term matches alone never reach the threshold and
+        every comment tree would be skipped.
+        """
+        brands, products = load_vocabulary(snapshot_file, reviews_file)
+        if not brands and not products:
+            print("Relevance filter disabled: no catalog vocabulary yet")
+            return None
+        print(f"Relevance filter vocabulary: {len(brands)} brands, {len(products)} products")
+        return cls(brands, products, **kwargs)
+
+    def flair_weight(self, flair):
+        flair = normalize(flair)
+        if not flair:
+            return 0.0
+        if flair in self.flair_rules:
+            return self.flair_rules[flair]
+        # Flairs like "Review - Sunscreen" match on their leading rule
+        for rule, weight in self.flair_rules.items():
+            if flair.startswith(rule + ' '):
+                return weight
+        return 0.0
+
+    def score(self, title, selftext='', flair=None):
+        text = normalize(f"{title or ''} {selftext or ''}")
+        score = self.flair_weight(flair)
+        if self.brand_pattern is not None:
+            score += self.brand_weight * len(set(self.brand_pattern.findall(text)))
+        if self.product_pattern is not None:
+            score += self.product_weight * len(set(self.product_pattern.findall(text)))
+        if self.term_pattern is not None:
+            terms = len(set(self.term_pattern.findall(text)))
+            score += min(self.max_term_score, self.term_weight * terms)
+        return score
+
+    def check(self, post, subreddit=None):
+        """
+        Score a praw submission (or anything with title, selftext and
+        link_flair_text). Returns (score, relevant) and remembers skipped posts.
+        """
+        score = self.score(post.title, post.selftext, getattr(post, 'link_flair_text', None))
+        relevant = score >= self.threshold
+        with self.lock:
+            self.checked += 1
+            if not relevant:
+                self.skipped_total += 1
+                self.skipped.append({'post_id': post.id, 'subreddit': subreddit, 'score': score})
+        return score, relevant
+
+    def record_skipped(self, ledger):
+        """Add the skipped posts to a job ledger, one partition per subreddit; returns the number added"""
+        with self.lock:
+            skipped, self.skipped = self.skipped, []
+        added = 0
+        by_subreddit = {}
+        for item in skipped:
+            by_subreddit.setdefault(item['subreddit'] or '', []).append(item['post_id'])
+        for subreddit, post_ids in by_subreddit.items():
+            added += ledger.add(SKIPPED_COMMENTS_SOURCE, post_ids, partition=subreddit)
+        return added
+
+    def stats(self):
+        with self.lock:
+            return {'checked': self.checked, 'skipped': self.skipped_total, 'threshold': self.threshold}
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    from .adore_review_scraper import AdoreReviewScraper
+    from .product_fingerprints import FingerprintStore
+    from .review_store import merge_reviews
+    from .session_cache import SessionCache
+    from .product_snapshots import load_latest_review_counts, load_review_velocity
+    from .crawl_scheduler import CrawlBudget, ReviewCrawlScheduler
+    from .job_ledger import JobLedger, DONE, default_worker_id
+except ImportError:
+    from adore_review_scraper import AdoreReviewScraper
+    from product_fingerprints import FingerprintStore
+    from review_store import merge_reviews
+    from session_cache import SessionCache
+    from product_snapshots import load_latest_review_counts, load_review_velocity
+    from crawl_scheduler import CrawlBudget, ReviewCrawlScheduler
+    from job_ledger import JobLedger, DONE, default_worker_id
+
+PRODUCT_SOURCE = 'adore_product'
+
+
+def shard_for_url(url, num_shards):
+    """Assign a URL to a shard by stable hash, so reruns use the same split"""
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % num_shards
+
+def shard_urls(urls, num_shards):
+    """Split URLs into num_shards lists by stable hash"""
+    shards = [[] for _ in range(num_shards)]
+    for url in dict.fromkeys(urls):
+        shards[shard_for_url(url, num_shards)].append(url)
+    return shards
+
+def get_shard_name(shard_index):
+    return f"shard_{shard_index:03d}"
+
+def get_shard_dir(output_dir, shard_index):
+    return os.path.join(output_dir, get_shard_name(shard_index))
+
+def get_ledger_file(output_dir):
+    """One job ledger per run, shared by all of its shards"""
+    return os.path.join(output_dir, "jobs.db")
+
+def crawled_urls(ledger_file):
+    """Product URLs a run has completed, across all shards"""
+    if not os.path.exists(ledger_file):
+        return []
+    return JobLedger(ledger_file).units(PRODUCT_SOURCE, status=DONE)
+
+def get_priorities(urls, fingerprint_file=None, snapshot_file=None):
+    """Crawl scheduler scores for URLs, so ledger claims follow the scheduler's order"""
+    scheduler = ReviewCrawlScheduler(
+        fingerprints=FingerprintStore(fingerprint_file) if fingerprint_file else None,
+        velocity=load_review_velocity(snapshot_file) if snapshot_file else None
+    )
+    return scheduler.priorities(urls)
+
+def append_reviews(reviews_data, output_file):
+    """Append review rows to a shard's output file"""
+    reviews_df = pd.DataFrame(reviews_data)
+    write_header = not os.path.exists(output_file)
+    reviews_df.to_csv(output_file, mode='a', header=write_header, index=False)
+
+def crawl_from_ledger(scraper, ledger, output_file, listing_counts=None, partition=None, label="worker",
+                      worker_id=None, time_budget=None, max_requests=None):
+    """
+    Scrape product URLs claimed from a job ledger until none are claimable.
+
+    Reviews are appended to output_file before each URL is marked done; URLs
+    whose fetch fails go back to the ledger with a backoff, and a URL whose
+    lease another worker took over is discarded. time_budget (seconds) and
+    max_requests (product fetches) stop the crawl early, leaving the
+    remaining URLs pending for the next run. Returns the number of reviews
+    found.
+    """
+    worker_id = worker_id or default_worker_id()
+    reviews_found = 0
+    processed = 0
+    budget = CrawlBudget(time_budget, max_requests)
+    while True:
+        # Checked before claiming so unspent URLs aren't left leased
+        if budget.exhausted():
+            break
+        claimed = ledger.claim(PRODUCT_SOURCE, worker_id, partition=partition)
+        if not claimed:
+            break
+        url = claimed[0]
+        processed += 1
+
+        # Listing pages already told us this product has no new reviews
+        if scraper.review_count_unchanged(url, listing_counts):
+            ledger.complete(PRODUCT_SOURCE, url, result={'reviews': 0, 'skipped': True}, worker_id=worker_id)
+            continue
+
+        print(f"[{label}] Processing product {processed}: {url}")
+        budget.spend()
+        reviews_data = scraper.get_product_reviews(url)
+
+        # A failed fetch goes back to the ledger to be retried after a backoff
+        if reviews_data is None:
+            ledger.fail(PRODUCT_SOURCE, url, error="no product data", worker_id=worker_id)
+            continue
+
+        # Another worker that took over the lease will save these reviews itself
+        if not ledger.renew(PRODUCT_SOURCE, url, worker_id):
+            print(f"[{label}] Lease on {url} was taken over, discarding its reviews")
+            continue
+
+        if reviews_data:
+            append_reviews(reviews_data, output_file)
+            reviews_found += len(reviews_data)
+
+        # Only mark the URL done once its reviews are on disk
+        ledger.complete(PRODUCT_SOURCE, url, result={'reviews': len(reviews_data)}, worker_id=worker_id)
+
+        if processed % 10 == 0:
+            scraper.rotate_identity()
+            if scraper.fingerprints:
+                scraper.fingerprints.save()
+
+    return reviews_found
+
+def run_shard(shard_index, urls, output_dir, use_proxies=False, fingerprint_file=None,
+              snapshot_file=None, ledger_file=None, time_budget=None, max_requests=None):
+    """
+    Scrape one shard of URLs in a worker process.
+
+    Each shard has its own scraper (and therefore its own session, identity and
+    proxy) and its own output file. Its URLs are work items in the run's job
+    ledger, so an interrupted shard resumes where it stopped without touching
+    the others, and failed products are retried with backoff on a later run.
+    URLs are claimed in crawl scheduler priority order, so time_budget and
+    max_requests (which apply to this shard alone) go to the likeliest
+    changes first.
+    """
+    shard_dir = get_shard_dir(output_dir, shard_index)
+    os.makedirs(shard_dir, exist_ok=True)
+    output_file = os.path.join(shard_dir, "reviews.csv")
+
+    ledger = JobLedger(ledger_file or get_ledger_file(output_dir))
+    partition = get_shard_name(shard_index)
+    ledger.add(PRODUCT_SOURCE, urls, partition=partition,
+               priorities=get_priorities(urls, fingerprint_file, snapshot_file))
+    progress = ledger.progress(PRODUCT_SOURCE).get(PRODUCT_SOURCE, {})
+    print(f"[shard {shard_index}] {len(urls)} URLs, run progress {progress}")
+
+    scraper = AdoreReviewScraper(
+        use_proxies=use_proxies,
+        session_cache=SessionCache(os.path.join(shard_dir, "sessions.json"))
+    )
+
+    # Workers write their own fingerprint file, seeded from the shared store
+    if fingerprint_file:
+        scraper.fingerprints = FingerprintStore(os.path.join(shard_dir, "fingerprints.json"))
+        shared = FingerprintStore(fingerprint_file).fingerprints
+        for url in urls:
+            if url in shared and url not in scraper.fingerprints.fingerprints:
+                scraper.fingerprints.fingerprints[url] = shared[url]
+
+    listing_counts = load_latest_review_counts(snapshot_file) if snapshot_file else {}
+
+    reviews_found = crawl_from_ledger(
+        scraper, ledger, output_file, listing_counts, partition=partition, label=f"shard {shard_index}",
+        time_budget=time_budget, max_requests=max_requests
+    )
+
+    if scraper.fingerprints:
+        scraper.fingerprints.save()
+    scraper.session_cache.save()
+
+    print(f"[shard {shard_index}] Finished with {reviews_found} reviews")
+    return output_file
+
+def merge_shards(shard_files, output_file, fingerprint_file=None, merge_history=True):
+    """
+    Combine shard outputs into one deduplicated review file.
+
+    Also merges the shard fingerprint files back into the shared store and
+    appends new reviews to the review history.
+    """
+    frames = [pd.read_csv(path) for path in shard_files if os.path.exists(path)]
+    if not frames:
+        print("No shard output to merge")
+        return pd.DataFrame()
+
+    reviews_df = pd.concat(frames, ignore_index=True).drop_duplicates(subset='review_id')
+
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    reviews_df.to_csv(output_file, index=False)
+    print(f"Merged {len(reviews_df)} reviews from {len(frames)} shards into {output_file}")
+
+    if fingerprint_file:
+        store = FingerprintStore(fingerprint_file)
+        for path in shard_files:
+            store.merge_from(os.path.join(os.path.dirname(path), "fingerprints.json"))
+        store.save()
+
+    if merge_history:
+        merge_reviews(reviews_df)
+    return reviews_df
+
+def scrape_reviews_sharded(urls, num_workers, output_dir, use_proxies=False, fingerprint_file=None,
+                           snapshot_file=None, time_budget=None, max_requests=None):
+    """Scrape reviews across num_workers processes and merge the results; budgets are per shard"""
+    shards = shard_urls(urls, num_workers)
+    print(f"Split {len(urls)} URLs into {num_workers} shards: {[len(s) for s in shards]}")
+
+    shard_files = []
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = {
+            executor.submit(
+                run_shard, index, shard, output_dir, use_proxies, fingerprint_file, snapshot_file,
+                time_budget=time_budget, max_requests=max_requests
+            ): index
+            for index, shard in enumerate(shards) if shard
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                shard_files.append(future.result())
+            except Exception as e:
+                # Keep whatever the shard wrote; a rerun resumes it from the job ledger
+                print(f"Shard {index} failed: {str(e)}")
+                shard_files.append(os.path.join(get_shard_dir(output_dir, index), "reviews.csv"))
+
+    output_file = os.path.join(output_dir, "reviews.csv")
+    return merge_shards(sorted(shard_files), output_file, fingerprint_file)
+
+def main():
+    parser = argparse.ArgumentParser(description='Scrape Adore Beauty reviews across worker processes')
+    parser.add_argument('url_file', help='File with one product URL per line')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of worker processes')
+    parser.add_argument('--output-dir', default=None,
+                        help='Directory for shard outputs (defaults to a new timestamped run)')
+    parser.add_argument('--use-proxies', action='store_true',
+                        help='Give each worker its own proxy pool')
+    parser.add_argument('--fingerprint-file', default='data/raw/product_fingerprints.json',
+                        help='Shared fingerprint store for change detection')
+    parser.add_argument('--snapshot-file', default='data/raw/product_snapshots.csv',
+                        help='Listing snapshots used to skip products with unchanged review counts')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='Stop each shard after this many seconds')
+    parser.add_argument('--max-requests', type=int, default=None,
+                        help='Stop each shard after fetching this many product pages')
+    args = parser.parse_args()
+
+    with open(args.url_file, 'r') as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    # Reusing an output directory resumes each shard from its ledger
+    output_dir = args.output_dir or os.path.join(
+        "data", "raw", "review_shards", datetime.now().strftime("%Y%m%d_%H%M%S")
+    )
+    reviews_df = scrape_reviews_sharded(
+        urls, args.workers, output_dir, args.use_proxies, args.fingerprint_file, args.snapshot_file,
+        time_budget=args.time_budget, max_requests=args.max_requests
+    )
+    print(f"Total reviews collected: {len(reviews_df)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import pandas as pd
+
+
+def normalize_field(value):
+    """Normalise a field so cosmetic whitespace changes don't alter the ID"""
+    if value is None:
+        return ''
+    return ' '.join(str(value).split())
+
+def make_review_id(product_sku, author, date_published, body):
+    """
+    Build a deterministic review ID from the product SKU, author, date and body.
+
+    Unlike the builtin hash(), this is identical across processes and runs, so
+    it can be used to dedupe reviews between crawls.
+    """
+    key = '\x1f'.join(
+        normalize_field(value) for value in (product_sku, author, date_published, body)
+    )
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+class ReviewIndex:
+    """
+    Append-only on-disk index of review IDs already in the review history.
+
+    The index is a plain text file with one ID per line. It is loaded into a set
+    once, so membership checks and appends are O(1) per review.
+    """
+
+    def __init__(self, index_file="data/processed/review_ids.txt"):
+        self.index_file = index_file
+        self.ids = self.load()
+
+    def load(self):
+        """Load known review IDs from disk"""
+        if not os.path.exists(self.index_file):
+            return set()
+        with open(self.index_file, 'r') as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def __contains__(self, review_id):
+        return review_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add_many(self, review_ids):
+        """Append new IDs to the index, ignoring ones already present"""
+        new_ids = [review_id for review_id in review_ids if review_id not in self.ids]
+        if not new_ids:
+            return 0
+
+        directory = os.path.dirname(self.index_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.index_file, 'a') as f:
+            for review_id in new_ids:
+                f.write(f"{review_id}\n")
+        self.ids.update(new_ids)
+        return len(new_ids)
+
+
+def merge_reviews(reviews_df, history_file="data/processed/reviews_history.csv", index=None):
+    """
+    Merge newly crawled reviews into the review history.
+
+    Only rows whose review_id is not already in the index are appended, so the
+    cost is proportional to the new crawl output rather than the history size.
+    Returns a DataFrame of the rows that were added.
+    """
+    if reviews_df is None or reviews_df.empty:
+        return pd.DataFrame()
+
+    if index is None:
+        index = ReviewIndex()
+
+    # Drop duplicates within this batch as well as ones already in history
+    new_rows = reviews_df.drop_duplicates(subset='review_id')
+    new_rows = new_rows[~new_rows['review_id'].isin(index.ids)]
+
+    if new_rows.empty:
+        print("No new reviews to merge")
+        return new_rows
+
+    directory = os.path.dirname(history_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Append to the history, writing the header only for a new file
+    write_header = not os.path.exists(history_file)
+    new_rows.to_csv(history_file, mode='a', header=write_header, index=False)
+    index.add_many(new_rows['review_id'])
+
+    print(f"Merged {len(new_rows)} new reviews into {history_file}")
+    return new_rows
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+
+import cloudscraper
+
+
+def create_session(user_agent, proxy=None, cookies=None):
+    """Create a cloudscraper session with our standard headers"""
+    session = cloudscraper.create_scraper(
+        browser={
+            'browser': 'chrome',
+            'platform': 'windows',
+            'mobile': False
+        }
+    )
+    session.headers.update({
+        'User-Agent': user_agent,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Connection': 'keep-alive',
+    })
+    if proxy:
+        session.proxies = {
+            'http': f'http://{proxy}',
+            'https': f'http://{proxy}'
+        }
+    if cookies:
+        session.cookies.update(cookies)
+    return session
+
+
+class SessionCache:
+    """
+    Cache of warmed cloudscraper sessions.
+
+    A warmed session has already passed the Cloudflare challenge, so it holds
+    clearance cookies and an open keep-alive connection. Each one is bound to
+    the user agent and proxy it was warmed with, since clearance cookies are
+    only honoured for that combination.
+
+    Spare sessions are warmed in a background thread, so rotating identity
+    swaps to a ready session instead of solving a new challenge inline.
+    Cookies, user agents and proxy bindings are persisted to disk so the next
+    run can start from still-valid clearances.
+    """
+
+    def __init__(self, cache_file="data/raw/session_cache.json",
+                 warm_url="https://www.adorebeauty.com.au/", ttl=3600,
+                 spare_sessions=2, identity_factory=None, identity_valid=None):
+        self.cache_file = cache_file
+        self.warm_url = warm_url
+        self.ttl = ttl
+        self.spare_sessions = spare_sessions
+        # Callable returning (user_agent, proxy) for a new identity
+        self.identity_factory = identity_factory
+        # Callable taking an entry and returning False if its proxy is no longer usable
+        self.identity_valid = identity_valid
+
+        self.lock = threading.Lock()
+        self.spares = []  # List of (entry, session or None) ready to hand out
+        self.in_use = {}  # id(session) -> entry for sessions handed out
+        self.refill_thread = None
+        self.load()
+
+    def load(self):
+        """Load persisted sessions; they are rebuilt lazily on acquire"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"Error loading session cache from {self.cache_file}: {str(e)}")
+            return
+        self.spares = [(entry, None) for entry in entries if not self.is_expired(entry)]
+        print(f"Loaded {len(self.spares)} cached sessions")
+
+    def save(self):
+        """Persist all live sessions, including ones currently in use"""
+        with self.lock:
+            entries = [entry for entry, _ in self.spares] + list(self.in_use.values())
+        entries = [entry for entry in entries if not self.is_expired(entry)]
+
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.cache_file)
+
+    def is_expired(self, entry):
+        return time.time() - entry['created_at'] > self.ttl
+
+    def is_usable(self, entry):
+        if self.is_expired(entry):
+            return False
+        return self.identity_valid is None or self.identity_valid(entry)
+
+    def new_identity(self):
+        if self.identity_factory is None:
+            raise ValueError("SessionCache needs an identity_factory to warm new sessions")
+        return self.identity_factory()
+
+    def warm(self):
+        """Create a new session and pass the challenge on the warm-up URL"""
+        user_agent, proxy = self.new_identity()
+        session = create_session(user_agent, proxy)
+        response = session.get(self.warm_url, timeout=15)
+        response.raise_for_status()
+        entry = {
+            'user_agent': user_agent,
+            'proxy': proxy,
+            'cookies': session.cookies.get_dict(),
+            'created_at': time.time(),
+        }
+        return entry, session
+
+    def cold(self):
+        """Create a new session without a warm-up request; it solves the challenge on first use"""
+        user_agent, proxy = self.new_identity()
+        entry = {
+            'user_agent': user_agent,
+            'proxy': proxy,
+            'cookies': {},
+            'created_at': time.time(),
+        }
+        return entry, create_session(user_agent, proxy)
+
+    def acquire(self):
+        """Return (entry, session), preferring a warm spare over a cold start"""
+        chosen = None
+        with self.lock:
+            while self.spares:
+                entry, session = self.spares.pop(0)
+                if self.is_usable(entry):
+                    chosen = (entry, session)
+                    break
+
+        if chosen is None:
+            # No spares left, so we have to warm one inline
+            print("No warm sessions available, warming a new one...")
+            try:
+                chosen = self.warm()
+            except Exception as e:
+                # Callers rotate identity while recovering from fetch errors,
+                # so a failed warm-up must not raise; start cold instead
+                print(f"Error warming session, starting a cold one: {str(e)}")
+                chosen = self.cold()
+
+        entry, session = chosen
+        if session is None:
+            # Restored from disk: rebuild with the saved clearance cookies
+            session = create_session(entry['user_agent'], entry['proxy'], entry['cookies'])
+
+        with self.lock:
+            self.in_use[id(session)] = entry
+
+        self.refill_in_background()
+        return entry, session
+
+    def release(self, session, healthy=True):
+        """Return a session to the cache, or drop it if it has been blocked"""
+        with self.lock:
+            entry = self.in_use.pop(id(session), None)
+            if entry is None or not healthy or not self.is_usable(entry):
+                return
+            entry['cookies'] = session.cookies.get_dict()
+            # Put it at the back so identities are used in rotation
+            self.spares.append((entry, session))
+
+    def refill_in_background(self):
+        """Warm spare sessions in a background thread until the target is met"""
+        if self.identity_factory is None:
+            return
+        if self.refill_thread is not None and self.refill_thread.is_alive():
+            return
+
+        def run():
+            failures = 0
+            while failures < 3:
+                with self.lock:
+                    if len(self.spares) >= self.spare_sessions:
+                        return
+                try:
+                    warmed = self.warm()
+                except Exception as e:
+                    failures += 1
+                    print(f"Error warming session: {str(e)}")
+                    continue
+                with self.lock:
+                    self.spares.append(warmed)
+
+        self.refill_thread = threading.Thread(target=run, daemon=True)
+        self.refill_thread.start()
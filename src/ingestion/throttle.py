@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+
+
+class AdaptiveThrottle:
+    """
+    AIMD (additive increase, multiplicative decrease) request rate controller.
+
+    Every healthy response nudges the request rate up by a fixed step, and every
+    throttling response (403/429/503) cuts it by a factor. Callers call wait()
+    before each request and record() with the response status afterwards.
+
+    The throttle is thread-safe, so several crawlers can share one rate budget.
+    With adaptive=False it falls back to a fixed random sleep between requests.
+    """
+
+    THROTTLE_STATUS_CODES = (403, 429, 503)
+
+    def __init__(self, initial_rate=0.3, min_rate=0.05, max_rate=2.0,
+                 increase=0.05, decrease_factor=0.5, jitter=0.2,
+                 adaptive=True, fallback_delay=(2, 5)):
+        self.rate = initial_rate  # Requests per second
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.jitter = jitter
+        self.adaptive = adaptive
+        self.fallback_delay = fallback_delay
+
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+        self.requests = 0
+        self.throttled = 0
+
+    @property
+    def current_rate(self):
+        """Current request rate in requests per second"""
+        return self.rate if self.adaptive else 2 / sum(self.fallback_delay)
+
+    def wait(self):
+        """Sleep until the next request slot is available"""
+        if not self.adaptive:
+            time.sleep(random.uniform(*self.fallback_delay))
+            return
+
+        # Reserve a slot under the lock, then sleep outside it
+        with self.lock:
+            now = time.time()
+            slot = max(now, self.next_slot)
+            interval = 1.0 / self.rate
+            interval *= random.uniform(1 - self.jitter, 1 + self.jitter)
+            self.next_slot = slot + interval
+
+        delay = slot - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, status_code):
+        """Adjust the rate based on a response status code"""
+        with self.lock:
+            self.requests += 1
+            if status_code in self.THROTTLE_STATUS_CODES:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                # Push the next slot out so queued requests feel the backoff immediately
+                self.next_slot = max(self.next_slot, time.time() + 1.0 / self.rate)
+            elif status_code is not None and status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def stats(self):
+        """Summary of the throttle state for logging"""
+        with self.lock:
+            return {
+                'rate': round(self.current_rate, 3),
+                'requests': self.requests,
+                'throttled': self.throttled,
+            }
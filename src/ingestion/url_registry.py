@@ -0,0 +1,147 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+
+class UrlRegistry:
+    """
+    Persistent registry of discovered product URLs.
+
+    Each URL records when it was first and last seen by a listing crawl, whether
+    it is still active, and when its reviews were last crawled. Updating the
+    registry with a crawl's URLs returns the delta since the previous crawl.
+    """
+
+    def __init__(self, registry_file="data/raw/product_url_registry.json"):
+        self.registry_file = registry_file
+        self.urls = {}
+        self.last_crawl = None
+        self.last_full_crawl = None
+        self.load()
+
+    def load(self):
+        """Load the registry from disk"""
+        if not os.path.exists(self.registry_file):
+            return
+        try:
+            with open(self.registry_file, 'r') as f:
+                data = json.load(f)
+            self.urls = data.get('urls', {})
+            self.last_crawl = data.get('last_crawl')
+            self.last_full_crawl = data.get('last_full_crawl')
+        except Exception as e:
+            print(f"Error loading URL registry from {self.registry_file}: {str(e)}")
+
+    def save(self):
+        """Write the registry to disk"""
+        directory = os.path.dirname(self.registry_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.registry_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'last_crawl': self.last_crawl,
+                'last_full_crawl': self.last_full_crawl,
+                'urls': self.urls
+            }, f)
+        os.replace(tmp_path, self.registry_file)
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def __len__(self):
+        return len(self.urls)
+
+    def update(self, urls, seen_at=None, complete=True):
+        """
+        Record the URLs found by a listing crawl and return what changed.
+
+        If complete is True the crawl covered the whole catalogue, so active
+        URLs that weren't seen are marked as gone. Partial crawls (for example
+        an incremental crawl of the newest products) only add and refresh URLs.
+        """
+        seen_at = (seen_at or datetime.now()).isoformat()
+        seen = set(urls)
+        delta = {'new': [], 'returned': [], 'gone': [], 'unchanged': []}
+
+        for url in seen:
+            entry = self.urls.get(url)
+            if entry is None:
+                self.urls[url] = {
+                    'first_seen': seen_at,
+                    'last_seen': seen_at,
+                    'status': 'active',
+                    'last_review_crawl': None,
+                }
+                delta['new'].append(url)
+                continue
+            if entry['status'] == 'gone':
+                delta['returned'].append(url)
+            else:
+                delta['unchanged'].append(url)
+            entry['last_seen'] = seen_at
+            entry['status'] = 'active'
+
+        if complete:
+            for url, entry in self.urls.items():
+                if entry['status'] == 'active' and url not in seen:
+                    entry['status'] = 'gone'
+                    delta['gone'].append(url)
+
+        self.last_crawl = seen_at
+        if complete:
+            self.last_full_crawl = seen_at
+        for key in delta:
+            delta[key].sort()
+        return delta
+
+    def full_crawl_due(self, max_age_days=7, now=None):
+        """Whether the last complete crawl is missing or older than max_age_days"""
+        if self.last_full_crawl is None:
+            return True
+        now = now or datetime.now()
+        return self.last_full_crawl < (now - timedelta(days=max_age_days)).isoformat()
+
+    def save_delta(self, delta, directory="data/raw"):
+        """Write a crawl delta to a timestamped JSON file"""
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(directory, f"product_urls_delta_{timestamp}.json")
+        with open(filepath, 'w') as f:
+            json.dump({key: urls for key, urls in delta.items() if key != 'unchanged'}, f, indent=2)
+        print(f"Saved URL delta to {filepath}")
+        return filepath
+
+    def active_urls(self):
+        return sorted(url for url, entry in self.urls.items() if entry['status'] == 'active')
+
+    def urls_for_review_crawl(self, recrawl_after_days=7, now=None):
+        """
+        Active URLs whose reviews are due for a crawl.
+
+        New products (never review-crawled) come first, followed by products
+        whose last review crawl is older than recrawl_after_days.
+        """
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=recrawl_after_days)).isoformat()
+
+        never_crawled = []
+        due = []
+        for url, entry in self.urls.items():
+            if entry['status'] != 'active':
+                continue
+            if entry['last_review_crawl'] is None:
+                never_crawled.append(url)
+            elif entry['last_review_crawl'] < cutoff:
+                due.append(url)
+
+        # Oldest crawls first within the due set
+        due.sort(key=lambda url: self.urls[url]['last_review_crawl'])
+        return sorted(never_crawled) + due
+
+    def mark_review_crawled(self, urls, crawled_at=None):
+        """Record that the reviews of these URLs have been crawled"""
+        crawled_at = (crawled_at or datetime.now()).isoformat()
+        for url in urls:
+            if url in self.urls:
+                self.urls[url]['last_review_crawl'] = crawled_at
@@ -8,6 +8,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import test modules
 from tests.test_reddit_scraper import TestRedditScraper
+from tests.test_adore_review_scraper import TestAdoreReviewScraper
+from tests.test_review_store import TestReviewStore
+from tests.test_proxy_pool import TestProxyPool
+from tests.test_throttle import TestAdaptiveThrottle
+from tests.test_review_shards import TestReviewShards
+from tests.test_adore_scraper import TestAdoreBeautyScraper
+from tests.test_url_registry import TestUrlRegistry
+from tests.test_crawl_scheduler import TestReviewCrawlScheduler
+from tests.test_parse_pipeline import TestFetchParsePipeline
+from tests.test_job_ledger import TestJobLedger
+from tests.test_distributed import TestDistributed
+from tests.test_reddit_credentials import TestCredentialPool
+from tests.test_reddit_refresh import TestRedditRefresh
+from tests.test_reddit_fast import TestRedditFastPath
+from tests.test_relevance_filter import TestRelevanceFilter
+from tests.test_reddit_search import TestCatalogSearch
+from tests.test_author_enrichment import TestAuthorEnrichment
+from tests.test_adaptive_limit import TestAdaptiveLimit
+from tests.test_comment_sampler import TestCommentSampler
+from tests.test_dags import TestDagDefaults
 
 def run_tests():
     """Run all tests in the project"""
@@ -16,6 +36,26 @@ def run_tests():
     
     # Add test cases
     test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRedditScraper))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAdoreReviewScraper))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestReviewStore))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestProxyPool))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAdaptiveThrottle))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestReviewShards))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAdoreBeautyScraper))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestUrlRegistry))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestReviewCrawlScheduler))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestFetchParsePipeline))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestJobLedger))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestDistributed))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCredentialPool))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRedditRefresh))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRedditFastPath))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestRelevanceFilter))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCatalogSearch))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAuthorEnrichment))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAdaptiveLimit))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCommentSampler))
+    test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestDagDefaults))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
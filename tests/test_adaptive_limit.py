@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from datetime import datetime
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.adaptive_limit import AdaptiveLimit, STOP_ENGAGEMENT, STOP_EXHAUSTED, STOP_YIELD
+from src.ingestion.reddit_scraper import scrape_subreddit_window
+
+def listed_post(post_id, score, num_comments):
+    return SimpleNamespace(id=post_id, score=score, num_comments=num_comments)
+
+class TestAdaptiveLimit(unittest.TestCase):
+    """Test cases for the adaptive per-window post limit"""
+
+    def fetch_all(self, limit, posts, yields=None):
+        """Drive select() the way scrape_posts does, recording each post's comment count"""
+        fetched = []
+        for post in limit.select(posts):
+            fetched.append(post.id)
+            limit.record(post.id, yields[post.id] if yields else post.num_comments)
+        return fetched
+
+    def test_stops_below_engagement_quantile(self):
+        """Test posts are fetched best first and the quiet half of the window is skipped"""
+        posts = [listed_post(f"p{i}", score=i, num_comments=i) for i in range(10)]
+        limit = AdaptiveLimit(engagement_quantile=0.5, min_yield=None, min_posts=2)
+
+        fetched = self.fetch_all(limit, posts)
+
+        self.assertEqual(fetched, ['p9', 'p8', 'p7', 'p6', 'p5'])
+        coverage = limit.coverage()
+        self.assertEqual(coverage['stop_reason'], STOP_ENGAGEMENT)
+        self.assertEqual(coverage['posts_in_window'], 10)
+        self.assertEqual(coverage['post_coverage'], 0.5)
+        self.assertAlmostEqual(coverage['comment_coverage'], 35 / 45)
+
+    def test_stops_on_low_comment_yield_but_not_before_min_posts(self):
+        """Test a run of threads that yield few comments ends the window after min_posts"""
+        posts = [listed_post(f"p{i}", score=100 - i, num_comments=0) for i in range(20)]
+        limit = AdaptiveLimit(engagement_quantile=None, min_yield=2.0, yield_window=3, min_posts=5)
+
+        fetched = self.fetch_all(limit, posts, yields={post.id: 1 for post in posts})
+
+        self.assertEqual(len(fetched), 5)
+        self.assertEqual(limit.stop_reason, STOP_YIELD)
+
+    def test_quiet_window_is_fetched_in_full(self):
+        """Test a window smaller than min_posts is exhausted and fresh() copies carry no state"""
+        posts = [listed_post('p1', 5, 3), listed_post('p2', 1, 0)]
+        template = AdaptiveLimit(min_posts=10)
+        limit = template.fresh()
+
+        self.assertEqual(self.fetch_all(limit, posts), ['p1', 'p2'])
+        self.assertEqual(limit.coverage()['stop_reason'], STOP_EXHAUSTED)
+        self.assertEqual(template.fetched, {})
+
+    @patch('time.sleep')
+    def test_scrape_subreddit_window_reports_coverage(self, mock_sleep):
+        """Test the windowed scraper fetches comments only for the posts the limit selects"""
+        def make_post(post_id, score, created):
+            post = MagicMock()
+            post.id = post_id
+            post.title = post_id
+            post.selftext = ''
+            post.score = score
+            post.num_comments = score
+            post.created_utc = created.timestamp()
+            post.comments.list.return_value = [MagicMock(id=f"{post_id}c{i}") for i in range(score)]
+            return post
+
+        posts = [make_post(f"p{i}", i, datetime(2021, 1, 20 - i)) for i in range(1, 7)]
+        posts += [make_post(f"old{i}", 1, datetime(2020, 12, 1)) for i in range(5)]
+        mock_reddit = MagicMock()
+        mock_reddit.subreddit.return_value.new.return_value = iter(posts)
+        stats = {}
+
+        posts_df, comments_df = scrape_subreddit_window(
+            'test_subreddit', datetime(2021, 1, 1), datetime(2021, 2, 1), reddit=mock_reddit, stats=stats,
+            adaptive_limit=AdaptiveLimit(engagement_quantile=0.5, min_yield=None, min_posts=1)
+        )
+
+        self.assertEqual(list(posts_df['id']), ['p6', 'p5', 'p4'])
+        posts[0].comments.replace_more.assert_not_called()
+        self.assertEqual(stats['coverage']['posts_in_window'], 6)
+        self.assertEqual(stats['coverage']['comments_fetched'], 15)
+        self.assertTrue(stats['reached_start'])
+        self.assertTrue(stats['limit_reached'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+import unittest
+from unittest.mock import patch, MagicMock, call
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import requests
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.adore_review_scraper import AdoreReviewScraper
+from src.ingestion.product_fingerprints import FingerprintStore
+from src.ingestion.throttle import AdaptiveThrottle
+from src.ingestion.session_cache import SessionCache
+
+PRODUCT_DATA = {
+    'sku': 'SKU1',
+    'name': 'Test Serum',
+    'brand': {'name': 'Test Brand'},
+    'aggregateRating': {'reviewCount': '2'},
+    'review': [
+        {
+            'author': {'name': 'user1'},
+            'name': 'Great',
+            'reviewBody': 'Loved it',
+            'reviewRating': {'ratingValue': 5},
+            'datePublished': '2024-01-01'
+        },
+        {
+            'author': {'name': 'user2'},
+            'name': 'Okay',
+            'reviewBody': 'It was fine',
+            'reviewRating': {'ratingValue': 3},
+            'datePublished': '2024-01-02'
+        }
+    ]
+}
+
+def make_page(product_data):
+    return (
+        '<html><head><script type="application/ld+json" id="product_structured_data">'
+        f'{json.dumps(product_data)}'
+        '</script></head><body></body></html>'
+    )
+
+def make_response(status_code=200, text='', headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.text = text
+    response.headers = headers or {}
+    return response
+
+class TestAdoreReviewScraper(unittest.TestCase):
+    """Test cases for the Adore Beauty review scraper"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.fingerprint_file = os.path.join(self.temp_dir.name, 'fingerprints.json')
+        sleep_patcher = patch('src.ingestion.adore_review_scraper.time.sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_scraper(self):
+        scraper = AdoreReviewScraper(
+            fingerprint_file=self.fingerprint_file,
+            throttle=AdaptiveThrottle(adaptive=False, fallback_delay=(0, 0))
+        )
+        scraper.scraper = MagicMock()
+        return scraper
+
+    def test_extract_structured_data_fast_path(self):
+        """Test the structured-data block is found without a full parse"""
+        scraper = self.make_scraper()
+        raw = scraper.extract_structured_data(make_page(PRODUCT_DATA))
+        self.assertEqual(json.loads(raw)['sku'], 'SKU1')
+
+    def test_unchanged_product_is_skipped(self):
+        """Test a second crawl of identical data emits no reviews"""
+        scraper = self.make_scraper()
+        scraper.scraper.get.return_value = make_response(
+            text=make_page(PRODUCT_DATA), headers={'ETag': '"abc"'}
+        )
+
+        first = scraper.get_product_reviews('https://example.com/p/serum.html')
+        self.assertEqual(len(first), 2)
+
+        second = scraper.get_product_reviews('https://example.com/p/serum.html')
+        self.assertEqual(second, [])
+
+    def test_not_modified_response_is_skipped(self):
+        """Test stored validators are sent and a 304 skips the product"""
+        scraper = self.make_scraper()
+        url = 'https://example.com/p/serum.html'
+        scraper.scraper.get.return_value = make_response(
+            text=make_page(PRODUCT_DATA), headers={'ETag': '"abc"'}
+        )
+        scraper.get_product_reviews(url)
+
+        scraper.scraper.get.return_value = make_response(status_code=304)
+        result = scraper.get_product_reviews(url)
+
+        self.assertEqual(result, [])
+        _, kwargs = scraper.scraper.get.call_args
+        self.assertEqual(kwargs['headers']['If-None-Match'], '"abc"')
+
+    def test_new_review_is_emitted(self):
+        """Test a product with a new review is re-emitted"""
+        scraper = self.make_scraper()
+        url = 'https://example.com/p/serum.html'
+        scraper.scraper.get.return_value = make_response(text=make_page(PRODUCT_DATA))
+        scraper.get_product_reviews(url)
+
+        updated = dict(PRODUCT_DATA)
+        updated['aggregateRating'] = {'reviewCount': '3'}
+        updated['review'] = PRODUCT_DATA['review'] + [{
+            'author': {'name': 'user3'},
+            'reviewBody': 'New review',
+            'datePublished': '2024-02-01'
+        }]
+        scraper.scraper.get.return_value = make_response(text=make_page(updated))
+
+        result = scraper.get_product_reviews(url)
+        self.assertEqual(len(result), 3)
+
+    def test_fingerprints_persist(self):
+        """Test fingerprints are saved and reloaded between runs"""
+        scraper = self.make_scraper()
+        url = 'https://example.com/p/serum.html'
+        scraper.scraper.get.return_value = make_response(text=make_page(PRODUCT_DATA))
+        scraper.get_product_reviews(url)
+        scraper.fingerprints.save()
+
+        reloaded = FingerprintStore(self.fingerprint_file)
+        self.assertEqual(reloaded.get(url)['review_count'], 2)
+
+    def test_unchanged_listing_count_skips_fetch(self):
+        """Test products whose listing review count matches are not fetched"""
+        scraper = self.make_scraper()
+        url = 'https://example.com/p/serum.html'
+        scraper.scraper.get.return_value = make_response(text=make_page(PRODUCT_DATA))
+        scraper.get_product_reviews(url)
+        scraper.scraper.get.reset_mock()
+        scraper.save_reviews = MagicMock()
+
+        listed_at = datetime.now() + timedelta(seconds=1)
+
+        scraper.scrape_reviews_from_urls([url], listing_counts={url: {'review_count': 2, 'crawled_at': listed_at}})
+
+        scraper.scraper.get.assert_not_called()
+        self.assertEqual(scraper.crawled_urls, [url])
+
+    def test_listing_count_older_than_last_crawl_does_not_skip(self):
+        """Test a snapshot taken before the last crawl can't keep the product from being fetched"""
+        scraper = self.make_scraper()
+        url = 'https://example.com/p/serum.html'
+        listed_at = datetime.now() - timedelta(days=1)
+        scraper.scraper.get.return_value = make_response(text=make_page(PRODUCT_DATA))
+        scraper.get_product_reviews(url)
+
+        self.assertFalse(scraper.review_count_unchanged(url, {url: {'review_count': 2, 'crawled_at': listed_at}}))
+
+    def test_request_budget_stops_crawl(self):
+        """Test the crawl stops once its request budget is spent"""
+        scraper = self.make_scraper()
+        scraper.get_product_reviews = MagicMock(return_value=[])
+
+        scraper.scrape_reviews_from_urls(['a', 'b', 'c'], max_requests=2)
+
+        self.assertEqual(scraper.get_product_reviews.call_count, 2)
+        self.assertEqual(scraper.crawled_urls, ['a', 'b'])
+
+    def test_missing_product_does_not_penalize_proxy(self):
+        """Test a 404 is not retried and doesn't count against the proxy, while a 503 does"""
+        scraper = self.make_scraper()
+        scraper.record_proxy_result = MagicMock()
+        scraper.rotate_identity = MagicMock()
+        scraper.scraper.get.return_value = make_response(status_code=404)
+
+        self.assertIsNone(scraper.fetch_product_page('https://example.com/p/gone.html'))
+        self.assertEqual(scraper.scraper.get.call_count, 1)
+        scraper.rotate_identity.assert_not_called()
+        self.assertNotIn(call(False), scraper.record_proxy_result.call_args_list)
+
+        scraper.scraper.get.return_value = make_response(status_code=503)
+        scraper.fetch_product_page('https://example.com/p/serum.html', max_retries=1)
+        scraper.record_proxy_result.assert_called_with(False)
+        scraper.rotate_identity.assert_called_once_with(healthy=False)
+
+    @patch('src.ingestion.adore_review_scraper.create_session')
+    def test_parallel_fetchers_use_their_own_sessions(self, mock_create_session):
+        """Test each fetcher thread fetches through its own session, never the shared one"""
+        sessions = []
+        def create_session(*args, **kwargs):
+            session = MagicMock()
+            session.get.return_value = make_response(text=make_page(PRODUCT_DATA))
+            sessions.append(session)
+            return session
+        mock_create_session.side_effect = create_session
+        scraper = self.make_scraper()
+        scraper.throttle = AdaptiveThrottle(adaptive=False, fallback_delay=(0, 0.001))
+        scraper.save_reviews = MagicMock()
+        urls = [f"https://example.com/p/product-{i}.html" for i in range(6)]
+        del sessions[:]
+
+        scraper.scrape_reviews_parallel(urls, fetch_workers=2, parse_workers=1)
+
+        scraper.scraper.get.assert_not_called()
+        self.assertTrue(1 <= len(sessions) <= 2)
+        self.assertEqual(sum(session.get.call_count for session in sessions), 6)
+        self.assertEqual(sorted(scraper.crawled_urls), sorted(urls))
+
+    @patch('src.ingestion.session_cache.create_session')
+    def test_rotate_identity_uses_warm_session(self, mock_create_session):
+        """Test rotation swaps to a spare session without warming inline"""
+        mock_create_session.side_effect = lambda *args, **kwargs: MagicMock()
+        cache = SessionCache(os.path.join(self.temp_dir.name, 'sessions.json'))
+        cache.refill_in_background = MagicMock()
+        cache.warm = MagicMock(side_effect=AssertionError("should not warm inline"))
+        for user_agent in ['ua1', 'ua2']:
+            entry = {'user_agent': user_agent, 'proxy': None, 'cookies': {}, 'created_at': time.time()}
+            cache.spares.append((entry, MagicMock()))
+
+        scraper = AdoreReviewScraper(session_cache=cache)
+        first_session = scraper.scraper
+        scraper.rotate_identity()
+
+        self.assertIsNot(scraper.scraper, first_session)
+        # The healthy session goes back into the cache for reuse
+        self.assertIs(cache.spares[-1][1], first_session)
+
+    @patch('src.ingestion.session_cache.create_session')
+    def test_failed_warm_up_falls_back_to_cold_session(self, mock_create_session):
+        """Test a 403 on the warm-up URL starts a cold session instead of raising"""
+        blocked = make_response(status_code=403)
+        blocked.raise_for_status.side_effect = requests.exceptions.HTTPError("403 Forbidden")
+        sessions = []
+        def create_session(*args, **kwargs):
+            session = MagicMock()
+            session.get.return_value = blocked
+            sessions.append(session)
+            return session
+        mock_create_session.side_effect = create_session
+        cache = SessionCache(os.path.join(self.temp_dir.name, 'sessions.json'))
+        cache.refill_in_background = MagicMock()
+
+        scraper = AdoreReviewScraper(session_cache=cache)
+        # Rotating while recovering from a fetch error must not raise either
+        scraper.rotate_identity(healthy=False)
+
+        self.assertIs(scraper.scraper, sessions[-1])
+        self.assertEqual(len(sessions), 4)
+        self.assertEqual(cache.in_use[id(scraper.scraper)]['cookies'], {})
+
+    @patch('src.ingestion.session_cache.create_session')
+    def test_session_cache_persists(self, mock_create_session):
+        """Test sessions and their cookies are restored from disk"""
+        cache_file = os.path.join(self.temp_dir.name, 'sessions.json')
+        cache = SessionCache(cache_file)
+        session = MagicMock()
+        session.cookies.get_dict.return_value = {'cf_clearance': 'token'}
+        entry = {'user_agent': 'ua1', 'proxy': None, 'cookies': {}, 'created_at': time.time()}
+        cache.in_use[id(session)] = entry
+        cache.release(session)
+        cache.save()
+
+        restored = SessionCache(cache_file)
+        restored.refill_in_background = MagicMock()
+        entry, _ = restored.acquire()
+        self.assertEqual(entry['cookies'], {'cf_clearance': 'token'})
+        mock_create_session.assert_called_with('ua1', None, {'cf_clearance': 'token'})
+
+if __name__ == '__main__':
+    unittest.main()
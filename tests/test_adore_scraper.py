@@ -0,0 +1,228 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import gzip
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.adore_scraper import AdoreBeautyScraper
+from src.ingestion.throttle import AdaptiveThrottle
+from src.ingestion.product_snapshots import save_snapshots, load_latest_review_counts
+from src.ingestion.category_crawler import MultiCategoryCrawler
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-skin-care.xml.gz</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap-makeup.xml</loc></sitemap>
+</sitemapindex>"""
+
+SKINCARE_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://example.com/p/brand/serum.html</loc>
+    <image:image><image:loc>https://example.com/p/brand/serum.jpg</image:loc></image:image>
+  </url>
+  <url><loc>https://example.com/p/brand/cleanser.html</loc></url>
+  <url><loc>https://example.com/c/skin-care.html</loc></url>
+</urlset>"""
+
+LISTING_PAGE = """<html><body>
+<div class="relative rounded-md border-[1px] border-[#e1dfdf]">
+  <a href="/p/brand/serum.html" title="Brand Serum 30ml">Brand Serum 30ml</a>
+  <div aria-label="Rated 4.5 out of 5 stars"></div>
+  <span>(128)</span>
+  <span>$45.95</span>
+</div>
+<div class="relative rounded-md border-[1px] border-[#e1dfdf]">
+  <a href="/p/brand/cleanser.html"><img alt="Brand Cleanser"></a>
+  <span>$1,020.00</span>
+</div>
+</body></html>"""
+
+def make_response(content, status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response._content_consumed = True
+    if status_code >= 400:
+        response.raise_for_status.side_effect = Exception(f"HTTP {status_code}")
+    return response
+
+class TestAdoreBeautyScraper(unittest.TestCase):
+    """Test cases for the Adore Beauty product URL scraper"""
+
+    def make_scraper(self):
+        scraper = AdoreBeautyScraper(throttle=AdaptiveThrottle(adaptive=False, fallback_delay=(0, 0)))
+        scraper.scraper = MagicMock()
+        return scraper
+
+    def test_sitemap_discovery(self):
+        """Test product URLs are streamed from a gzipped category sitemap"""
+        scraper = self.make_scraper()
+        pages = {
+            'https://example.com/sitemap.xml': make_response(SITEMAP_INDEX),
+            'https://example.com/sitemap-skin-care.xml.gz': make_response(gzip.compress(SKINCARE_SITEMAP)),
+        }
+        scraper.scraper.get.side_effect = lambda url, **kwargs: pages[url]
+
+        found = scraper.collect_product_urls_from_sitemap(['https://example.com/sitemap.xml'])
+
+        self.assertEqual(found, 2)
+        self.assertEqual(scraper.product_urls, {
+            'https://example.com/p/brand/serum.html',
+            'https://example.com/p/brand/cleanser.html',
+        })
+        # Only the skin-care child sitemap is read
+        requested = [call[0][0] for call in scraper.scraper.get.call_args_list]
+        self.assertNotIn('https://example.com/sitemap-makeup.xml', requested)
+
+    def test_sitemap_without_category_is_not_read(self):
+        """Test an index with no category sitemap yields nothing rather than the whole catalogue"""
+        scraper = self.make_scraper()
+        index = SITEMAP_INDEX.replace(b'sitemap-skin-care.xml.gz', b'sitemap-products.xml')
+        pages = {
+            'https://example.com/sitemap.xml': make_response(index),
+            'https://example.com/sitemap-products.xml': make_response(SKINCARE_SITEMAP),
+        }
+        scraper.scraper.get.side_effect = lambda url, **kwargs: pages[url]
+        scraper.get_sitemap_urls = MagicMock(return_value=['https://example.com/sitemap.xml'])
+        scraper.get_product_urls_from_page = MagicMock(return_value=False)
+
+        scraper.collect_all_product_urls(use_sitemap=True)
+
+        self.assertEqual(scraper.product_urls, set())
+        requested = [call[0][0] for call in scraper.scraper.get.call_args_list]
+        self.assertEqual(requested, ['https://example.com/sitemap.xml'])
+        # The category-scoped listing crawl runs instead
+        scraper.get_product_urls_from_page.assert_called_once_with(1)
+
+    def test_sitemap_falls_back_to_pagination(self):
+        """Test the paginated crawl runs when the sitemap is unavailable"""
+        scraper = self.make_scraper()
+        scraper.get_sitemap_urls = MagicMock(return_value=['https://example.com/sitemap.xml'])
+        scraper.scraper.get.return_value = make_response(b'', status_code=404)
+        scraper.get_product_urls_from_page = MagicMock(return_value=False)
+
+        scraper.collect_all_product_urls(use_sitemap=True)
+
+        scraper.get_product_urls_from_page.assert_called_once_with(1)
+
+    def test_listing_crawl_reports_whether_it_reached_the_end(self):
+        """Test only a crawl that paged to an empty page without failures counts as complete"""
+        scraper = self.make_scraper()
+        scraper.get_product_urls_from_page = MagicMock(side_effect=[True, True, False])
+        scraper.collect_all_product_urls()
+        self.assertTrue(scraper.reached_end)
+
+        scraper.get_product_urls_from_page = MagicMock(return_value=True)
+        scraper.collect_all_product_urls(max_pages=2)
+        self.assertFalse(scraper.reached_end)
+
+        def failing_page(page_number):
+            if page_number == 1:
+                scraper.consecutive_errors += 1
+                return True
+            return False
+        scraper.get_product_urls_from_page = MagicMock(side_effect=failing_page)
+        scraper.collect_all_product_urls()
+        self.assertFalse(scraper.reached_end)
+
+    def test_listing_page_captures_card_metadata(self):
+        """Test listing cards yield price, rating and review count"""
+        scraper = self.make_scraper()
+        response = make_response(b'')
+        response.text = LISTING_PAGE
+        scraper.scraper.get.return_value = response
+
+        self.assertTrue(scraper.get_product_urls_from_page(1))
+
+        serum = scraper.product_snapshots['https://www.adorebeauty.com.au/p/brand/serum.html']
+        self.assertEqual(serum['name'], 'Brand Serum 30ml')
+        self.assertEqual(serum['price'], 45.95)
+        self.assertEqual(serum['rating'], 4.5)
+        self.assertEqual(serum['review_count'], 128)
+
+        cleanser = scraper.product_snapshots['https://www.adorebeauty.com.au/p/brand/cleanser.html']
+        self.assertEqual(cleanser['name'], 'Brand Cleanser')
+        self.assertEqual(cleanser['price'], 1020.0)
+        self.assertIsNone(cleanser['review_count'])
+
+    def test_incremental_crawl_stops_at_known_page(self):
+        """Test the newest-first crawl stops at the first page of known URLs"""
+        scraper = self.make_scraper()
+        pages = {
+            1: ['https://example.com/p/new-1.html', 'https://example.com/p/old-1.html'],
+            2: ['https://example.com/p/old-2.html', 'https://example.com/p/old-3.html'],
+            3: ['https://example.com/p/never-reached.html'],
+        }
+        registry = {url for url in sum(pages.values(), []) if '/old-' in url}
+
+        def fake_page(page_number, sort=None):
+            self.assertEqual(sort, scraper.newest_sort)
+            scraper.last_page_urls = pages[page_number]
+            return True
+
+        scraper.get_product_urls_from_page = MagicMock(side_effect=fake_page)
+
+        new_urls = scraper.collect_new_product_urls(registry)
+
+        self.assertEqual(new_urls, ['https://example.com/p/new-1.html'])
+        self.assertEqual(scraper.get_product_urls_from_page.call_count, 2)
+
+    @patch('src.ingestion.category_crawler.AdoreBeautyScraper')
+    def test_multi_category_shared_frontier(self, mock_scraper_class):
+        """Test products in several categories are deduplicated and tagged with each"""
+        listings = {
+            'https://example.com/c/skin-care/serums.html': [['https://example.com/p/a.html', 'https://example.com/p/b.html']],
+            'https://example.com/c/skin-care/sale.html': [['https://example.com/p/b.html', 'https://example.com/p/c.html']],
+        }
+
+        def make_category_scraper(throttle, category_url):
+            scraper = MagicMock()
+            scraper.consecutive_errors = 0
+            scraper.product_snapshots = {}
+            pages = iter(listings[category_url])
+
+            def fake_page(page_number):
+                urls = next(pages, [])
+                scraper.last_page_urls = urls
+                scraper.product_snapshots.update({url: {'url': url} for url in urls})
+                return bool(urls)
+
+            scraper.get_product_urls_from_page.side_effect = fake_page
+            return scraper
+
+        mock_scraper_class.side_effect = make_category_scraper
+        crawler = MultiCategoryCrawler(list(listings))
+        frontier = crawler.crawl()
+
+        self.assertEqual(set(frontier), {'https://example.com/p/a.html', 'https://example.com/p/b.html', 'https://example.com/p/c.html'})
+        self.assertEqual(frontier['https://example.com/p/b.html'], {'skin-care/serums', 'skin-care/sale'})
+        # Both category scrapers share one throttle
+        throttles = {call.kwargs['throttle'] for call in mock_scraper_class.call_args_list}
+        self.assertEqual(throttles, {crawler.throttle})
+        self.assertTrue(crawler.is_complete())
+
+        # A category cut short by max_pages leaves the crawl incomplete
+        mock_scraper_class.side_effect = make_category_scraper
+        partial = MultiCategoryCrawler(list(listings))
+        partial.crawl(max_pages=1)
+        self.assertFalse(partial.is_complete())
+
+    def test_latest_review_counts(self):
+        """Test the most recent snapshot of each product wins"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot_file = os.path.join(temp_dir, 'snapshots.csv')
+            save_snapshots([{'url': 'a', 'review_count': 1}], snapshot_file, datetime(2024, 1, 1))
+            save_snapshots([{'url': 'a', 'review_count': 3}, {'url': 'b'}], snapshot_file, datetime(2024, 1, 2))
+            counts = load_latest_review_counts(snapshot_file, now=datetime(2024, 1, 3))
+            self.assertEqual(counts, {'a': {'review_count': 3, 'crawled_at': datetime(2024, 1, 2)}})
+            # Snapshots past the maximum age are not trusted at all
+            self.assertEqual(load_latest_review_counts(snapshot_file, now=datetime(2024, 2, 1)), {})
+
+if __name__ == '__main__':
+    unittest.main()
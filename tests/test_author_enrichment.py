@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+import os
+import sys
+import tempfile
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.author_enrichment import AuthorCache, AuthorEnricher
+
+NOW = 1700000000.0
+
+class TestAuthorEnrichment(unittest.TestCase):
+    """Test cases for author enrichment and its TTL LRU cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, 'authors.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_reddit(self):
+        """Fake client whose partial_redditors knows every t2_ fullname"""
+        reddit = MagicMock()
+        def partial_redditors(fullnames):
+            return [
+                SimpleNamespace(fullname=fullname, created_utc=NOW - 10 * 86400, link_karma=5, comment_karma=50)
+                for fullname in fullnames
+            ]
+        reddit.redditors.partial_redditors.side_effect = partial_redditors
+        reddit.redditor.return_value = SimpleNamespace(created_utc=NOW - 86400, link_karma=1, comment_karma=2)
+        return reddit
+
+    def test_cache_expires_and_evicts_least_recently_used(self):
+        """Test entries expire after the TTL and the LRU entry goes first when full"""
+        cache = AuthorCache(self.cache_file, ttl=100, max_size=2)
+        cache.put('a', {'link_karma': 1}, now=NOW)
+        cache.put('b', {'link_karma': 2}, now=NOW)
+        cache.get('a', now=NOW)
+        cache.put('c', {'link_karma': 3}, now=NOW)
+
+        self.assertEqual(cache.get('b', now=NOW), (False, None))
+        self.assertEqual(cache.get('a', now=NOW + 50), (True, {'link_karma': 1}))
+        self.assertEqual(cache.get('c', now=NOW + 100), (False, None))
+        self.assertEqual(cache.expired, 1)
+
+    def test_enrich_batches_lookups_and_reuses_cache(self):
+        """Test each author costs one batched lookup per TTL window, across runs"""
+        comments_df = pd.DataFrame({
+            'comment_id': ['c1', 'c2', 'c3', 'c4', 'c5'],
+            'author': ['alice', 'bob', 'alice', 'None', 'carol'],
+            'author_fullname': ['t2_alice', 't2_bob', 't2_alice', None, None],
+        })
+        reddit = self.make_reddit()
+
+        enricher = AuthorEnricher(reddit, AuthorCache(self.cache_file))
+        enriched_df = enricher.enrich(comments_df, now=NOW)
+        enricher.cache.save()
+
+        self.assertEqual(list(enriched_df['author_comment_karma'][:3]), [50, 50, 50])
+        self.assertEqual(list(enriched_df['author_account_age_days'][:2]), [10.0, 10.0])
+        self.assertTrue(pd.isna(enriched_df['author_link_karma'][3]))
+        self.assertEqual(enriched_df['author_link_karma'][4], 1)
+        reddit.redditors.partial_redditors.assert_called_once_with(['t2_alice', 't2_bob'])
+        reddit.redditor.assert_called_once_with('carol')
+        self.assertEqual(enricher.requests, 2)
+
+        # A later run with the persisted cache makes no requests
+        rerun = AuthorEnricher(reddit, AuthorCache(self.cache_file))
+        rerun.enrich(comments_df, now=NOW + 60)
+        self.assertEqual(rerun.requests, 0)
+        self.assertEqual(rerun.cache.hit_rate(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.comment_sampler import CommentSampler, TREE_FULL, TREE_SHALLOW
+from src.ingestion.reddit_scraper import scrape_subreddit
+
+class TestCommentSampler(unittest.TestCase):
+    """Test cases for sampled comment-tree fetching"""
+
+    def test_stratified_plan_samples_each_stratum(self):
+        """Test every comment-count stratum gets its share of full trees and weights add up"""
+        posts = [SimpleNamespace(id=f"p{i}", num_comments=i) for i in range(16)]
+        sampler = CommentSampler(fraction=0.25, strata=4, seed=1)
+
+        planned = sampler.plan(iter(posts))
+
+        self.assertEqual(planned, posts)
+        full = [post.id for post in posts if sampler.full_tree(post.id)]
+        self.assertEqual(len(full), 4)
+        self.assertEqual(sorted(sampler.design(post_id)['sample_stratum'] for post_id in full), [0, 1, 2, 3])
+        self.assertEqual(sampler.design(full[0])['sample_weight'], 4.0)
+        stats = sampler.stats()
+        self.assertEqual(stats['shallow_trees'], 12)
+        self.assertEqual(stats['weight_total'], 16.0)
+
+    def test_simple_random_plan_takes_at_least_one(self):
+        """Test a single stratum still gets one full tree however small the fraction"""
+        posts = [SimpleNamespace(id=f"p{i}", num_comments=0) for i in range(3)]
+        sampler = CommentSampler(fraction=0.1, strata=1, seed=1)
+        sampler.plan(posts)
+
+        weights = sorted(sampler.design(post.id)['sample_weight'] for post in posts)
+        self.assertEqual(weights, [0.0, 0.0, 3.0])
+        with self.assertRaises(ValueError):
+            CommentSampler(fraction=0)
+
+    @patch('time.sleep')
+    def test_scrape_subreddit_fetches_shallow_trees_for_unsampled_posts(self, mock_sleep):
+        """Test unsampled posts never expand "more" stubs and rows carry the sampling design"""
+        def make_post(post_id):
+            post = MagicMock()
+            post.id = post_id
+            post.title = post_id
+            post.selftext = ''
+            post.score = 1
+            post.num_comments = 2
+            post.created_utc = 1700000000.0
+            top_level = [MagicMock(id=f"{post_id}c1", created_utc=1700000100.0),
+                         MagicMock(id=f"{post_id}c2", created_utc=1700000200.0)]
+            post.comments.__iter__.side_effect = lambda: iter(top_level)
+            post.comments.list.return_value = top_level + [MagicMock(id=f"{post_id}c3", created_utc=1700000300.0)]
+            return post
+
+        posts = [make_post(f"p{i}") for i in range(4)]
+        mock_reddit = MagicMock()
+        mock_reddit.subreddit.return_value.top.return_value = iter(posts)
+        sampler = CommentSampler(fraction=0.5, strata=1, shallow_limit=1, seed=3)
+
+        posts_df, comments_df = scrape_subreddit('test_subreddit', 'day', 4, reddit=mock_reddit, sampler=sampler)
+
+        full = set(posts_df.loc[posts_df['comment_tree'] == TREE_FULL, 'id'])
+        self.assertEqual(len(full), 2)
+        for post in posts:
+            if post.id in full:
+                post.comments.replace_more.assert_called_once_with(limit=None)
+            else:
+                post.comments.replace_more.assert_called_once_with(limit=0)
+                self.assertEqual(post.comment_limit, 1)
+        self.assertEqual(len(comments_df), 2 * 3 + 2 * 1)
+        shallow_rows = comments_df[comments_df['comment_tree'] == TREE_SHALLOW]
+        self.assertTrue((shallow_rows['sample_weight'] == 0).all())
+        self.assertTrue((comments_df.loc[comments_df['comment_tree'] == TREE_FULL, 'sample_weight'] == 2.0).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.crawl_scheduler import ReviewCrawlScheduler
+
+NOW = datetime(2024, 3, 1)
+
+def make_fingerprints(entries):
+    fingerprints = MagicMock()
+    fingerprints.get.side_effect = entries.get
+    return fingerprints
+
+class TestReviewCrawlScheduler(unittest.TestCase):
+    """Test cases for the review crawl priority scheduler"""
+
+    def test_stale_products_first(self):
+        """Test products checked longer ago are crawled sooner"""
+        fingerprints = make_fingerprints({
+            'fresh': {'last_checked': (NOW - timedelta(days=1)).isoformat()},
+            'stale': {'last_checked': (NOW - timedelta(days=20)).isoformat()},
+        })
+        scheduler = ReviewCrawlScheduler(fingerprints=fingerprints, now=NOW)
+        self.assertEqual(scheduler.order(['fresh', 'stale']), ['stale', 'fresh'])
+
+    def test_velocity_and_yield_raise_priority(self):
+        """Test fast-growing, high-yield products outrank quiet ones"""
+        checked = (NOW - timedelta(days=5)).isoformat()
+        fingerprints = make_fingerprints({
+            'quiet': {'last_checked': checked, 'checks': 10, 'changes': 0},
+            'busy': {'last_checked': checked, 'checks': 10, 'changes': 9},
+            'trending': {'last_checked': checked, 'checks': 10, 'changes': 0},
+        })
+        scheduler = ReviewCrawlScheduler(
+            fingerprints=fingerprints, velocity={'trending': 2.0}, now=NOW
+        )
+        self.assertEqual(scheduler.order(['quiet', 'busy', 'trending']), ['trending', 'busy', 'quiet'])
+
+    def test_never_checked_products_are_stale(self):
+        """Test new products are treated as maximally stale"""
+        fingerprints = make_fingerprints({
+            'checked': {'last_checked': (NOW - timedelta(days=2)).isoformat()},
+        })
+        scheduler = ReviewCrawlScheduler(fingerprints=fingerprints, now=NOW)
+        self.assertEqual(scheduler.order(['checked', 'new']), ['new', 'checked'])
+
+    def test_order_drops_duplicates(self):
+        """Test each URL is scheduled once"""
+        scheduler = ReviewCrawlScheduler(now=NOW)
+        self.assertEqual(scheduler.order(['a', 'b', 'a']), ['a', 'b'])
+
+if __name__ == '__main__':
+    unittest.main()
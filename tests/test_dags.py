@@ -0,0 +1,65 @@
+import unittest
+import ast
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DAGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'airflow', 'dags')
+
+def dag_params(dag_file):
+    """Read the params literal passed to DAG() without importing Airflow"""
+    with open(os.path.join(DAGS_DIR, dag_file), 'r') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'DAG':
+            for keyword in node.keywords:
+                if keyword.arg == 'params':
+                    return ast.literal_eval(keyword.value)
+    return {}
+
+def dag_callables(dag_file):
+    """Names of the functions the DAG's operators call"""
+    with open(os.path.join(DAGS_DIR, dag_file), 'r') as f:
+        tree = ast.parse(f.read())
+    return {
+        keyword.value.id for node in ast.walk(tree) if isinstance(node, ast.Call)
+        for keyword in node.keywords if keyword.arg == 'python_callable'
+    }
+
+class TestDagDefaults(unittest.TestCase):
+    """Test cases for the default params of scheduled DAG runs"""
+
+    def test_reddit_defaults_are_opt_in(self):
+        """Test scheduled Reddit runs fetch every comment tree without extra author lookups"""
+        params = dag_params('reddit_scraper_dag.py')
+        self.assertIsNone(params['relevance_threshold'])
+        self.assertIsNone(params['comment_sample_fraction'])
+        self.assertFalse(params['enrich_authors'])
+
+    def test_reddit_fetches_skipped_comment_trees(self):
+        """Test posts the relevance filter skipped are fetched by a later task"""
+        self.assertEqual(dag_callables('reddit_scraper_dag.py'), {'scrape_reddit', 'fetch_skipped'})
+        self.assertEqual(dag_params('reddit_scraper_dag.py')['skipped_per_run'], 50)
+
+    def test_adore_defaults_crawl_every_due_product(self):
+        """Test scheduled Adore runs have no shard budget and use the weekly full crawl"""
+        params = dag_params('adore_scraper_dag.py')
+        self.assertIsNone(params['shard_time_budget'])
+        self.assertIsNone(params['shard_max_requests'])
+        self.assertFalse(params['full_crawl'])
+        self.assertEqual(params['full_crawl_days'], 7)
+
+    def test_adore_full_crawl_refreshes_snapshots(self):
+        """Test the full crawl pages through listings, which the sitemap can't snapshot"""
+        with open(os.path.join(DAGS_DIR, 'adore_scraper_dag.py'), 'r') as f:
+            tree = ast.parse(f.read())
+        use_sitemap = [
+            ast.literal_eval(keyword.value) for node in ast.walk(tree) if isinstance(node, ast.Call)
+            for keyword in node.keywords if keyword.arg == 'use_sitemap'
+        ]
+        self.assertEqual(use_sitemap, [False])
+
+if __name__ == '__main__':
+    unittest.main()
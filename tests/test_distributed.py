@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+import tempfile
+import json
+from datetime import datetime
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.distributed import (
+    get_worker_dir, merge_adore, open_shared_ledger, report_progress, seed_adore
+)
+from src.ingestion.review_shards import PRODUCT_SOURCE
+
+class TestDistributed(unittest.TestCase):
+    """Test cases for multi-host work distribution"""
+
+    def test_shared_ledger_avoids_wal(self):
+        """Test the shared ledger uses a rollback journal that works on network filesystems"""
+        with tempfile.TemporaryDirectory() as shared_dir:
+            ledger = open_shared_ledger(shared_dir)
+            mode = ledger.conn.execute("PRAGMA journal_mode").fetchone()[0]
+            ledger.close()
+            self.assertEqual(mode, 'delete')
+
+    def test_seed_claim_and_report(self):
+        """Test seeding is idempotent and progress reports per-worker leases"""
+        with tempfile.TemporaryDirectory() as shared_dir:
+            url_file = os.path.join(shared_dir, "urls.txt")
+            with open(url_file, 'w') as f:
+                f.write("https://example.com/p/a.html\nhttps://example.com/p/b.html\n")
+
+            self.assertEqual(seed_adore(shared_dir, url_file), 2)
+            self.assertEqual(seed_adore(shared_dir, url_file), 0)
+
+            host1 = open_shared_ledger(shared_dir)
+            host2 = open_shared_ledger(shared_dir)
+            url = host1.claim(PRODUCT_SOURCE, 'host1')[0]
+            host1.complete(PRODUCT_SOURCE, url)
+            host2.claim(PRODUCT_SOURCE, 'host2')
+            host1.close()
+            host2.close()
+
+            report = report_progress(shared_dir)[PRODUCT_SOURCE]
+            self.assertEqual(report['counts'], {'done': 1, 'leased': 1})
+            self.assertEqual(report['workers'], {'host2': 1})
+
+    def test_seed_adore_claims_in_scheduler_order(self):
+        """Test seeded URLs are claimed by crawl priority rather than file order"""
+        with tempfile.TemporaryDirectory() as shared_dir:
+            url_file = os.path.join(shared_dir, "urls.txt")
+            with open(url_file, 'w') as f:
+                f.write("https://example.com/p/fresh.html\nhttps://example.com/p/new.html\n")
+            fingerprint_file = os.path.join(shared_dir, "fingerprints.json")
+            with open(fingerprint_file, 'w') as f:
+                json.dump({'https://example.com/p/fresh.html': {
+                    'last_checked': datetime.now().isoformat(), 'checks': 4, 'changes': 0
+                }}, f)
+
+            seed_adore(shared_dir, url_file, fingerprint_file=fingerprint_file)
+
+            ledger = open_shared_ledger(shared_dir)
+            claimed = ledger.claim(PRODUCT_SOURCE, 'host1', limit=2)
+            ledger.close()
+            self.assertEqual(claimed, ['https://example.com/p/new.html', 'https://example.com/p/fresh.html'])
+
+    def test_merge_worker_partitions(self):
+        """Test reviews from every worker partition are merged and deduplicated"""
+        with tempfile.TemporaryDirectory() as shared_dir:
+            for worker_id, review_ids in [('host1', ['a', 'b']), ('host2:1', ['b', 'c'])]:
+                worker_dir = get_worker_dir(shared_dir, 'adore', worker_id)
+                pd.DataFrame({'review_id': review_ids}).to_csv(os.path.join(worker_dir, "reviews.csv"), index=False)
+
+            output_file = os.path.join(shared_dir, "reviews.csv")
+            merged = merge_adore(shared_dir, output_file, merge_history=False)
+            self.assertEqual(sorted(merged['review_id']), ['a', 'b', 'c'])
+
+if __name__ == '__main__':
+    unittest.main()
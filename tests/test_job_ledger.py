@@ -0,0 +1,137 @@
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.job_ledger import JobLedger, SCHEMA
+
+class TestJobLedger(unittest.TestCase):
+    """Test cases for the SQLite job ledger"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.temp_dir.name, "jobs.db")
+        self.ledger = JobLedger(self.db_file, lease_seconds=60, max_attempts=2, backoff_base=10)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.temp_dir.cleanup()
+
+    def test_add_is_idempotent(self):
+        """Test re-adding existing units doesn't reset them"""
+        self.assertEqual(self.ledger.add('reddit_month', ['2024-01', '2024-02']), 2)
+        self.ledger.claim('reddit_month', 'w1')
+        self.assertEqual(self.ledger.add('reddit_month', ['2024-01', '2024-02', '2024-03']), 1)
+        self.assertEqual(self.ledger.status('reddit_month', '2024-01'), 'leased')
+
+    def test_claims_are_exclusive_and_ordered(self):
+        """Test two workers on the same file never claim the same unit"""
+        self.ledger.add('reddit_month', ['2024-01', '2024-02', '2024-03'])
+        other = JobLedger(self.db_file)
+        try:
+            self.assertEqual(self.ledger.claim('reddit_month', 'w1', limit=2), ['2024-01', '2024-02'])
+            self.assertEqual(other.claim('reddit_month', 'w2', limit=2), ['2024-03'])
+            self.assertEqual(other.claim('reddit_month', 'w2'), [])
+        finally:
+            other.close()
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test a unit whose worker died becomes claimable after its lease"""
+        self.ledger.add('adore_product', ['https://example.com/p/a.html'])
+        self.ledger.claim('adore_product', 'w1')
+        self.assertEqual(self.ledger.claim('adore_product', 'w2'), [])
+
+        later = time.time() + 61
+        self.assertEqual(self.ledger.claim('adore_product', 'w2', now=later), ['https://example.com/p/a.html'])
+
+    def test_taken_over_lease_cannot_be_completed(self):
+        """Test a worker whose expired lease was reclaimed can't renew, fail or complete it"""
+        self.ledger.add('reddit_month', ['2024-01'])
+        self.ledger.claim('reddit_month', 'w1')
+        self.assertTrue(self.ledger.renew('reddit_month', '2024-01', 'w1'))
+
+        later = time.time() + 61
+        self.assertEqual(self.ledger.claim('reddit_month', 'w2', now=later), ['2024-01'])
+        self.assertFalse(self.ledger.renew('reddit_month', '2024-01', 'w1'))
+        self.assertFalse(self.ledger.complete('reddit_month', '2024-01', result={'posts': 1}, worker_id='w1'))
+        self.assertIsNone(self.ledger.fail('reddit_month', '2024-01', worker_id='w1'))
+        self.assertEqual(self.ledger.status('reddit_month', '2024-01'), 'leased')
+
+        self.assertTrue(self.ledger.complete('reddit_month', '2024-01', result={'posts': 2}, worker_id='w2'))
+        self.assertEqual(self.ledger.result('reddit_month', '2024-01'), {'posts': 2})
+
+    def test_start_respects_other_workers_leases(self):
+        """Test start only takes over a unit whose lease has expired"""
+        self.ledger.add('adore_listing', ['skin-care:1'])
+        self.assertTrue(self.ledger.start('adore_listing', 'skin-care:1', 'w1'))
+        self.assertTrue(self.ledger.start('adore_listing', 'skin-care:1', 'w1'))
+        self.assertFalse(self.ledger.start('adore_listing', 'skin-care:1', 'w2'))
+
+        # A lease that has already run out can be taken over
+        expiring = JobLedger(self.db_file, lease_seconds=0)
+        try:
+            self.assertTrue(expiring.start('adore_listing', 'skin-care:1', 'w1'))
+        finally:
+            expiring.close()
+        self.assertTrue(self.ledger.start('adore_listing', 'skin-care:1', 'w2'))
+
+        self.ledger.complete('adore_listing', 'skin-care:1', worker_id='w2')
+        self.assertFalse(self.ledger.start('adore_listing', 'skin-care:1', 'w2'))
+
+    def test_fail_backs_off_then_gives_up(self):
+        """Test failures are retried after a backoff until max_attempts"""
+        self.ledger.add('adore_product', ['a'])
+        now = time.time()
+        self.ledger.claim('adore_product', now=now)
+        self.assertEqual(self.ledger.fail('adore_product', 'a', error="timeout", now=now), 'pending')
+
+        self.assertEqual(self.ledger.claim('adore_product', now=now + 5), [])
+        self.assertEqual(self.ledger.claim('adore_product', now=now + 11), ['a'])
+        self.assertEqual(self.ledger.fail('adore_product', 'a', now=now + 11), 'failed')
+        self.assertEqual(self.ledger.claim('adore_product', now=now + 10000), [])
+
+        self.assertEqual(self.ledger.reset('adore_product'), 1)
+        self.assertEqual(self.ledger.claim('adore_product'), ['a'])
+
+    def test_claims_follow_priority(self):
+        """Test higher priorities are claimed first and re-adding reprioritises pending items"""
+        self.ledger.add('adore_product', ['a', 'b', 'c'], priorities={'b': 2.0, 'c': 1.0})
+        self.assertEqual(self.ledger.claim('adore_product', limit=2), ['b', 'c'])
+
+        self.ledger.add('adore_product', ['d'], priorities={'d': 0.5})
+        self.ledger.add('adore_product', ['a', 'b'], priorities={'a': 3.0, 'b': 0.0})
+        self.assertEqual(self.ledger.claim('adore_product', limit=2), ['a', 'd'])
+
+    def test_old_ledger_gains_priority_column(self):
+        """Test a ledger file from before priorities still opens and claims in order"""
+        self.ledger.close()
+        db_file = os.path.join(self.temp_dir.name, "old.db")
+        conn = sqlite3.connect(db_file)
+        conn.executescript(SCHEMA.replace("    priority REAL NOT NULL DEFAULT 0,\n", ""))
+        conn.execute("INSERT INTO jobs (source, unit) VALUES ('adore_product', 'a')")
+        conn.commit()
+        conn.close()
+
+        self.ledger = JobLedger(db_file)
+        self.ledger.add('adore_product', ['b'], priorities={'b': 1.0})
+        self.assertEqual(self.ledger.claim('adore_product', limit=2), ['b', 'a'])
+
+    def test_results_progress_and_partitions(self):
+        """Test completed results are stored and partitions claim separately"""
+        self.ledger.add('adore_product', ['a', 'b'], partition='shard_000')
+        self.ledger.add('adore_product', ['c'], partition='shard_001')
+
+        self.assertEqual(self.ledger.claim('adore_product', partition='shard_001'), ['c'])
+        self.ledger.complete('adore_product', 'c', result={'reviews': 3})
+
+        self.assertTrue(self.ledger.is_done('adore_product', 'c'))
+        self.assertEqual(self.ledger.result('adore_product', 'c'), {'reviews': 3})
+        self.assertEqual(self.ledger.units('adore_product', status='done'), ['c'])
+        self.assertEqual(self.ledger.progress(), {'adore_product': {'done': 1, 'pending': 2}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.parse_pipeline import FetchParsePipeline
+from src.ingestion.adore_parsers import parse_product_html
+
+PRODUCT_HTML = (
+    '<html><script type="application/ld+json" id="product_structured_data">'
+    '{"sku": "SKU1", "name": "Cream", "brand": {"name": "Brand"}, '
+    '"aggregateRating": {"reviewCount": "1"}, '
+    '"review": [{"author": {"name": "A"}, "name": "Great", "reviewBody": "Loved it", '
+    '"reviewRating": {"ratingValue": "5"}, "datePublished": "2024-01-01"}]}'
+    '</script></html>'
+)
+
+class TestFetchParsePipeline(unittest.TestCase):
+    """Test cases for the fetch/parse pipeline"""
+
+    def test_results_handled_in_order(self):
+        """Test every fetched item is parsed in a worker process and handled"""
+        results = []
+        pipeline = FetchParsePipeline(
+            fetch=lambda item: (item * 10, ('x' * item,)),
+            parse=len,
+            handle=lambda item, context, result: results.append((item, context, result)),
+            fetch_workers=1,
+            parse_workers=2
+        )
+        handled = pipeline.run(range(1, 6))
+
+        self.assertEqual(handled, 5)
+        self.assertEqual(results, [(i, i * 10, i) for i in range(1, 6)])
+
+    def test_failed_fetch_and_skipped_parse(self):
+        """Test failed fetches and pages without parse arguments reach the handler"""
+        def fetch(item):
+            if item == 'bad':
+                raise ValueError("boom")
+            if item == 'cached':
+                return 'not modified', None
+            return 'ok', ('abc',)
+
+        results = {}
+        def handle(item, context, result):
+            results[item] = (context, result)
+
+        FetchParsePipeline(fetch, len, handle, fetch_workers=2, parse_workers=1).run(['bad', 'cached', 'page'])
+
+        self.assertEqual(results['bad'], (None, None))
+        self.assertEqual(results['cached'], ('not modified', None))
+        self.assertEqual(results['page'], ('ok', 3))
+
+    def test_handler_stops_fetching(self):
+        """Test returning False from the handler stops further fetches"""
+        fetched = []
+        def fetch(item):
+            fetched.append(item)
+            return item, ('',)
+
+        FetchParsePipeline(fetch, len, lambda item, context, result: False,
+                           fetch_workers=1, parse_workers=1, queue_size=1).run(range(1000))
+
+        self.assertLess(len(fetched), 1000)
+
+    def test_parse_product_html(self):
+        """Test product pages parse into reviews and skip unchanged data"""
+        parsed = parse_product_html(PRODUCT_HTML)
+        self.assertFalse(parsed['data_unchanged'])
+        self.assertEqual(parsed['review_count'], 1)
+        self.assertEqual(parsed['reviews'][0]['product_sku'], 'SKU1')
+
+        unchanged = parse_product_html(PRODUCT_HTML, known_data_hash=parsed['data_hash'])
+        self.assertTrue(unchanged['data_unchanged'])
+        self.assertNotIn('reviews', unchanged)
+
+        self.assertIsNone(parse_product_html('<html></html>'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.proxy_pool import ProxyPool
+
+class TestProxyPool(unittest.TestCase):
+    """Test cases for the health-scored proxy pool"""
+
+    def make_pool(self, proxies, **kwargs):
+        pool = ProxyPool(**kwargs)
+        pool.add_candidates(proxies)
+        for proxy in proxies:
+            pool.record_success(proxy, 0.2)
+        return pool
+
+    def test_get_returns_active_proxy(self):
+        """Test selection only returns active proxies"""
+        pool = self.make_pool(['1.1.1.1:80', '2.2.2.2:80'])
+        for _ in range(20):
+            self.assertIn(pool.get(), ['1.1.1.1:80', '2.2.2.2:80'])
+
+    def test_get_empty_pool(self):
+        """Test an empty pool returns None"""
+        self.assertIsNone(ProxyPool().get())
+
+    def test_weight_prefers_fast_reliable_proxies(self):
+        """Test fast, reliable proxies score higher than slow, flaky ones"""
+        pool = ProxyPool()
+        fast = {'latency': 0.2, 'successes': 10, 'failures': 0}
+        slow = {'latency': 3.0, 'successes': 5, 'failures': 5}
+        self.assertGreater(pool.weight(fast), pool.weight(slow))
+
+    def test_circuit_opens_and_recovers(self):
+        """Test consecutive failures bench a proxy until its cooldown passes"""
+        pool = self.make_pool(['1.1.1.1:80'], max_consecutive_failures=2, min_samples=100)
+        pool.record_failure('1.1.1.1:80')
+        pool.record_failure('1.1.1.1:80')
+        self.assertIsNone(pool.get())
+        self.assertEqual(pool.summary(), {'open': 1})
+
+        # Expire the cooldown and the proxy comes back half-open
+        pool.cooling = [(0, proxy) for _, proxy in pool.cooling]
+        self.assertEqual(pool.get(), '1.1.1.1:80')
+
+        # One failure while half-open re-opens the circuit
+        pool.record_failure('1.1.1.1:80')
+        self.assertIsNone(pool.get())
+
+    def test_low_success_rate_evicts(self):
+        """Test proxies with a poor success rate are evicted"""
+        pool = self.make_pool(['1.1.1.1:80'], min_samples=3, min_success_rate=0.5)
+        pool.record_failure('1.1.1.1:80')
+        pool.record_failure('1.1.1.1:80')
+        self.assertIn('1.1.1.1:80', pool.evicted)
+        self.assertIsNone(pool.get())
+
+    @patch('src.ingestion.proxy_pool.requests.get')
+    def test_background_validation(self, mock_get):
+        """Test candidates are validated before entering the pool"""
+        def fake_get(url, proxies, timeout):
+            if '2.2.2.2' in proxies['http']:
+                raise Exception("Connection refused")
+            return MagicMock()
+
+        mock_get.side_effect = fake_get
+        pool = ProxyPool()
+        pool.validate_in_background(['1.1.1.1:80', '2.2.2.2:80'])
+        pool.validation_thread.join()
+
+        self.assertEqual(pool.active, ['1.1.1.1:80'])
+        self.assertIn('2.2.2.2:80', pool.evicted)
+
+if __name__ == '__main__':
+    unittest.main()
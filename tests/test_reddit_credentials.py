@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+import sys
+import os
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.reddit_credentials import CredentialPool, RateLimitedRequestor
+from src.ingestion.reddit_scraper import scrape_multiple_subreddits
+
+CREDENTIALS = [
+    {'name': 'a', 'client_id': 'id_a', 'client_secret': 'secret_a', 'user_agent': 'agent_a'},
+    {'name': 'b', 'client_id': 'id_b', 'client_secret': 'secret_b', 'user_agent': 'agent_b'},
+]
+
+class TestCredentialPool(unittest.TestCase):
+    """Test cases for the Reddit credential pool"""
+
+    def test_requires_credentials(self):
+        """Test an empty credential list is rejected"""
+        with self.assertRaises(ValueError):
+            CredentialPool(credentials=[])
+
+    def test_assign_spreads_units_evenly(self):
+        """Test units are dealt out across credentials"""
+        pool = CredentialPool(credentials=CREDENTIALS)
+        assignment = pool.assign(['s1', 's2', 's3', 's4'])
+        self.assertEqual(assignment, {'a': ['s1', 's3'], 'b': ['s2', 's4']})
+        self.assertIs(pool.credential_for('s1'), pool.credential_for('s1'))
+
+    @patch('src.ingestion.reddit_credentials.praw.Reddit')
+    def test_clients_are_pooled_per_credential(self, mock_reddit):
+        """Test released clients are reused and each uses the rate-limited requestor"""
+        mock_reddit.side_effect = lambda **kwargs: MagicMock()
+        pool = CredentialPool(credentials=CREDENTIALS)
+
+        with pool.client(credential='a') as first:
+            pass
+        with pool.client(credential='a') as second:
+            self.assertEqual(pool.usage()['a']['in_use'], 1)
+        self.assertIs(first, second)
+        self.assertEqual(pool.usage()['a']['clients'], 1)
+
+        kwargs = mock_reddit.call_args.kwargs
+        self.assertEqual(kwargs['client_id'], 'id_a')
+        self.assertIs(kwargs['requestor_class'], RateLimitedRequestor)
+        self.assertIs(kwargs['requestor_kwargs']['credential'], pool.get('a'))
+
+    @patch('prawcore.Requestor.request')
+    def test_requestor_records_usage(self, mock_request):
+        """Test every request is paced and counted against its credential"""
+        pool = CredentialPool(credentials=CREDENTIALS, requests_per_minute=6000)
+        credential = pool.get('b')
+        mock_request.return_value = MagicMock(status_code=429, headers={'x-ratelimit-remaining': '12.0'})
+
+        requestor = RateLimitedRequestor(user_agent='agent_b', credential=credential)
+        requestor.request('GET', 'https://oauth.reddit.com/api/v1/me')
+
+        usage = pool.usage()['b']
+        self.assertEqual(usage['requests'], 1)
+        self.assertEqual(usage['throttled'], 1)
+        self.assertEqual(usage['errors'], 1)
+        self.assertEqual(usage['ratelimit_remaining'], 12.0)
+        self.assertEqual(pool.usage()['a']['requests'], 0)
+
+    @patch('src.ingestion.reddit_credentials.praw.Reddit')
+    @patch('src.ingestion.reddit_scraper.scrape_subreddit')
+    def test_scrape_multiple_subreddits_with_pool(self, mock_scrape_subreddit, mock_reddit):
+        """Test subreddits are scraped with clients from different credentials"""
+        mock_reddit.side_effect = lambda **kwargs: MagicMock(client_id=kwargs['client_id'])
+        used = {}
+
+        def mock_scrape(subreddit, time_period, limit, reddit=None):
+            used[subreddit] = reddit.client_id
+            return pd.DataFrame({'id': [subreddit]}), pd.DataFrame({'comment_id': [f"{subreddit}_c"]})
+
+        mock_scrape_subreddit.side_effect = mock_scrape
+        pool = CredentialPool(credentials=CREDENTIALS)
+
+        posts, comments = scrape_multiple_subreddits(['s1', 's2'], 'day', 1, credential_pool=pool)
+
+        self.assertEqual(list(posts['subreddit']), ['s1', 's2'])
+        self.assertEqual(len(comments), 2)
+        self.assertEqual(used, {'s1': 'id_a', 's2': 'id_b'})
+
+    @patch('src.ingestion.reddit_credentials.praw.Reddit')
+    @patch('src.ingestion.reddit_scraper.scrape_subreddit')
+    def test_each_credential_scrapes_its_subreddits_in_turn(self, mock_scrape_subreddit, mock_reddit):
+        """Test no two subreddits run on one credential at once, and a failure doesn't stop the rest"""
+        mock_reddit.side_effect = lambda **kwargs: MagicMock(client_id=kwargs['client_id'])
+        lock = threading.Lock()
+        running = {}
+        overlaps = []
+
+        def mock_scrape(subreddit, time_period, limit, reddit=None):
+            with lock:
+                running[reddit.client_id] = running.get(reddit.client_id, 0) + 1
+                if running[reddit.client_id] > 1:
+                    overlaps.append(subreddit)
+            time.sleep(0.02)
+            with lock:
+                running[reddit.client_id] -= 1
+            if subreddit == 's1':
+                raise RuntimeError("listing failed")
+            return pd.DataFrame({'id': [subreddit]}), pd.DataFrame({'comment_id': [f"{subreddit}_c"]})
+
+        mock_scrape_subreddit.side_effect = mock_scrape
+        pool = CredentialPool(credentials=CREDENTIALS)
+
+        posts, comments = scrape_multiple_subreddits(['s1', 's2', 's3', 's4'], 'day', 1, credential_pool=pool)
+
+        self.assertEqual(overlaps, [])
+        self.assertEqual(list(posts['subreddit']), ['s2', 's3', 's4'])
+        self.assertEqual(mock_scrape_subreddit.call_count, 4)
+
+if __name__ == '__main__':
+    unittest.main()
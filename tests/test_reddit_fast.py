@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import MagicMock
+import json
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.reddit_fast import expand_more, parse_thread, scrape_subreddit_fast
+from src.ingestion.benchmark_reddit import benchmark_threads
+
+def comment(comment_id, parent_id, replies=(), author='someone'):
+    return {'kind': 't1', 'data': {
+        'id': comment_id, 'name': f"t1_{comment_id}", 'parent_id': parent_id, 'link_id': 't3_p1',
+        'subreddit': 'AsianBeauty', 'body': f"body {comment_id}", 'score': 2,
+        'created_utc': 1700000100.0, 'author': author, 'author_fullname': f"t2_{author}",
+        'author_flair_text': 'Oily skin',
+        'replies': {'kind': 'Listing', 'data': {'children': list(replies), 'after': None}} if replies else '',
+    }}
+
+def make_thread(post_id='p1', comments=(), more_ids=None):
+    """A /comments/<id> response as Reddit returns it"""
+    post = {'kind': 't3', 'data': {
+        'id': post_id, 'name': f"t3_{post_id}", 'subreddit': 'AsianBeauty', 'title': 'Sunscreen',
+        'selftext': 'Which one?', 'score': 42, 'created_utc': 1700000000.0, 'num_comments': 4,
+        'author': 'op', 'permalink': f"/r/AsianBeauty/comments/{post_id}/sunscreen/",
+    }}
+    children = list(comments)
+    if more_ids:
+        children.append({'kind': 'more', 'data': {
+            'id': more_ids[0], 'name': f"t1_{more_ids[0]}", 'parent_id': f"t3_{post_id}",
+            'count': len(more_ids), 'depth': 0, 'children': list(more_ids),
+        }})
+    return [
+        {'kind': 'Listing', 'data': {'children': [post], 'after': None}},
+        {'kind': 'Listing', 'data': {'children': children, 'after': None}},
+    ]
+
+class TestRedditFastPath(unittest.TestCase):
+    """Test cases for the raw-JSON Reddit fast path"""
+
+    def setUp(self):
+        self.thread = make_thread(comments=[
+            comment('c1', 't3_p1', replies=[comment('c3', 't1_c1', author='[deleted]')]),
+            comment('c2', 't3_p1'),
+        ], more_ids=['c4', 'c5'])
+
+    def test_parse_thread_matches_scraper_layout(self):
+        """Test rows use scrape_subreddit's columns, breadth-first order and author handling"""
+        post, comments, more = parse_thread(self.thread)
+
+        self.assertEqual(set(post), {'id', 'title', 'body', 'score', 'created_utc', 'num_comments'})
+        self.assertEqual(post['body'], 'Which one?')
+        self.assertEqual([c['comment_id'] for c in comments], ['c1', 'c2', 'c3'])
+        self.assertEqual(set(comments[0]), {'comment_id', 'post_id', 'body', 'score', 'created_utc', 'author',
+                                            'author_fullname', 'author_flair'})
+        self.assertEqual(comments[2]['author'], 'None')
+        self.assertEqual(more[0]['children'], ['c4', 'c5'])
+
+    def test_expand_more_uses_morechildren(self):
+        """Test collapsed comments are fetched in one morechildren request"""
+        client = MagicMock()
+        client.get_json.return_value = {'json': {'data': {'things': [
+            comment('c4', 't3_p1'), comment('c5', 't1_c4'),
+        ]}}}
+
+        comments = expand_more(client, 'p1', parse_thread(self.thread)[2])
+
+        self.assertEqual([c['comment_id'] for c in comments], ['c4', 'c5'])
+        path, params = client.get_json.call_args.args
+        self.assertEqual(path, '/api/morechildren')
+        self.assertEqual(params['children'], 'c4,c5')
+
+    def test_scrape_subreddit_fast(self):
+        """Test listing pages are followed and each thread's comments are collected"""
+        listings = {
+            None: {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': {'id': 'p1'}}], 'after': 't3_p1'}},
+            't3_p1': {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': {'id': 'p2'}}], 'after': None}},
+        }
+        def get_json(path, params=None):
+            if path == '/r/AsianBeauty/top':
+                return listings[params.get('after')]
+            post_id = path.rsplit('/', 1)[1]
+            return make_thread(post_id, comments=[comment(f"{post_id}c", f"t3_{post_id}")])
+        client = MagicMock()
+        client.get_json.side_effect = get_json
+
+        posts_df, comments_df = scrape_subreddit_fast('AsianBeauty', 'day', limit=10, client=client)
+
+        self.assertEqual(list(posts_df['id']), ['p1', 'p2'])
+        self.assertEqual(list(comments_df['comment_id']), ['p1c', 'p2c'])
+
+    def test_benchmark_rows_match_praw(self):
+        """Test the fast path produces exactly the rows the praw path does on recorded threads"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'p1.json')
+            with open(path, 'w') as f:
+                json.dump(self.thread, f)
+
+            result = benchmark_threads([path], repeat=1)
+
+        self.assertEqual(result['threads'], 1)
+        self.assertEqual(result['comments'], 3)
+        self.assertEqual(result['mismatches'], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import MagicMock
+from types import SimpleNamespace
+import os
+import sys
+import tempfile
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.reddit_refresh import fetch_info, load_recent_items, refresh_scores
+
+class TestRedditRefresh(unittest.TestCase):
+    """Test cases for the batched Reddit score refresh"""
+
+    def make_reddit(self, scores):
+        """Fake client whose info() returns the given {fullname: (score, num_comments)}"""
+        reddit = MagicMock()
+        def info(fullnames):
+            return [
+                SimpleNamespace(fullname=fullname, score=scores[fullname][0], num_comments=scores[fullname][1])
+                for fullname in fullnames if fullname in scores
+            ]
+        reddit.info.side_effect = info
+        return reddit
+
+    def test_fetch_info_batches_fullnames(self):
+        """Test fullnames are looked up 100 per request"""
+        fullnames = [f"t1_c{i}" for i in range(250)]
+        reddit = self.make_reddit({fullname: (1, None) for fullname in fullnames})
+
+        items = list(fetch_info(reddit, fullnames))
+
+        self.assertEqual(len(items), 250)
+        self.assertEqual([len(call.kwargs['fullnames']) for call in reddit.info.call_args_list], [100, 100, 50])
+
+    def test_refresh_writes_only_changes(self):
+        """Test only changed scores are written and remembered for the next refresh"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pd.DataFrame({'id': ['p1', 'p2'], 'score': [10, 20], 'num_comments': [1, 2]}).to_csv(
+                os.path.join(temp_dir, "reddit_posts_2024-01.csv"), index=False)
+            pd.DataFrame({'comment_id': ['c1'], 'post_id': ['p1'], 'score': [3]}).to_csv(
+                os.path.join(temp_dir, "reddit_comments_2024-01.csv"), index=False)
+            self.assertEqual(len(load_recent_items([temp_dir], days=1)), 3)
+
+            state_file = os.path.join(temp_dir, "state.json")
+            reddit = self.make_reddit({'t3_p1': (15, 1), 't3_p2': (20, 2), 't1_c1': (3, None)})
+            changes = refresh_scores(reddit, days=1, directories=[temp_dir],
+                                     state_file=state_file, output_dir=temp_dir)
+
+            self.assertEqual(list(changes['fullname']), ['t3_p1'])
+            self.assertEqual(changes.iloc[0]['previous_score'], 10)
+            self.assertEqual(len([f for f in os.listdir(temp_dir) if f.startswith('reddit_score_updates_')]), 1)
+
+            # Nothing changed since the last refresh
+            changes = refresh_scores(reddit, days=1, directories=[temp_dir],
+                                     state_file=state_file, output_dir=temp_dir)
+            self.assertTrue(changes.empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,9 @@ import os
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.ingestion.reddit_scraper import scrape_subreddit, initialize_reddit, scrape_multiple_subreddits
+from src.ingestion.reddit_scraper import (
+    scrape_subreddit, initialize_reddit, scrape_multiple_subreddits, scrape_subreddit_window
+)
 
 class TestRedditScraper(unittest.TestCase):
     """Test cases for the Reddit scraper functions"""
@@ -256,5 +258,52 @@ class TestRedditScraper(unittest.TestCase):
         self.assertEqual(combined_posts.iloc[0]['subreddit'], 'subreddit2')
         self.assertEqual(combined_comments.iloc[0]['subreddit'], 'subreddit2')
 
+    @patch('src.ingestion.reddit_scraper.time.sleep')
+    def test_scrape_subreddit_window_stops_at_window_start(self, mock_sleep):
+        """Test out-of-window posts never fetch comments and paging stops past the window start"""
+        window_start = datetime(2021, 1, 1)
+        window_end = datetime(2021, 2, 1)
+        
+        def make_post(post_id, created):
+            post = MagicMock()
+            post.id = post_id
+            post.title = post_id
+            post.selftext = ''
+            post.score = 1
+            post.num_comments = 0
+            post.created_utc = created.timestamp()
+            post.comments.list.return_value = []
+            return post
+        
+        posts = [make_post('newer', datetime(2021, 2, 3)), make_post('in1', datetime(2021, 1, 20)),
+                 make_post('in2', datetime(2021, 1, 2))]
+        posts += [make_post(f"old{i}", datetime(2020, 12, 20)) for i in range(10)]
+        listed = []
+        def new_listing(limit=None):
+            for post in posts:
+                listed.append(post.id)
+                yield post
+        
+        mock_reddit = MagicMock()
+        mock_reddit.subreddit.return_value.new.side_effect = new_listing
+        stats = {}
+        
+        posts_df, comments_df = scrape_subreddit_window('test_subreddit', window_start, window_end,
+                                                        reddit=mock_reddit, stats=stats)
+        
+        self.assertEqual(list(posts_df['id']), ['in1', 'in2'])
+        posts[0].comments.replace_more.assert_not_called()
+        posts[3].comments.replace_more.assert_not_called()
+        self.assertEqual(len(listed), 3 + 5)
+        self.assertTrue(stats['reached_start'])
+        self.assertFalse(stats['limit_reached'])
+        
+        # An error raised by on_post (such as a lost lease) stops the scrape
+        def on_post(row):
+            raise RuntimeError(f"stopped after {row['id']}")
+        
+        with self.assertRaisesRegex(RuntimeError, 'stopped after in1'):
+            scrape_subreddit_window('test_subreddit', window_start, window_end, reddit=mock_reddit, on_post=on_post)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.reddit_search import CatalogSearch, build_queries
+from src.ingestion.job_ledger import JobLedger
+
+def make_post(post_id, title):
+    post = MagicMock()
+    post.id = post_id
+    post.title = title
+    post.selftext = ''
+    post.score = 5
+    post.created_utc = 1609459200
+    post.num_comments = 1
+    post.comments.list.return_value = [
+        SimpleNamespace(id=f"{post_id}c", body='love it', score=1, created_utc=1609459260, author='user1')
+    ]
+    return post
+
+class TestCatalogSearch(unittest.TestCase):
+    """Test cases for product-targeted Reddit search"""
+
+    def test_build_queries_packs_terms_within_limit(self):
+        """Test terms are OR-ed together without exceeding the query length"""
+        terms = [f"product name {i}" for i in range(100)]
+
+        queries = build_queries(terms, max_length=120)
+
+        self.assertTrue(all(len(query) <= 120 for query in queries))
+        self.assertLess(len(queries), len(terms))
+        packed = [term for query in queries for term in query.split(' OR ')]
+        self.assertEqual(packed, [f'"{term}"' for term in terms])
+
+    @patch('src.ingestion.reddit_search.time.sleep')
+    def test_search_dedupes_hits_and_skips_fetched_posts(self, mock_sleep):
+        """Test a post hit by several queries or runs has its comments fetched once"""
+        snail = make_post('p1', 'COSRX snail mucin essence vs propolis ampoule')
+        sunscreen = make_post('p2', 'Beauty of Joseon relief sun review')
+        results = {
+            '"snail mucin essence" OR "propolis ampoule"': [snail],
+            '"relief sun"': [snail, sunscreen],
+        }
+        reddit = MagicMock()
+        reddit.subreddit.return_value.search.side_effect = lambda query, **kwargs: results[query]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ledger = JobLedger(os.path.join(temp_dir, 'jobs.db'))
+            search = CatalogSearch(['snail mucin essence', 'propolis ampoule', 'relief sun'],
+                                   reddit=reddit, ledger=ledger, max_query_length=50)
+
+            posts_df, comments_df = search.search(['AsianBeauty'])
+            rerun_posts_df, _ = CatalogSearch(['snail mucin essence', 'propolis ampoule', 'relief sun'],
+                                              reddit=reddit, ledger=ledger, max_query_length=50).search(['AsianBeauty'])
+            ledger.close()
+
+        self.assertEqual(search.queries, list(results))
+        self.assertEqual(list(posts_df['id']), ['p1', 'p2'])
+        self.assertEqual(posts_df.iloc[0]['matched_terms'], 'propolis ampoule|snail mucin essence')
+        self.assertEqual(list(comments_df['post_id']), ['p1', 'p2'])
+        self.assertEqual(snail.comments.replace_more.call_count, 1)
+        self.assertTrue(rerun_posts_df.empty)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+import os
+import sys
+import tempfile
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.relevance_filter import (
+    SKIPPED_COMMENTS_SOURCE, RelevanceFilter, load_vocabulary, product_phrase
+)
+from src.ingestion.job_ledger import JobLedger
+from src.ingestion.reddit_scraper import fetch_skipped_comments, scrape_subreddit
+
+def make_post(post_id, title, selftext='', flair=None):
+    post = MagicMock()
+    post.id = post_id
+    post.title = title
+    post.selftext = selftext
+    post.link_flair_text = flair
+    post.score = 10
+    post.created_utc = 1609459200
+    post.num_comments = 1
+    comment = SimpleNamespace(id=f"{post_id}c", body='nice', score=1, created_utc=1609459260, author='user1')
+    post.comments.list.return_value = [comment]
+    return post
+
+class TestRelevanceFilter(unittest.TestCase):
+    """Test cases for the Reddit relevance pre-filter"""
+
+    def setUp(self):
+        self.relevance_filter = RelevanceFilter(
+            brands=['COSRX', 'La Roche-Posay'],
+            products=[product_phrase('COSRX Advanced Snail 96 Mucin Power Essence 100ml', 'COSRX')],
+        )
+
+    def test_product_phrase_drops_brand_and_size(self):
+        """Test catalog names are reduced to the phrase people write"""
+        self.assertEqual(product_phrase('COSRX Advanced Snail 96 Mucin Power Essence 100ml', 'COSRX'),
+                         'advanced snail 96 mucin power essence')
+        self.assertIsNone(product_phrase('COSRX Essence 50ml', 'COSRX'))
+
+    def test_score_brands_products_and_flair(self):
+        """Test mentions and flair rules add up while selfies fall below the threshold"""
+        self.assertEqual(self.relevance_filter.score('Is COSRX legit?'), 2.0)
+        self.assertEqual(self.relevance_filter.score('Review', 'cosrx advanced snail 96 mucin power essence!'), 5.5)
+        self.assertEqual(self.relevance_filter.score('My skin today', flair='Selfie'), -3.0)
+        self.assertEqual(self.relevance_filter.score('Sunscreen and serum order', flair='Review - Sunscreen'), 3.0)
+
+    def test_load_vocabulary(self):
+        """Test brands and product phrases come from the review history and snapshots"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            reviews_file = os.path.join(temp_dir, 'reviews.csv')
+            snapshot_file = os.path.join(temp_dir, 'snapshots.csv')
+            pd.DataFrame({'product_name': ['COSRX Low pH Good Morning Gel Cleanser 150ml'], 'brand': ['COSRX']}).to_csv(
+                reviews_file, index=False)
+            pd.DataFrame({'name': ['COSRX Full Fit Propolis Light Ampoule 30ml'], 'url': ['u1']}).to_csv(
+                snapshot_file, index=False)
+
+            brands, products = load_vocabulary(snapshot_file, reviews_file)
+
+        self.assertEqual(brands, {'cosrx'})
+        self.assertEqual(products, {'low ph good morning gel cleanser', 'full fit propolis light ampoule'})
+
+    def test_empty_catalog_disables_filter(self):
+        """Test no filter is built before there is a catalog to match against"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            relevance_filter = RelevanceFilter.from_catalog(
+                os.path.join(temp_dir, 'snapshots.csv'), os.path.join(temp_dir, 'reviews.csv')
+            )
+        self.assertIsNone(relevance_filter)
+
+    @patch('src.ingestion.reddit_scraper.time.sleep')
+    def test_scrape_subreddit_skips_irrelevant_comment_trees(self, mock_sleep):
+        """Test only relevant posts have their comments fetched and skipped ones are ledgered"""
+        reddit = MagicMock()
+        relevant = make_post('p1', 'COSRX snail essence thoughts?')
+        selfie = make_post('p2', 'Glowing today', flair='Selfie')
+        reddit.subreddit.return_value.top.return_value = [relevant, selfie]
+
+        posts_df, comments_df = scrape_subreddit('AsianBeauty', 'day', 2, reddit=reddit,
+                                                 relevance_filter=self.relevance_filter)
+
+        self.assertEqual(list(posts_df['comments_fetched']), [True, False])
+        self.assertEqual(list(comments_df['post_id']), ['p1'])
+        selfie.comments.replace_more.assert_not_called()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ledger = JobLedger(os.path.join(temp_dir, 'jobs.db'))
+            self.assertEqual(self.relevance_filter.record_skipped(ledger), 1)
+            self.assertEqual(ledger.units(SKIPPED_COMMENTS_SOURCE, partition='AsianBeauty'), ['p2'])
+
+            reddit.submission.return_value = selfie
+            selfie.subreddit.display_name = 'AsianBeauty'
+            skipped_df = fetch_skipped_comments(ledger, reddit=reddit)
+
+            self.assertEqual(list(skipped_df['post_id']), ['p2'])
+            self.assertTrue(ledger.is_done(SKIPPED_COMMENTS_SOURCE, 'p2'))
+            ledger.close()
+
+        self.assertEqual(self.relevance_filter.stats()['skipped'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
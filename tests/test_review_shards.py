@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.review_shards import PRODUCT_SOURCE, crawl_from_ledger, shard_urls, shard_for_url, merge_shards
+from src.ingestion.job_ledger import JobLedger
+
+class TestReviewShards(unittest.TestCase):
+    """Test cases for sharded review scraping"""
+
+    def test_shard_urls_is_stable_and_complete(self):
+        """Test every URL lands in exactly one shard, the same one each time"""
+        urls = [f"https://example.com/p/product-{i}.html" for i in range(100)]
+        shards = shard_urls(urls, 4)
+
+        self.assertEqual(sorted(url for shard in shards for url in shard), sorted(urls))
+        for index, shard in enumerate(shards):
+            for url in shard:
+                self.assertEqual(shard_for_url(url, 4), index)
+
+    def test_shard_urls_drops_duplicates(self):
+        """Test duplicate URLs are only scraped once"""
+        shards = shard_urls(['https://example.com/p/a.html'] * 3, 2)
+        self.assertEqual(sum(len(shard) for shard in shards), 1)
+
+    def test_merge_shards_dedupes_reviews(self):
+        """Test merging combines shards and drops duplicate review IDs"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            shard_files = []
+            for index, review_ids in enumerate([['a', 'b'], ['b', 'c']]):
+                shard_dir = os.path.join(temp_dir, f"shard_{index:03d}")
+                os.makedirs(shard_dir)
+                path = os.path.join(shard_dir, "reviews.csv")
+                pd.DataFrame({'review_id': review_ids}).to_csv(path, index=False)
+                shard_files.append(path)
+
+            output_file = os.path.join(temp_dir, "reviews.csv")
+            merged = merge_shards(shard_files, output_file, merge_history=False)
+
+            self.assertEqual(sorted(merged['review_id']), ['a', 'b', 'c'])
+            self.assertTrue(os.path.exists(output_file))
+
+    def test_crawl_from_ledger_stops_at_request_budget(self):
+        """Test a budgeted crawl leaves the URLs it didn't reach pending for the next run"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ledger = JobLedger(os.path.join(temp_dir, "jobs.db"))
+            ledger.add(PRODUCT_SOURCE, ['a', 'b', 'c'])
+            scraper = MagicMock()
+            scraper.review_count_unchanged.return_value = False
+            scraper.get_product_reviews.return_value = []
+
+            crawl_from_ledger(scraper, ledger, os.path.join(temp_dir, "reviews.csv"), max_requests=2)
+
+            self.assertEqual(scraper.get_product_reviews.call_count, 2)
+            self.assertEqual(ledger.units(PRODUCT_SOURCE, status='done'), ['a', 'b'])
+            self.assertEqual(ledger.units(PRODUCT_SOURCE, status='pending'), ['c'])
+            ledger.close()
+
+    def test_crawl_from_ledger_discards_taken_over_product(self):
+        """Test reviews are dropped when another worker took over the product mid-fetch"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ledger = JobLedger(os.path.join(temp_dir, "jobs.db"), lease_seconds=60)
+            ledger.add(PRODUCT_SOURCE, ['a'])
+            output_file = os.path.join(temp_dir, "reviews.csv")
+
+            def slow_fetch(url):
+                # The fetch outlives the lease and a second worker claims the product
+                ledger.claim(PRODUCT_SOURCE, 'w2', now=time.time() + 61)
+                return [{'review_id': 'r1', 'product_url': url}]
+
+            scraper = MagicMock()
+            scraper.review_count_unchanged.return_value = False
+            scraper.get_product_reviews.side_effect = slow_fetch
+
+            self.assertEqual(crawl_from_ledger(scraper, ledger, output_file, worker_id='w1'), 0)
+            self.assertFalse(os.path.exists(output_file))
+            self.assertEqual(ledger.status(PRODUCT_SOURCE, 'a'), 'leased')
+            self.assertEqual(ledger.leases(PRODUCT_SOURCE), {'w2': 1})
+            ledger.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+import tempfile
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.review_store import make_review_id, ReviewIndex, merge_reviews
+
+class TestReviewStore(unittest.TestCase):
+    """Test cases for review IDs and the review history index"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.temp_dir.name, 'review_ids.txt')
+        self.history_file = os.path.join(self.temp_dir.name, 'reviews_history.csv')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_reviews(self, bodies):
+        return pd.DataFrame([
+            {
+                'review_id': make_review_id('SKU1', 'user', '2024-01-01', body),
+                'product_sku': 'SKU1',
+                'body': body
+            }
+            for body in bodies
+        ])
+
+    def test_review_id_is_deterministic(self):
+        """Test the same review always gets the same ID"""
+        first = make_review_id('SKU1', 'user1', '2024-01-01', 'Loved it')
+        second = make_review_id('SKU1', 'user1', '2024-01-01', '  Loved   it ')
+        self.assertEqual(first, second)
+
+    def test_review_id_distinguishes_products(self):
+        """Test identical reviews on different products get different IDs"""
+        first = make_review_id('SKU1', 'user1', '2024-01-01', 'Loved it')
+        second = make_review_id('SKU2', 'user1', '2024-01-01', 'Loved it')
+        self.assertNotEqual(first, second)
+
+    def test_merge_appends_only_new_reviews(self):
+        """Test merging skips reviews already in the history"""
+        index = ReviewIndex(self.index_file)
+        added = merge_reviews(self.make_reviews(['a', 'b']), self.history_file, index)
+        self.assertEqual(len(added), 2)
+
+        added = merge_reviews(self.make_reviews(['b', 'c', 'c']), self.history_file, index)
+        self.assertEqual(list(added['body']), ['c'])
+
+        history = pd.read_csv(self.history_file)
+        self.assertEqual(sorted(history['body']), ['a', 'b', 'c'])
+
+    def test_index_persists(self):
+        """Test the ID index is reloaded from disk"""
+        merge_reviews(self.make_reviews(['a']), self.history_file, ReviewIndex(self.index_file))
+        self.assertEqual(len(ReviewIndex(self.index_file)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
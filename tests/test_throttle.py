@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.throttle import AdaptiveThrottle
+
+class TestAdaptiveThrottle(unittest.TestCase):
+    """Test cases for the AIMD request throttle"""
+
+    def test_additive_increase(self):
+        """Test healthy responses raise the rate by a fixed step"""
+        throttle = AdaptiveThrottle(initial_rate=0.5, increase=0.1, max_rate=0.75)
+        throttle.record(200)
+        self.assertAlmostEqual(throttle.current_rate, 0.6)
+        throttle.record(200)
+        throttle.record(200)
+        self.assertAlmostEqual(throttle.current_rate, 0.75)
+
+    def test_multiplicative_decrease(self):
+        """Test throttling responses cut the rate by a factor"""
+        throttle = AdaptiveThrottle(initial_rate=1.0, decrease_factor=0.5, min_rate=0.2)
+        throttle.record(429)
+        self.assertAlmostEqual(throttle.current_rate, 0.5)
+        throttle.record(503)
+        throttle.record(403)
+        self.assertAlmostEqual(throttle.current_rate, 0.2)
+        self.assertEqual(throttle.stats()['throttled'], 3)
+
+    def test_errors_leave_rate_unchanged(self):
+        """Test other errors neither raise nor lower the rate"""
+        throttle = AdaptiveThrottle(initial_rate=0.5)
+        throttle.record(404)
+        throttle.record(None)
+        self.assertAlmostEqual(throttle.current_rate, 0.5)
+
+    @patch('src.ingestion.throttle.time.sleep')
+    def test_wait_spaces_requests(self, mock_sleep):
+        """Test consecutive waits are spaced by the current interval"""
+        throttle = AdaptiveThrottle(initial_rate=1.0, jitter=0)
+        throttle.wait()
+        throttle.wait()
+        delay = mock_sleep.call_args[0][0]
+        self.assertGreater(delay, 0.9)
+        self.assertLessEqual(delay, 1.0)
+
+    @patch('src.ingestion.throttle.time.sleep')
+    def test_fallback_uses_fixed_delay(self, mock_sleep):
+        """Test the non-adaptive fallback sleeps within the fixed range"""
+        throttle = AdaptiveThrottle(adaptive=False, fallback_delay=(1, 3))
+        throttle.wait()
+        delay = mock_sleep.call_args[0][0]
+        self.assertTrue(1 <= delay <= 3)
+
+if __name__ == '__main__':
+    unittest.main()
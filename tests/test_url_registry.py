@@ -0,0 +1,85 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.ingestion.url_registry import UrlRegistry
+
+class TestUrlRegistry(unittest.TestCase):
+    """Test cases for the product URL registry"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry_file = os.path.join(self.temp_dir.name, 'registry.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_update_reports_delta(self):
+        """Test new, gone, returned and unchanged URLs are reported"""
+        registry = UrlRegistry(self.registry_file)
+        delta = registry.update(['a', 'b'])
+        self.assertEqual(delta['new'], ['a', 'b'])
+
+        delta = registry.update(['b', 'c'])
+        self.assertEqual(delta['new'], ['c'])
+        self.assertEqual(delta['gone'], ['a'])
+        self.assertEqual(delta['unchanged'], ['b'])
+
+        delta = registry.update(['a', 'b', 'c'])
+        self.assertEqual(delta['returned'], ['a'])
+
+    def test_partial_update_keeps_unseen_urls(self):
+        """Test a partial crawl doesn't mark unseen URLs as gone"""
+        registry = UrlRegistry(self.registry_file)
+        registry.update(['a', 'b'])
+        delta = registry.update(['c'], complete=False)
+        self.assertEqual(delta['gone'], [])
+        self.assertEqual(registry.active_urls(), ['a', 'b', 'c'])
+
+    def test_first_seen_is_preserved(self):
+        """Test first_seen stays fixed while last_seen advances"""
+        registry = UrlRegistry(self.registry_file)
+        first = datetime(2024, 1, 1)
+        registry.update(['a'], seen_at=first)
+        registry.update(['a'], seen_at=first + timedelta(days=1))
+        self.assertEqual(registry.urls['a']['first_seen'], first.isoformat())
+        self.assertEqual(registry.urls['a']['last_seen'], (first + timedelta(days=1)).isoformat())
+
+    def test_urls_for_review_crawl(self):
+        """Test new products come first, then products due a recrawl"""
+        registry = UrlRegistry(self.registry_file)
+        now = datetime(2024, 2, 1)
+        registry.update(['old', 'recent', 'new'], seen_at=now)
+        registry.mark_review_crawled(['old'], crawled_at=now - timedelta(days=30))
+        registry.mark_review_crawled(['recent'], crawled_at=now - timedelta(days=1))
+
+        self.assertEqual(registry.urls_for_review_crawl(recrawl_after_days=7, now=now), ['new', 'old'])
+
+    def test_full_crawl_due(self):
+        """Test only complete crawls reset the full crawl schedule"""
+        registry = UrlRegistry(self.registry_file)
+        now = datetime(2024, 2, 1)
+        self.assertTrue(registry.full_crawl_due(now=now))
+
+        registry.update(['a'], seen_at=now - timedelta(days=10))
+        registry.update(['b'], seen_at=now - timedelta(days=1), complete=False)
+        self.assertTrue(registry.full_crawl_due(max_age_days=7, now=now))
+
+        registry.update(['a', 'b'], seen_at=now - timedelta(days=1))
+        self.assertFalse(registry.full_crawl_due(max_age_days=7, now=now))
+        registry.save()
+        self.assertFalse(UrlRegistry(self.registry_file).full_crawl_due(max_age_days=7, now=now))
+
+    def test_registry_persists(self):
+        """Test the registry is reloaded from disk"""
+        registry = UrlRegistry(self.registry_file)
+        registry.update(['a'])
+        registry.save()
+        self.assertIn('a', UrlRegistry(self.registry_file))
+
+if __name__ == '__main__':
+    unittest.main()